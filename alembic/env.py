@@ -0,0 +1,75 @@
+import asyncio
+from logging.config import fileConfig
+
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import context
+
+from config.database import Base, DATABASE_URL
+# Imported for their side effect of registering tables on Base.metadata, for autogenerate
+from schema import (access_request_schema, audit_log_schema, auth_logs_schema, auth_token_schema,  # noqa: F401
+                    document_schema, encryption_key_store_schema, user_schema)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # audit_log partitions are created and dropped at runtime by the audit partition job
+    return not (type_ == "table" and reflected and name.startswith("audit_log_y"))
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the migration SQL to stdout instead of running it (alembic upgrade head --sql)
+    """
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        transaction_per_migration=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    # One transaction per revision, so a revision using autocommit_block (CREATE INDEX CONCURRENTLY)
+    # does not commit the revisions before it halfway
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        transaction_per_migration=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    connectable = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
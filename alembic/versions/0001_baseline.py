@@ -0,0 +1,120 @@
+"""Baseline schema
+
+The tables as the application created them with Base.metadata.create_all before migrations were
+introduced. Secondary indexes are left to 0002 so they can be built CONCURRENTLY on live tables.
+
+A database that was already created by the application is marked as being at this revision with
+
+    alembic stamp 0001
+
+after running the scripts in migration/, then upgraded as usual.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('INDIVIDUAL', 'ORGANIZATION', name='accounttype'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('auth_logs',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('failed_attempts', sa.Integer(), nullable=False),
+    sa.Column('last_attempt', sa.BIGINT(), nullable=False),
+    sa.Column('blocked_until', sa.BIGINT(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('auth_token',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('token_digest', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.BigInteger(), nullable=False),
+    sa.Column('expires_at', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_auth_token_token_digest'), 'auth_token', ['token_digest'], unique=True)
+    op.create_table('document',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('uploader_id', sa.UUID(), nullable=False),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('blob_ref', sa.String(length=64), nullable=True),
+    sa.Column('encrypted_data', postgresql.BYTEA(), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('content_type', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.BigInteger(), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['uploader_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('encryption_key_store',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('public_key', sa.String(), nullable=False),
+    sa.Column('encrypted_private_key', sa.String(), nullable=False),
+    sa.Column('created_at', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('access_request',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('requester_id', sa.UUID(), nullable=False),
+    sa.Column('doc_id', sa.String(length=64), nullable=False),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'APPROVED', 'DECLINED', 'COMPLETED', name='accessstatus'), nullable=False),
+    sa.Column('requested_at', sa.BigInteger(), nullable=False),
+    sa.Column('approved_at', sa.BigInteger(), nullable=True),
+    sa.ForeignKeyConstraint(['doc_id'], ['document.id'], ),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['requester_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('audit_log',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('action', sa.Enum('REQUESTED_DOCUMENT', 'MODIFIED_REQUEST', 'DOWNLOADED_DOCUMENT', 'ADDED_DOCUMENT', 'SIGNIN', 'SIGNUP', 'LOGOUT', name='auditaction'), nullable=False),
+    sa.Column('doc_id', sa.String(length=64), nullable=True),
+    sa.Column('timestamp', sa.BigInteger(), nullable=False),
+    sa.Column('ip_address', sa.String(length=45), nullable=False),
+    sa.Column('user_agent', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['doc_id'], ['document.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('audit_log')
+    op.drop_table('access_request')
+    op.drop_table('encryption_key_store')
+    op.drop_table('document')
+    op.drop_index(op.f('ix_auth_token_token_digest'), table_name='auth_token')
+    op.drop_table('auth_token')
+    op.drop_table('auth_logs')
+    op.drop_table('user')
+    for enum_name in ('auditaction', 'accessstatus', 'accounttype'):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,67 @@
+"""Hot path indexes
+
+Secondary indexes for the filters the services run on every request: session lookups and the
+expired token sweep, the keyset-paginated listings, access requests by document and a user's
+audit trail. Each is built with CREATE INDEX CONCURRENTLY, so writes to the table continue while
+it builds; this needs autocommit, so every index runs outside the migration transaction.
+
+A concurrent build that fails leaves an INVALID index behind. It is dropped and rebuilt on the
+next run, and an index that already exists and is valid (e.g. created by the application before
+migrations were introduced) is left alone.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial index predicate)
+INDEXES = (
+    ('ix_auth_token_user_id', 'auth_token', ['user_id'], None),
+    ('ix_auth_token_expires_at', 'auth_token', ['expires_at'], None),
+    ('ix_document_owner_id_created_at_id', 'document', ['owner_id', 'created_at', 'id'], None),
+    ('ix_document_uploader_id_created_at_id', 'document', ['uploader_id', 'created_at', 'id'], None),
+    ('ix_access_request_owner_id_requested_at_id', 'access_request', ['owner_id', 'requested_at', 'id'], None),
+    ('ix_access_request_requester_id_requested_at_id', 'access_request', ['requester_id', 'requested_at', 'id'], None),
+    ('ix_access_request_pending_owner_id_requested_at_id', 'access_request', ['owner_id', 'requested_at', 'id'],
+     "status = 'PENDING'"),
+    ('ix_access_request_doc_id', 'access_request', ['doc_id'], None),
+    ('ix_audit_log_user_id_timestamp', 'audit_log', ['user_id', 'timestamp'], None),
+)
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace AND NOT i.indisvalid
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            if op.get_bind().execute(INVALID_INDEX, {"name": name}).first() is not None:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
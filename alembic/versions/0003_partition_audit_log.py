@@ -0,0 +1,98 @@
+"""Partition audit_log by month
+
+Rebuilds audit_log as a table range-partitioned on `timestamp`, with one partition per UTC month
+named audit_log_y<YYYY>m<MM> (the convention service/audit_partition_service.py relies on). The
+primary key becomes (id, timestamp), as a partitioned table's keys must include the partition key;
+ids keep coming from the existing sequence.
+
+Partitions are created for every month that has rows and for the next AHEAD months, the rows are
+copied across and the old table is dropped. The copy holds the old table locked for its duration;
+on a large audit_log run this in a maintenance window. From then on the audit partition job
+creates upcoming months and archives expired ones.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AHEAD = 3
+COLUMNS = "id, user_id, action, doc_id, timestamp, ip_address, user_agent"
+
+
+def _months(first: datetime, last: datetime):
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_start(year: int, month: int) -> int:
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _create_table(partitioned: bool) -> None:
+    op.create_table(
+        'audit_log',
+        sa.Column('id', sa.BigInteger(), server_default=sa.text("nextval('audit_log_id_seq')"), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('action', postgresql.ENUM(name='auditaction', create_type=False), nullable=False),
+        sa.Column('doc_id', sa.String(length=64), nullable=True),
+        sa.Column('timestamp', sa.BigInteger(), nullable=False),
+        sa.Column('ip_address', sa.String(length=45), nullable=False),
+        sa.Column('user_agent', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['doc_id'], ['document.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id', 'timestamp') if partitioned else sa.PrimaryKeyConstraint('id'),
+        **({'postgresql_partition_by': 'RANGE (timestamp)'} if partitioned else {})
+    )
+    op.create_index('ix_audit_log_user_id_timestamp', 'audit_log', ['user_id', 'timestamp'], unique=False)
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+
+
+def _rename_old_table() -> None:
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_old")
+    for constraint in ('pkey', 'user_id_fkey', 'doc_id_fkey'):
+        op.execute(f"ALTER TABLE audit_log_old RENAME CONSTRAINT audit_log_{constraint} TO audit_log_old_{constraint}")
+    op.execute("ALTER INDEX ix_audit_log_user_id_timestamp RENAME TO ix_audit_log_old_user_id_timestamp")
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY NONE")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rename_old_table()
+    _create_table(partitioned=True)
+
+    oldest = op.get_bind().execute(sa.text("SELECT min(timestamp) FROM audit_log_old")).scalar()
+    now = datetime.now(timezone.utc)
+    first = datetime.fromtimestamp(oldest, timezone.utc) if oldest is not None else now
+    last_year, last_month = divmod(now.year * 12 + now.month - 1 + AHEAD, 12)
+    for year, month in _months(min(first, now), datetime(last_year, last_month + 1, 1, tzinfo=timezone.utc)):
+        end_year, end_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        op.execute(
+            f"CREATE TABLE audit_log_y{year:04d}m{month:02d} PARTITION OF audit_log "
+            f"FOR VALUES FROM ({_month_start(year, month)}) TO ({_month_start(end_year, end_month)})"
+        )
+
+    op.execute(f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_old")
+    op.drop_table('audit_log_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rename_old_table()
+    _create_table(partitioned=False)
+    op.execute(f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_old")
+    op.drop_table('audit_log_old')  # drops its partitions with it
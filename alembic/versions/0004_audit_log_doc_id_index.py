@@ -0,0 +1,71 @@
+"""Audit log by document
+
+Partial index on audit_log (doc_id, timestamp) for the audit trail of a document; rows without a
+document (sign in, logout, ...) are left out of it.
+
+CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so the index is created ON ONLY
+the parent (invalid, and instant), built concurrently on each partition, and each partition's index
+is attached to it. The parent index becomes valid once every partition's is attached; partitions
+created afterwards get theirs automatically. A failed run leaves INVALID partition indexes behind,
+which are dropped and rebuilt on the next run.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME = 'ix_audit_log_doc_id_timestamp'
+COLUMNS = ['doc_id', 'timestamp']
+WHERE = sa.text('doc_id IS NOT NULL')
+
+PARTITIONS = sa.text("""
+    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'audit_log'::regclass ORDER BY c.relname
+""")
+
+INVALID_INDEX = sa.text("""
+    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace AND NOT i.indisvalid
+""")
+
+ATTACHED_INDEX = sa.text("""
+    SELECT 1 FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:parent AS regclass) AND c.relname = :name
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {NAME} ON ONLY audit_log (doc_id, timestamp) WHERE doc_id IS NOT NULL")
+        for partition in bind.execute(PARTITIONS).scalars().all():
+            name = f"{partition}_doc_id_timestamp_idx"
+            if bind.execute(ATTACHED_INDEX, {"parent": NAME, "name": name}).first() is not None:
+                continue
+            if bind.execute(INVALID_INDEX, {"name": name}).first() is not None:
+                op.drop_index(name, table_name=partition, postgresql_concurrently=True)
+            op.create_index(
+                name, partition, COLUMNS,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=WHERE
+            )
+            op.execute(f"ALTER INDEX {NAME} ATTACH PARTITION {name}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(NAME, table_name='audit_log', if_exists=True)  # drops the partitions' indexes with it
@@ -1,27 +1,24 @@
-import time
 from functools import wraps
 from fastapi import Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from repository.audit_log_repository import AuditLogRepository
-from repository.audit_log_repository_impl import AuditLogRepositoryImpl
-from schema.audit_log_schema import AuditAction, AuditLogSchema
+from util.audit_writer import audit_writer
+from util.enums import AuditAction
 
 
 def audit_log(action: AuditAction, doc_id_arg: str | None = None):
     """
     Decorator for FastAPI endpoint or service function.
+    Records the action once the handler returns; the row is written by the background audit writer.
     :param action:      which AuditAction to record
-    :param doc_id_arg:  name of the kwarg that holds the document UUID (optional)
+    :param doc_id_arg:  name of the kwarg that holds the document UUID (optional); handlers can also
+                        set request.state.audit_doc_id once they know the document
     """
     def decorator(fn):
         @wraps(fn)
         async def wrapper(*args, **kwargs):
-            # find Request & DB session in args/kwargs
+            # find Request in args/kwargs
             request: Request               = kwargs.get("request") \
                 or next((a for a in args if isinstance(a, Request)), None)
-            db_session: AsyncSession       = kwargs.get("db_session") \
-                or next((a for a in args if hasattr(a, "execute")), None)
-            if not request or not db_session:
+            if not request:
                 # missing dependencies: just run original
                 return await fn(*args, **kwargs)
 
@@ -32,20 +29,10 @@ def audit_log(action: AuditAction, doc_id_arg: str | None = None):
             doc_id = None
             if doc_id_arg and doc_id_arg in kwargs:
                 doc_id = kwargs[doc_id_arg]
+            doc_id = doc_id or getattr(request.state, "audit_doc_id", None)
 
-            # build repository & log
-            repo: AuditLogRepository = AuditLogRepositoryImpl(db_session)
-            audit_log_obj: AuditLogSchema = AuditLogSchema(
-                user_id    = request.state.user_id,
-                doc_id     = doc_id,
-                action     = action,
-                timestamp  = int(time.time()),
-                ip_address = request.client.host,
-                user_agent = request.headers.get("user-agent", "")
-            )
-            await repo.add(audit_log_obj)
-            await db_session.commit()
-            await db_session.refresh(audit_log_obj)
+            # queue the log entry; never blocks the response
+            audit_writer.record(user_id=request.state.user_id, action=action, request=request, doc_id=doc_id)
             return result
         return wrapper
     return decorator
\ No newline at end of file
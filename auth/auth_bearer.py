@@ -1,12 +1,9 @@
-from uuid import UUID
-
-import jwt
 from fastapi.security import HTTPBearer
 from fastapi import Request, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth import auth_service
 from config.constants.errors import ACCESS_DENIED_INVALID_TOKEN
-from config.constants.keys import Keys
+from util.request_context import user_id_var
 
 
 class JWTBearer(HTTPBearer):
@@ -23,8 +20,9 @@ class JWTBearer(HTTPBearer):
         if not session_validity["valid"]:
             raise HTTPException(status_code=403, detail=ACCESS_DENIED_INVALID_TOKEN)
 
-        payload = jwt.decode(jwt_token, Keys.JWT_SECRET, algorithms=["HS256"])
-        request.state.user_id = session_validity["payload"]["user_id"]
-        request.state.role = session_validity["payload"]["role"]
+        payload = session_validity["payload"]
+        request.state.user_id = payload["user_id"]
+        request.state.role = payload["role"]
         request.state.payload = payload
+        user_id_var.set(str(payload["user_id"]))
         return jwt_token
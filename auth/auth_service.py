@@ -1,19 +1,22 @@
 import time
+from auth.session_cache import session_cache
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 from fastapi import Request
-from config.constants.errors import INTERNAL_SERVER_ERROR
-from repository.audit_log_repository import AuditLogRepository
-from repository.audit_log_repository_impl import AuditLogRepositoryImpl
+from config.constants.errors import INTERNAL_SERVER_ERROR, SERVER_BUSY, CLIENT_CLOSED_REQUEST
+from exceptions.client_disconnected import ClientDisconnectedError
+from exceptions.executor_saturated import ExecutorSaturatedError
 from repository.auth_log_repository import AuthLogsRepository
 from repository.auth_log_repository_impl import AuthLogsRepositoryImpl
 from repository.encryption_key_store_repository import EncryptionKeyStoreRepository
 from repository.encryption_key_store_repository_impl import EncryptionKeyStoreRepositoryImpl
-from schema.audit_log_schema import AuditLogSchema
 from schema.auth_logs_schema import AuthLogsSchema
 from schema.auth_token_schema import AuthTokenSchema
 from util import utils
+from util.crypto_executor import password_executor
+from util.audit_writer import audit_writer
+from util.key_pair_pool import key_pair_pool
 from config.constants.keys import Keys, ENVIRONMENT
 from exceptions.token_creation import TokenCreationError
 from model.sign_in_request import SignInRequest
@@ -23,43 +26,52 @@ from repository.auth_token_repository_impl import AuthTokenRepositoryImpl
 from repository.user_repository import UserRepository
 from repository.user_repository_impl import UserRepositoryImpl
 from schema.user_schema import UserSchema
+from service import key_service
 from uuid import uuid4, UUID
 from passlib.hash import bcrypt
 from util.enums import Environment, AuditAction
 from util.logger import logger
+from util.metrics import timed
 import jwt
 
 
 async def sign_up(request: Request, sign_up_request: SignUpRequest, db_session: AsyncSession) -> JSONResponse | None:
-    user = UserSchema(
-        id=uuid4(),
-        email=sign_up_request.email,
-        name=sign_up_request.name,
-        password=bcrypt.hash(sign_up_request.password),
-        role=sign_up_request.account_type,
-        is_active=True
-    )
     try:
-        # Add a user
         user_repository: UserRepository = UserRepositoryImpl(db_session=db_session)
         existing_user = await user_repository.find_by_email(sign_up_request.email)
         if existing_user:
             raise HTTPException(status_code=409, detail="User already exists with this email.")
+
+        # Hash the password and take a public/private key pair before anything is committed,
+        # so a rejected or cancelled job leaves no user behind. The pair is taken only once the hash
+        # succeeded: a pair acquired alongside a hash that fails would be lost to the pool
+        password_hash = await password_executor.run(bcrypt.hash, sign_up_request.password, stage="bcrypt_hash")
+        public_key, encrypted_private_key = await key_pair_pool.acquire(request=request)
+
+        # Add a user
+        user = UserSchema(
+            id=uuid4(),
+            email=sign_up_request.email,
+            name=sign_up_request.name,
+            password=password_hash,
+            role=sign_up_request.account_type,
+            is_active=True
+        )
         await user_repository.add(user=user)
 
         # Create a token
         token: str = await create_token(user=user, db_session=db_session)
 
-        # Create public/private key pair
-        public_key, encrypted_private_key = utils.generate_encryption_key_pair()
+        # Store public/private key pair
         encryption_repository: EncryptionKeyStoreRepository = EncryptionKeyStoreRepositoryImpl(db_session=db_session)
         await encryption_repository.create_public_key(user_id=user.id, public_key=public_key, encrypted_private_key=encrypted_private_key)
-
-        # Audit Log Auth
-        await audit_auth(user_id=user.id, audit_action=AuditAction.SIGNUP, request=request, db_session=db_session)
+        key_service.invalidate(user_id=user.id)
 
         await db_session.commit()
 
+        # Audit Log Auth
+        audit_auth(user_id=user.id, audit_action=AuditAction.SIGNUP, request=request)
+
         return get_response(token=token, user=user)
 
     except HTTPException as http_exc:
@@ -67,6 +79,16 @@ async def sign_up(request: Request, sign_up_request: SignUpRequest, db_session:
         logger.warning(f"Auth failed: {http_exc.detail}")
         raise http_exc
 
+    except ExecutorSaturatedError as e:
+        await db_session.rollback()
+        logger.warning(f"Sign up rejected: {e.message}")
+        raise HTTPException(status_code=503, detail=SERVER_BUSY, headers={"Retry-After": str(Keys.PASSWORD_HASH_RETRY_AFTER)})
+
+    except ClientDisconnectedError:
+        await db_session.rollback()
+        logger.info("Sign up cancelled, client disconnected")
+        raise HTTPException(status_code=499, detail=CLIENT_CLOSED_REQUEST)
+
     except Exception as e:
         logger.error(f"Sign up error: {e}")
         await db_session.rollback()
@@ -84,16 +106,16 @@ async def sign_in(request: Request, sign_in_request: SignInRequest, db_session:
             raise HTTPException(status_code=401, detail="Invalid Credentials")
 
         # Create/Fetch Auth Log
-        valid = bcrypt.verify(sign_in_request.password, user.password)
+        valid = await password_executor.run(bcrypt.verify, sign_in_request.password, user.password, stage="bcrypt_verify")
         await process_sign_in_attempt(user_id=user.id, password_valid=valid, db_session=db_session)
 
-        # Audit Log Auth
-        await audit_auth(user_id=user.id, audit_action=AuditAction.SIGNIN, request=request, db_session=db_session)
-
         # Create a token
         token: str = await create_token(user=user, db_session=db_session)
         await db_session.commit()
 
+        # Audit Log Auth
+        audit_auth(user_id=user.id, audit_action=AuditAction.SIGNIN, request=request)
+
         return get_response(token=token, user=user)
 
     except HTTPException as http_exc:
@@ -101,6 +123,12 @@ async def sign_in(request: Request, sign_in_request: SignInRequest, db_session:
         logger.warning(f"Auth failed: {http_exc.detail}")
         raise http_exc
 
+    except ExecutorSaturatedError as e:
+        # Shed the login fast instead of queueing it behind a burst
+        await db_session.rollback()
+        logger.warning(f"Sign in rejected: {e.message}")
+        raise HTTPException(status_code=503, detail=SERVER_BUSY, headers={"Retry-After": str(Keys.PASSWORD_HASH_RETRY_AFTER)})
+
     except Exception as e:
         logger.error(f"Sign in error: {e}")
         await db_session.rollback()
@@ -124,26 +152,34 @@ async def create_token(user: UserSchema, db_session: AsyncSession) -> str | None
     try:
         created_at = int(time.time())
         expires_at = created_at + Keys.TOKEN_MAX_AGE
-        token = jwt.encode({"user_id": str(user.id), "iat": created_at, "exp": expires_at, "role": user.role.value}, Keys.JWT_SECRET, algorithm='HS256')
+        # jti keeps tokens issued to the same user within one second distinct under the unique digest index
+        token = jwt.encode({"user_id": str(user.id), "iat": created_at, "exp": expires_at, "role": user.role.value, "jti": uuid4().hex}, Keys.JWT_SECRET, algorithm='HS256')
         auth_token_repo: AuthTokenRepository = AuthTokenRepositoryImpl(db_session=db_session)
-        await auth_token_repo.add(user_id=user.id, token=token, created_at=created_at, expires_at=expires_at)
+        await auth_token_repo.add(user_id=user.id, token_digest=utils.token_digest(token), created_at=created_at, expires_at=expires_at)
         return token
     except Exception as e:
         await db_session.rollback()
         raise TokenCreationError(f"Token creation failed: {str(e)}")
 
 
+@timed("auth.check_session")
 async def check_session(request: Request, db_session: AsyncSession) -> dict:
     jwt_token = request.cookies.get("access_token")
     if not jwt_token:
         return { "valid": False }
 
+    digest = utils.token_digest(jwt_token)
+    payload = session_cache.get(digest)
+    if payload is not None:
+        return { "valid": True, "payload": payload }
+
     try:
         payload = jwt.decode(jwt_token, Keys.JWT_SECRET, algorithms=["HS256"])
         auth_repo: AuthTokenRepository = AuthTokenRepositoryImpl(db_session=db_session)
-        auth_token: AuthTokenSchema = await auth_repo.find_by_auth_token(jwt_token)
+        auth_token: AuthTokenSchema = await auth_repo.find_by_token_digest(digest)
         if not auth_token:
             return { "valid": False }
+        session_cache.put(digest, payload)
         return { "valid": True, "payload": payload }
     except (jwt.ExpiredSignatureError, jwt.DecodeError):
         await db_session.rollback()
@@ -184,8 +220,9 @@ async def process_sign_in_attempt(user_id: UUID, password_valid: bool, db_sessio
 async def logout(request: Request, db_session: AsyncSession):
     try:
         token = request.cookies.get("access_token")
+        digest = utils.token_digest(token) if token else None
         token_repo: AuthTokenRepository = AuthTokenRepositoryImpl(db_session=db_session)
-        await token_repo.delete(token=token)
+        await token_repo.delete(token_digest=digest)
 
         resp = JSONResponse({"message": "Logged out"})
         resp.delete_cookie(
@@ -195,24 +232,14 @@ async def logout(request: Request, db_session: AsyncSession):
             samesite="lax"
         )
         await db_session.commit()
+        if digest:
+            await session_cache.revoke(digest)
         return resp
     except Exception as e:
         await db_session.rollback()
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
 
-async def audit_auth(user_id: UUID, audit_action: AuditAction, request: Request, db_session: AsyncSession):
-    try:
-        audit_repo: AuditLogRepository = AuditLogRepositoryImpl(db_session=db_session)
-        audit_schema: AuditLogSchema = AuditLogSchema(
-            user_id=user_id,
-            action=audit_action,
-            doc_id=None,
-            timestamp = int(time.time()),
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent", ""),
-        )
-        await audit_repo.add(log=audit_schema)
-    except Exception as e:
-        raise e
-
+def audit_auth(user_id: UUID, audit_action: AuditAction, request: Request):
+    # Queued for the background audit writer, after the auth transaction has committed
+    audit_writer.record(user_id=user_id, action=audit_action, request=request)
@@ -0,0 +1,121 @@
+"""
+Channels that carry session revocations between worker processes.
+
+Each message is the digest of a revoked token. Subscribers drop that digest from their
+session cache. If a channel may have missed messages, for example after reconnecting,
+it calls `on_reset` so the subscriber can clear everything it holds.
+"""
+import asyncio
+from typing import Callable, Protocol
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from config.constants.keys import Keys
+from util.logger import logger
+
+MessageHandler = Callable[[str], None]
+ResetHandler = Callable[[], None]
+
+
+class InvalidationChannel(Protocol):
+    async def start(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        ...
+
+    async def publish(self, message: str) -> None:
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+
+class LocalInvalidationChannel(InvalidationChannel):
+    """
+    In-process stand-in for a single worker, or for tests.
+    Every subscriber started on the same instance receives every published message.
+    """
+    def __init__(self):
+        self._subscribers: list[MessageHandler] = []
+
+    async def start(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        self._subscribers.append(on_message)
+
+    async def publish(self, message: str) -> None:
+        for on_message in list(self._subscribers):
+            on_message(message)
+
+    async def stop(self) -> None:
+        self._subscribers.clear()
+
+
+class PostgresInvalidationChannel(InvalidationChannel):
+    """
+    LISTEN/NOTIFY on a dedicated asyncpg connection, kept outside the SQLAlchemy pool.
+    If the connection drops, it reconnects and resets subscribers, because notifications
+    sent while it was down are lost.
+    """
+    def __init__(self, database_url: str, channel: str):
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self._connection: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._on_message: MessageHandler | None = None
+        self._on_reset: ResetHandler | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopped = False
+
+    async def start(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        self._on_message = on_message
+        self._on_reset = on_reset
+        self._stopped = False
+        await self._connect()
+
+    async def publish(self, message: str) -> None:
+        async with self._lock:
+            if self._connection is None or self._connection.is_closed():
+                raise ConnectionError(f"Not listening on '{self.channel}'")
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, message)
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(self.channel, self._notified)
+        connection.add_termination_listener(self._terminated)
+        self._connection = connection
+
+    def _notified(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self._on_message(payload)
+
+    def _terminated(self, connection: asyncpg.Connection) -> None:
+        if self._stopped or self._reconnect_task is not None:
+            return
+        logger.warning(f"[InvalidationChannel] Lost LISTEN connection on '{self.channel}', reconnecting")
+        self._on_reset()
+        self._reconnect_task = asyncio.create_task(self._reconnect(), name="session-invalidation-reconnect")
+
+    async def _reconnect(self) -> None:
+        try:
+            while not self._stopped:
+                try:
+                    await self._connect()
+                    break
+                except (OSError, asyncpg.PostgresError) as e:
+                    logger.warning(f"[InvalidationChannel] Reconnect failed: {e}")
+                    await asyncio.sleep(Keys.SESSION_CHANNEL_RETRY_INTERVAL)
+            self._on_reset()
+        finally:
+            self._reconnect_task = None
+
+
+def create_invalidation_channel(database_url: str) -> InvalidationChannel:
+    if Keys.SESSION_INVALIDATION_CHANNEL == "local" or not database_url.startswith("postgresql"):
+        return LocalInvalidationChannel()
+    return PostgresInvalidationChannel(database_url=database_url, channel=Keys.SESSION_NOTIFY_CHANNEL)
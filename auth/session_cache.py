@@ -0,0 +1,54 @@
+import time
+
+from config.constants.keys import Keys
+from config.database import DATABASE_URL
+from auth.invalidation_channel import InvalidationChannel, create_invalidation_channel
+from util.logger import logger
+from util.ttl_cache import TTLCache
+
+
+class SessionCache:
+    """
+    Validated JWT payloads keyed by token digest, so repeat requests skip the decode and the auth_token lookup.
+    Entries expire with the token's `exp`, capped at `max_ttl` to bound staleness if a revocation is missed.
+    Revocations are applied locally and published to the other workers through `channel`.
+    """
+    def __init__(self, maxsize: int, max_ttl: float, channel: InvalidationChannel):
+        self.max_ttl = max_ttl
+        self.channel = channel
+        self._cache = TTLCache(maxsize=maxsize, ttl=max_ttl)
+
+    async def start(self) -> None:
+        await self.channel.start(on_message=self._cache.invalidate, on_reset=self._cache.clear)
+
+    async def stop(self) -> None:
+        await self.channel.stop()
+
+    def get(self, token_digest: str) -> dict | None:
+        return self._cache.get(token_digest)
+
+    def put(self, token_digest: str, payload: dict) -> None:
+        ttl = min(payload["exp"] - time.time(), self.max_ttl)
+        if ttl > 0:
+            self._cache.set(token_digest, payload, ttl=ttl)
+
+    async def revoke(self, token_digest: str) -> None:
+        """
+        Drop the session here and tell the other workers to drop it.
+        Call after the auth_token delete is committed, or a worker could re-cache the row in between.
+        """
+        self._cache.invalidate(token_digest)
+        try:
+            await self.channel.publish(token_digest)
+        except Exception as e:
+            logger.error(f"[SessionCache] Revocation publish failed, other workers keep it until expiry: {e}")
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+session_cache = SessionCache(
+    maxsize=Keys.SESSION_CACHE_SIZE,
+    max_ttl=Keys.SESSION_CACHE_MAX_TTL,
+    channel=create_invalidation_channel(DATABASE_URL)
+)
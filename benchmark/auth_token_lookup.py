@@ -0,0 +1,111 @@
+"""
+Compare auth_token lookup latency by raw JWT (unindexed, the old schema) and by indexed SHA-256 digest.
+
+Builds a scratch copy of the table at --rows rows (default 10M) in the DOCUSHIELD_DB_URL database,
+times single-row lookups the way check_session issues them, then drops the table.
+
+    python -m benchmark.auth_token_lookup [--rows 10000000] [--lookups 2000] [--scan-lookups 5]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import text
+
+from config.database import engine
+from util.latency_stats import LatencyStats
+
+TABLE = "bench_auth_token"
+FILL_BATCH = 1_000_000
+
+# A deterministic ~200 character stand-in for a JWT, derived from the row number
+TOKEN_EXPR = "repeat(md5(g::text), 6) || g::text"
+
+
+async def build_table(rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await conn.execute(text(f"""
+            CREATE UNLOGGED TABLE {TABLE} (
+                id BIGSERIAL PRIMARY KEY,
+                user_id UUID NOT NULL,
+                token VARCHAR NOT NULL,
+                token_digest VARCHAR(64) NOT NULL,
+                created_at BIGINT NOT NULL,
+                expires_at BIGINT NOT NULL
+            )
+        """))
+
+    for start in range(1, rows + 1, FILL_BATCH):
+        stop = min(start + FILL_BATCH - 1, rows)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"""
+                INSERT INTO {TABLE} (user_id, token, token_digest, created_at, expires_at)
+                SELECT md5((g % 100000)::text)::uuid, {TOKEN_EXPR},
+                       encode(sha256(convert_to({TOKEN_EXPR}, 'UTF8')), 'hex'), g, g + 604800
+                FROM generate_series(CAST(:start AS BIGINT), CAST(:stop AS BIGINT)) AS g
+            """), {"start": start, "stop": stop})
+        print(f"  inserted {stop:,} / {rows:,}")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE UNIQUE INDEX ix_{TABLE}_token_digest ON {TABLE} (token_digest)"))
+        await conn.execute(text(f"CREATE INDEX ix_{TABLE}_user_id ON {TABLE} (user_id)"))
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+async def sample_tokens(rows: int, count: int) -> list[tuple[str, str]]:
+    ids = random.sample(range(1, rows + 1), min(count, rows))
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(f"SELECT token, token_digest FROM {TABLE} WHERE id = ANY(:ids)"), {"ids": ids}
+        )
+        return [(row.token, row.token_digest) for row in result]
+
+
+async def time_lookups(column: str, values: list[str]) -> LatencyStats:
+    stats = LatencyStats(window=len(values))
+    query = text(f"SELECT id, user_id, expires_at FROM {TABLE} WHERE {column} = :value")
+    async with engine.connect() as conn:
+        for value in values:
+            started = time.perf_counter()
+            result = await conn.execute(query, {"value": value})
+            assert result.first() is not None
+            stats.record(time.perf_counter() - started)
+    return stats
+
+
+def report(label: str, stats: LatencyStats) -> None:
+    s = stats.snapshot()
+    print(f"{label:<28} n={s['count']:<6} avg={s['avg_ms']:9.3f}ms p50={s['p50_ms']:9.3f}ms "
+          f"p95={s['p95_ms']:9.3f}ms p99={s['p99_ms']:9.3f}ms max={s['max_ms']:9.3f}ms")
+
+
+async def main(rows: int, lookups: int, scan_lookups: int, keep: bool) -> None:
+    try:
+        print(f"Building {TABLE} with {rows:,} rows")
+        started = time.monotonic()
+        await build_table(rows)
+        print(f"Built in {time.monotonic() - started:.1f}s")
+
+        samples = await sample_tokens(rows, max(lookups, scan_lookups))
+        random.shuffle(samples)
+        digest_stats = await time_lookups("token_digest", [digest for _, digest in samples[:lookups]])
+        token_stats = await time_lookups("token", [token for token, _ in samples[:scan_lookups]])
+        report("token_digest (unique index)", digest_stats)
+        report("token (no index)", token_stats)
+    finally:
+        if not keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--scan-lookups", type=int, default=5, help="lookups by raw token; each is a full scan")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table after the run")
+    args = parser.parse_args()
+    asyncio.run(main(rows=args.rows, lookups=args.lookups, scan_lookups=args.scan_lookups, keep=args.keep))
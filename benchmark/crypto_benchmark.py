@@ -0,0 +1,227 @@
+"""
+Micro-benchmarks of the util.utils crypto path across document sizes.
+
+For each function and size: latency percentiles over --runs timed calls (after one warm-up call),
+throughput, and peak Python memory over one extra call traced with tracemalloc (kept out of the
+timed calls, as tracing slows allocation down). Runs offline: no database or network, only
+JWT_SECRET, from which the private key wrapping key is derived.
+
+    python -m benchmark.crypto_benchmark [--sizes 1K,64K,1M,16M,200M] [--runs 5] [--functions encrypt_data,...]
+                                         [--save results.json] [--baseline baseline.json] [--threshold 0.10]
+
+--save writes the results as JSON. --baseline compares them with a saved run and exits with 1 when
+a function's p50 latency or peak memory at some size grew by more than --threshold; compare runs
+made on the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import cryptography
+
+from config.constants.keys import Keys
+from util import utils
+from util.container import ContainerWriter
+from util.latency_stats import LatencyStats
+
+DEFAULT_SIZES = "1K,64K,1M,16M,200M"
+UNITS = {"G": 1024 ** 3, "M": 1024 ** 2, "K": 1024}
+# Growth smaller than this is timer or allocator noise, never a regression, whatever its ratio
+NOISE_FLOOR = {"p50_ms": 0.05, "peak_mem_mib": 0.05}
+
+
+class Case(NamedTuple):
+    function: str
+    sized: bool  # False: the cost does not depend on the document size, so it is measured once
+    prepare: Callable[[bytes], tuple]  # builds the arguments, outside the timed calls
+    run: Callable
+
+
+class Keyring(NamedTuple):
+    owner_public_pem: str
+    owner_encrypted_private: str
+    org_public_pem: str
+    org_encrypted_private: str
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit, factor in UNITS.items():
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def legacy_blob(plaintext: bytes, keys: Keyring) -> bytes:
+    # The pre-container format: signature || separator || encrypt_data(plaintext)
+    org_private_pem = utils.decrypt_private_key(keys.org_encrypted_private)
+    return utils.sign_data(plaintext, org_private_pem) + Keys.SIGNATURE_SEPARATOR + utils.encrypt_data(plaintext, keys.owner_public_pem)
+
+
+def container_encrypt(plaintext: bytes, owner_public, org_private) -> bytearray:
+    # The upload path: frame by frame, signed over the incrementally hashed plaintext
+    writer = ContainerWriter(owner_public)
+    blob = bytearray(writer.header)
+    view = memoryview(plaintext)
+    for offset in range(0, len(plaintext), writer.chunk_size):
+        blob += writer.encrypt_chunk(view[offset:offset + writer.chunk_size])
+    blob += writer.finalize(utils.sign_digest(writer.plaintext_hash.digest(), org_private))
+    return blob
+
+
+def make_cases(keys: Keyring) -> list[Case]:
+    owner_public = utils.load_public_key(keys.owner_public_pem)
+    org_private = utils.load_private_key(keys.org_encrypted_private)
+    org_private_pem = utils.decrypt_private_key(keys.org_encrypted_private)
+    return [
+        Case("generate_encryption_key_pair", False, lambda data: (), utils.generate_encryption_key_pair),
+        Case("decrypt_private_key", False, lambda data: (keys.owner_encrypted_private,), utils.decrypt_private_key),
+        Case("compute_sha256sum", True, lambda data: (data,), utils.compute_sha256sum),
+        Case("encrypt_data", True, lambda data: (data, keys.owner_public_pem), utils.encrypt_data),
+        Case("sign_data", True, lambda data: (data, org_private_pem), utils.sign_data),
+        Case("decrypt_data_legacy", True,
+             lambda data: (legacy_blob(data, keys), keys.owner_encrypted_private, keys.org_public_pem), utils.decrypt_data),
+        Case("container_encrypt", True, lambda data: (data, owner_public, org_private), container_encrypt),
+        Case("decrypt_data_container", True,
+             lambda data: (bytes(container_encrypt(data, owner_public, org_private)), keys.owner_encrypted_private, keys.org_public_pem),
+             utils.decrypt_data),
+    ]
+
+
+def measure(case: Case, size: int, data: bytes, runs: int) -> dict:
+    args = case.prepare(data)
+    case.run(*args)  # warm-up: imports, key caches, first-touch page faults
+
+    stats = LatencyStats(window=runs)
+    for _ in range(runs):
+        started = time.perf_counter()
+        case.run(*args)
+        stats.record(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        case.run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    snapshot = stats.snapshot()
+    avg_seconds = snapshot["avg_ms"] / 1000
+    return {
+        "function": case.function,
+        "size": size if case.sized else 0,
+        "runs": runs,
+        "avg_ms": round(snapshot["avg_ms"], 3),
+        "p50_ms": round(snapshot["p50_ms"], 3),
+        "p95_ms": round(snapshot["p95_ms"], 3),
+        "p99_ms": round(snapshot["p99_ms"], 3),
+        "max_ms": round(snapshot["max_ms"], 3),
+        "throughput_mib_s": round(size / (1024 * 1024) / avg_seconds, 2) if case.sized and avg_seconds else None,
+        "peak_mem_mib": round(peak / (1024 * 1024), 3)
+    }
+
+
+def report(result: dict) -> None:
+    size = format_size(result["size"]) if result["size"] else "-"
+    throughput = f"{result['throughput_mib_s']:9.1f}MiB/s" if result["throughput_mib_s"] is not None else " " * 14
+    print(f"{result['function']:<30}{size:>6} p50={result['p50_ms']:10.2f}ms p95={result['p95_ms']:10.2f}ms "
+          f"max={result['max_ms']:10.2f}ms {throughput} peak_mem={result['peak_mem_mib']:9.2f}MiB")
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """
+    :return: one line per regression beyond `threshold` (0.10: 10% worse)
+    """
+    previous = {(row["function"], row["size"]): row for row in baseline["results"]}
+    regressions = []
+    print(f"\nAgainst the baseline of {baseline['meta']['created_at']} (p50 latency, peak memory):")
+    for row in results:
+        before = previous.get((row["function"], row["size"]))
+        if before is None:
+            continue
+        size = format_size(row["size"]) if row["size"] else "-"
+        changes = []
+        for field, floor in NOISE_FLOOR.items():
+            if before[field] <= 0:
+                continue
+            change = row[field] / before[field] - 1
+            changes.append(f"{field} {change:+7.1%}")
+            if change > threshold and row[field] - before[field] > floor:
+                regressions.append(f"{row['function']} {size}: {field} {before[field]} -> {row[field]} ({change:+.1%})")
+        print(f"  {row['function']:<30}{size:>6} {'  '.join(changes)}")
+    return regressions
+
+
+def main(sizes: list[int], runs: int, functions: set[str] | None, save: str | None, baseline: str | None, threshold: float) -> int:
+    owner_public_pem, owner_encrypted_private = utils.generate_encryption_key_pair()
+    org_public_pem, org_encrypted_private = utils.generate_encryption_key_pair()
+    keys = Keyring(owner_public_pem, owner_encrypted_private, org_public_pem, org_encrypted_private)
+    cases = [case for case in make_cases(keys) if functions is None or case.function in functions]
+
+    results = []
+    for case in (case for case in cases if not case.sized):
+        results.append(measure(case, 0, b"", runs))
+        report(results[-1])
+    for size in sizes:
+        data = os.urandom(size)  # random bytes: incompressible, like the PDFs and images uploaded
+        for case in (case for case in cases if case.sized):
+            results.append(measure(case, size, data, runs))
+            report(results[-1])
+        del data
+
+    output = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "cryptography": cryptography.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "chunk_size": Keys.CONTAINER_CHUNK_SIZE
+        },
+        "results": results
+    }
+    if save:
+        with open(save, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nSaved {len(results)} results to {save}")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions beyond {threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated, with K/M/G suffixes")
+    parser.add_argument("--runs", type=int, default=5, help="timed calls per function and size")
+    parser.add_argument("--functions", help="comma separated subset of the functions to run")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results saved in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed growth before a change counts as a regression")
+    args = parser.parse_args()
+    sys.exit(main(
+        sizes=[parse_size(size) for size in args.sizes.split(",")],
+        runs=args.runs,
+        functions=set(args.functions.split(",")) if args.functions else None,
+        save=args.save,
+        baseline=args.baseline,
+        threshold=args.threshold
+    ))
@@ -0,0 +1,125 @@
+"""
+Compare an owner's document listing read as full entities without a limit (payload included, the old
+behaviour) against one page of the joined projection used by the listing endpoints. A page of full
+entities is measured too, to separate the gain of paging from the gain of the projection.
+
+Seeds one owner with --documents documents carrying --payload-size bytes of inline payload in the
+DOCUSHIELD_DB_URL database, measures latency and peak Python memory of both reads, then deletes the
+seeded rows. Needs a schema at `alembic upgrade head`.
+
+    python -m benchmark.document_listing [--documents 5000] [--payload-size 65536] [--runs 5]
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import select, delete
+from sqlalchemy.orm import undefer
+
+from config.constants.keys import Keys
+from config.database import engine, async_session
+from config.schema_version import check_schema_version
+from repository.document_repository_impl import DocumentRepositoryImpl
+from schema.document_schema import DocumentSchema
+from schema.user_schema import UserSchema
+from util.enums import AccountType
+from util.latency_stats import LatencyStats
+
+INSERT_BATCH = 100
+
+
+async def seed(documents: int, payload_size: int) -> tuple[uuid.UUID, uuid.UUID]:
+    owner_id, uploader_id = uuid.uuid4(), uuid.uuid4()
+    async with async_session() as session:
+        for user_id, role in ((owner_id, AccountType.INDIVIDUAL), (uploader_id, AccountType.ORGANIZATION)):
+            session.add(UserSchema(
+                id=user_id, email=f"bench-{user_id}@example.com", name="Benchmark", password="-", role=role, is_active=False
+            ))
+        await session.commit()
+
+        now = int(time.time())
+        for start in range(0, documents, INSERT_BATCH):
+            session.add_all([
+                DocumentSchema(
+                    id=uuid.uuid4().hex + uuid.uuid4().hex,
+                    uploader_id=uploader_id,
+                    owner_id=owner_id,
+                    encrypted_data=os.urandom(payload_size),  # incompressible, like real ciphertext
+                    size=payload_size,
+                    content_type="application/pdf",
+                    created_at=now + i,
+                    title=f"Benchmark document {i}"
+                )
+                for i in range(start, min(start + INSERT_BATCH, documents))
+            ])
+            await session.commit()
+    return owner_id, uploader_id
+
+
+async def full_entities(owner_id: uuid.UUID, limit: int | None = None) -> int:
+    async with async_session() as session:
+        query = (
+            select(DocumentSchema)
+            .options(undefer(DocumentSchema.encrypted_data))
+            .where(DocumentSchema.owner_id == owner_id)
+            .order_by(DocumentSchema.created_at.desc())
+            .limit(limit)
+        )
+        return len((await session.execute(query)).scalars().all())
+
+
+async def full_entity_page(owner_id: uuid.UUID) -> int:
+    return await full_entities(owner_id, limit=Keys.PAGE_SIZE_MAX)
+
+
+async def listing_projection(owner_id: uuid.UUID) -> int:
+    async with async_session() as session:
+        rows, _ = await DocumentRepositoryImpl(db_session=session).get_listing_by_owner_id(
+            owner_id=owner_id, cursor=None, limit=Keys.PAGE_SIZE_MAX)
+        return len(rows)
+
+
+async def measure(label: str, read, owner_id: uuid.UUID, runs: int) -> None:
+    stats = LatencyStats(window=runs)
+    peak = 0
+    rows = 0
+    for _ in range(runs):
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = await read(owner_id)
+        stats.record(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    s = stats.snapshot()
+    print(f"{label:<22} rows={rows:<6} avg={s['avg_ms']:9.1f}ms p50={s['p50_ms']:9.1f}ms "
+          f"max={s['max_ms']:9.1f}ms peak_mem={peak / (1024 * 1024):8.1f}MiB")
+
+
+async def main(documents: int, payload_size: int, runs: int) -> None:
+    await check_schema_version(engine)
+
+    print(f"Seeding {documents:,} documents of {payload_size:,} bytes")
+    owner_id, uploader_id = await seed(documents, payload_size)
+    try:
+        await listing_projection(owner_id)  # warm the pool and the statement cache
+        await measure("full entities", full_entities, owner_id, runs)
+        await measure("full entity page", full_entity_page, owner_id, runs)
+        await measure("listing projection", listing_projection, owner_id, runs)
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(DocumentSchema).where(DocumentSchema.owner_id == owner_id))
+            await session.execute(delete(UserSchema).where(UserSchema.id.in_([owner_id, uploader_id])))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--payload-size", type=int, default=64 * 1024)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(documents=args.documents, payload_size=args.payload_size, runs=args.runs))
@@ -0,0 +1,363 @@
+"""
+End-to-end load test of the API under a mixed document workload.
+
+Creates a throwaway database on the Postgres server of DOCUSHIELD_DB_URL, migrates it to head,
+starts `uvicorn main:app` against it with --workers worker processes, and drives it over HTTP with
+--concurrency virtual users for --duration seconds. The database, blobs and logs are removed
+afterwards (unless --keep). With --url the harness targets a server that is already running instead.
+
+Each virtual user signs up an individual and an organization, then repeats the document lifecycle:
+the organization uploads a document for the individual (size drawn from --doc-sizes), the
+individual lists their documents, the organization requests access, the individual grants it and
+the organization downloads the document; with probability --signin-ratio an iteration starts with a
+sign-in. Per endpoint it reports throughput, error rate and p50/p95/p99 latency; it also reports the
+workers' event-loop lag (scraped from /metrics) and the harness's own, which should stay low for
+the numbers to be trusted.
+
+    python -m benchmark.load_test [--workers 1] [--concurrency 16] [--duration 60] [--warmup 10]
+                                  [--doc-sizes 16K:50,256K:30,2M:15,20M:5] [--signin-ratio 0.1]
+                                  [--url http://host:port] [--save results.json] [--keep]
+
+To find a saturation point, raise --concurrency across runs until throughput stops growing while
+p99 latency and loop lag climb; then repeat with more --workers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config.constants.keys import Keys
+from config.constants.urls import InternalURIs
+from util.latency_stats import LatencyStats
+from util.loop_lag import LoopLagMonitor
+
+PASSWORD = "load-test-password"
+READY_TIMEOUT = 60
+SCRAPE_INTERVAL = 1.0
+LAG_SAMPLE = re.compile(r'^docushield_event_loop_lag_(p99_ms|max_ms)\{pid="(\d+)"\} ([0-9.eE+-]+)$', re.MULTILINE)
+SIZE_UNITS = {"G": 1024 ** 3, "M": 1024 ** 2, "K": 1024}
+
+
+def parse_size(text_size: str) -> int:
+    text_size = text_size.strip().upper()
+    if text_size[-1] in SIZE_UNITS:
+        return int(float(text_size[:-1]) * SIZE_UNITS[text_size[-1]])
+    return int(text_size)
+
+
+def parse_distribution(spec: str) -> tuple[list[int], list[float]]:
+    """
+    :param spec: "size:weight,..." e.g. "16K:50,2M:5"
+    """
+    sizes, weights = [], []
+    for item in spec.split(","):
+        size, _, weight = item.partition(":")
+        sizes.append(parse_size(size))
+        weights.append(float(weight or 1))
+    return sizes, weights
+
+
+class Recorder:
+    """
+    Latency and outcome per endpoint; requests finishing before `measure_from` (the warm-up) are not counted
+    """
+    def __init__(self):
+        self.measure_from = 0.0
+        self.latency: dict[str, LatencyStats] = defaultdict(lambda: LatencyStats(window=1_000_000))
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status: int) -> None:
+        if time.monotonic() < self.measure_from:
+            return
+        self.latency[endpoint].record(seconds)
+        self.statuses[endpoint][status] += 1
+        if status >= 400 or status == 0:
+            self.errors[endpoint] += 1
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, recorder: Recorder, sizes: list[int], weights: list[float], signin_ratio: float):
+        self.recorder = recorder
+        self.sizes = sizes
+        self.weights = weights
+        self.signin_ratio = signin_ratio
+        limits = httpx.Limits(max_connections=1)
+        timeout = httpx.Timeout(120.0)
+        self.individual = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout)
+        self.organization = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout)
+        self.tag = uuid.uuid4().hex[:12]
+        self.individual_id: str | None = None
+        self.individual_public_key: str | None = None
+
+    async def close(self) -> None:
+        await self.individual.aclose()
+        await self.organization.aclose()
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.monotonic()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, time.monotonic() - started, 0)
+            return None
+        self.recorder.record(endpoint, time.monotonic() - started, response.status_code)
+        return response
+
+    async def sign_up(self, client: httpx.AsyncClient, role: str) -> bool:
+        body = {"email": f"load-{role.lower()}-{self.tag}@example.com", "password": PASSWORD, "name": f"Load {role.title()}", "account_type": role}
+        response = await self.call(client, "POST signup", "POST", InternalURIs.SIGN_UP_V1, json=body)
+        if response is None or response.status_code != 200:
+            return False
+        # Set by hand: the cookie may be Secure, which httpx would not send over plain http
+        client.cookies.set("access_token", response.cookies["access_token"])
+        return True
+
+    async def sign_in(self, client: httpx.AsyncClient, role: str) -> None:
+        body = {"email": f"load-{role.lower()}-{self.tag}@example.com", "password": PASSWORD}
+        response = await self.call(client, "POST signin", "POST", InternalURIs.SIGN_IN_V1, json=body)
+        if response is not None and response.status_code == 200:
+            client.cookies.set("access_token", response.cookies["access_token"])
+
+    async def set_up(self) -> bool:
+        if not (await self.sign_up(self.individual, "INDIVIDUAL") and await self.sign_up(self.organization, "ORGANIZATION")):
+            return False
+        me = await self.call(self.individual, "GET me", "GET", InternalURIs.ME_V1)
+        public_key = await self.call(self.individual, "GET pubkey", "GET", InternalURIs.PUBLIC_KEY_V1)
+        if me is None or public_key is None or me.status_code != 200 or public_key.status_code != 200:
+            return False
+        self.individual_id = me.json()["user_id"]
+        self.individual_public_key = public_key.json()["public_key"]
+        return True
+
+    async def iterate(self) -> None:
+        if random.random() < self.signin_ratio:
+            await self.sign_in(self.organization, "ORGANIZATION")
+
+        size = random.choices(self.sizes, self.weights)[0]
+        title = f"load-{uuid.uuid4().hex[:8]}"
+        form = {"title": title, "owner_id": self.individual_id, "owner_public_key": self.individual_public_key}
+        files = {"file": (f"{title}.pdf", os.urandom(size), "application/pdf")}
+        upload = await self.call(self.organization, f"POST document ({size // 1024}K)", "POST", InternalURIs.DOCUMENT_V1, data=form, files=files)
+        if upload is None or upload.status_code != 200:
+            return
+
+        listing = await self.call(self.individual, "GET document", "GET", InternalURIs.DOCUMENT_V1, params={"limit": 10})
+        if listing is None or listing.status_code != 200:
+            return
+        document = next((item for item in listing.json()["items"] if item["title"] == title), None)
+        if document is None:
+            return
+
+        body = {"document_id": document["id"], "owner_id": self.individual_id}
+        request_access = await self.call(self.organization, "POST request-access", "POST", InternalURIs.REQUEST_ACCESS_V1, json=body)
+        if request_access is None or request_access.status_code != 200:
+            return
+
+        pending = await self.call(self.individual, "GET grant", "GET", InternalURIs.GRANT_ACCESS_V1)
+        if pending is None or pending.status_code != 200:
+            return
+        for item in pending.json()["items"]:
+            await self.call(self.individual, "POST grant", "POST", InternalURIs.GRANT_ACCESS_V1,
+                            json={"access_id": item["request_id"], "approve": True})
+            await self.call(self.organization, f"GET download ({size // 1024}K)", "GET", InternalURIs.DOWNLOAD_V1,
+                            params={"access_id": item["request_id"]})
+
+    async def run(self, deadline: float) -> None:
+        try:
+            if not await self.set_up():
+                return
+            while time.monotonic() < deadline:
+                await self.iterate()
+        finally:
+            await self.close()
+
+
+async def scrape_lag(base_url: str, deadline: float, lag_by_pid: dict[str, dict[str, float]]) -> None:
+    """
+    Samples the workers' event-loop lag from /metrics. Each scrape reaches whichever worker accepts its
+    connection (a new one every time), so with several workers an idle one may never be reported
+    """
+    headers = {"Authorization": f"Bearer {Keys.METRICS_TOKEN}"} if Keys.METRICS_TOKEN else {}
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=10.0, headers=headers, limits=limits) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(InternalURIs.METRICS)
+                for field, pid, value in LAG_SAMPLE.findall(response.text):
+                    sample = lag_by_pid.setdefault(pid, {"p99_ms": 0.0, "max_ms": 0.0})
+                    sample[field] = max(sample[field], float(value))
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(SCRAPE_INTERVAL)
+
+
+async def create_database(admin_url: str) -> str:
+    name = f"docushield_load_{uuid.uuid4().hex[:8]}"
+    engine = create_async_engine(admin_url, isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    finally:
+        await engine.dispose()
+    return make_url(admin_url).set(database=name).render_as_string(hide_password=False)
+
+
+async def drop_database(admin_url: str, database_url: str) -> None:
+    name = make_url(database_url).database
+    engine = create_async_engine(admin_url, isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    finally:
+        await engine.dispose()
+
+
+def start_server(database_url: str, workers: int, port: int, workdir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        Keys.DATABASE_ENV_KEY: database_url,
+        "BLOB_STORE_PATH": os.path.join(workdir, "blobs"),
+        "AUDIT_ARCHIVE_PATH": os.path.join(workdir, "audit_archive"),
+        "LOG_PATH": os.path.join(workdir, "logs"),
+    }
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True, capture_output=True)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--no-access-log", "--log-level", "warning"],
+        env=env
+    )
+
+
+async def wait_until_ready(base_url: str, server: subprocess.Popen | None) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT
+    async with httpx.AsyncClient(base_url=base_url, timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise RuntimeError(f"Server exited with {server.returncode} before becoming ready")
+            try:
+                await client.get(InternalURIs.ME_V1)  # 403 without a session: the app is serving
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {READY_TIMEOUT}s")
+
+
+def report(recorder: Recorder, elapsed: float, server_lag: dict, client_lag: LoopLagMonitor, settings: dict) -> dict:
+    rows = []
+    print(f"\n{'endpoint':<28}{'count':>8}{'req/s':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for endpoint in sorted(recorder.latency):
+        s = recorder.latency[endpoint].snapshot()
+        errors = recorder.errors[endpoint]
+        row = {
+            "endpoint": endpoint,
+            "count": s["count"],
+            "rps": round(s["count"] / elapsed, 2),
+            "error_rate": round(errors / s["count"], 4) if s["count"] else 0.0,
+            "statuses": dict(recorder.statuses[endpoint]),
+            **{key: round(s[key], 2) for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")}
+        }
+        rows.append(row)
+        print(f"{endpoint:<28}{row['count']:>8}{row['rps']:>9.1f}{row['error_rate']:>8.1%}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}")
+
+    total = sum(row["count"] for row in rows)
+    total_errors = sum(recorder.errors.values())
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+          f"{(total_errors / total if total else 0):.2%} errors")
+    for pid, lag in sorted(server_lag.items()):
+        print(f"worker {pid} event-loop lag: p99 {lag['p99_ms']:.1f}ms, max {lag['max_ms']:.1f}ms")
+    harness_lag = client_lag.lag.snapshot()
+    print(f"harness event-loop lag: p99 {harness_lag['p99_ms']:.1f}ms, max {harness_lag['max_ms']:.1f}ms")
+    if harness_lag["p99_ms"] > 50:
+        print("warning: the harness itself is saturated; run it on another machine or lower --concurrency")
+
+    return {
+        "settings": settings,
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "error_rate": round(total_errors / total, 4) if total else 0.0,
+        "endpoints": rows,
+        "server_loop_lag": server_lag,
+        "harness_loop_lag": harness_lag
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    sizes, weights = parse_distribution(args.doc_sizes)
+    admin_url = os.getenv(Keys.DATABASE_ENV_KEY)
+    server, database_url, workdir = None, None, None
+    base_url = args.url
+    try:
+        if base_url is None:
+            if not admin_url:
+                raise RuntimeError(f"Set {Keys.DATABASE_ENV_KEY} to a Postgres server the harness may create a database on")
+            workdir = tempfile.mkdtemp(prefix="docushield-load-")
+            database_url = await create_database(admin_url)
+            print(f"Starting {args.workers} worker(s) on port {args.port} against {make_url(database_url).database}")
+            server = start_server(database_url, args.workers, args.port, workdir)
+            base_url = f"http://127.0.0.1:{args.port}"
+        await wait_until_ready(base_url, server)
+
+        recorder = Recorder()
+        client_lag = LoopLagMonitor(interval=0.05)
+        client_lag.start()
+        started = time.monotonic()
+        recorder.measure_from = started + args.warmup
+        deadline = recorder.measure_from + args.duration
+        server_lag: dict[str, dict[str, float]] = {}
+        print(f"Running {args.concurrency} virtual users for {args.warmup}s warm-up + {args.duration}s")
+        users = [VirtualUser(base_url, recorder, sizes, weights, args.signin_ratio) for _ in range(args.concurrency)]
+        await asyncio.gather(scrape_lag(base_url, deadline, server_lag), *(user.run(deadline) for user in users))
+        elapsed = time.monotonic() - recorder.measure_from
+        await client_lag.stop()
+
+        settings = {key: value for key, value in vars(args).items() if key not in ("save", "keep")}
+        result = report(recorder, elapsed, server_lag, client_lag, settings)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"Saved results to {args.save}")
+        return 0
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if database_url is not None and not args.keep:
+            await drop_database(admin_url, database_url)
+        if workdir is not None and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users, each running one request at a time")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="seconds run before measuring")
+    parser.add_argument("--doc-sizes", default="16K:50,256K:30,2M:15,20M:5", help="upload size distribution, size:weight,...")
+    parser.add_argument("--signin-ratio", type=float, default=0.1, help="share of iterations starting with a sign-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="keep the throwaway database and files")
+    sys.exit(asyncio.run(main(parser.parse_args())))
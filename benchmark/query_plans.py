@@ -0,0 +1,198 @@
+"""
+EXPLAIN-based regression check for the repository queries.
+
+Runs every repository read and maintenance query against the DOCUSHIELD_DB_URL database inside a
+transaction that is rolled back, captures the SQL each one sends, and EXPLAINs it with sequential
+scans and explicit sorts disabled. A query that still plans a Seq Scan or a Sort has no index
+serving its filter or its order, which on a large table means a full scan; a query whose plan does
+not use its expected index has lost it. Either fails the check.
+
+Needs a schema at `alembic upgrade head`; the tables may be empty.
+
+    python -m benchmark.query_plans [--verbose]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import engine, async_session
+from config.schema_version import check_schema_version
+from model.audit_log_query import AuditLogQuery
+from repository.access_request_repository_impl import AccessHistoryRepositoryImpl, ACCESS_REQUEST_PAGE_KEY
+from repository.audit_log_repository_impl import AuditLogRepositoryImpl, AUDIT_LOG_PAGE_KEY
+from repository.auth_log_repository_impl import AuthLogsRepositoryImpl
+from repository.auth_token_repository_impl import AuthTokenRepositoryImpl
+from repository.document_repository_impl import DocumentRepositoryImpl, DOCUMENT_PAGE_KEY
+from repository.encryption_key_store_repository_impl import EncryptionKeyStoreRepositoryImpl
+from repository.user_repository_impl import UserRepositoryImpl
+from util.pagination import encode_cursor
+
+
+class Check(NamedTuple):
+    label: str
+    run: Callable[[AsyncSession], Awaitable]
+    expected_index: str | None  # None: a sequential scan is accepted, see the note on the check
+
+
+USER_ID = uuid.uuid4()
+DOCUMENT_ID = uuid.uuid4().hex * 2
+DIGEST = "0" * 64
+NOW = int(time.time())
+DOCUMENT_CURSOR = encode_cursor([NOW, DOCUMENT_ID])
+ACCESS_CURSOR = encode_cursor([NOW, uuid.uuid4()])
+AUDIT_CURSOR = encode_cursor([NOW, 1])
+USER_AUDIT = AuditLogQuery(user_id=USER_ID, since=NOW - 86400, until=NOW)
+DOCUMENT_AUDIT = AuditLogQuery(doc_id=DOCUMENT_ID)
+assert len(DOCUMENT_PAGE_KEY) == len(ACCESS_REQUEST_PAGE_KEY) == len(AUDIT_LOG_PAGE_KEY) == 2
+
+# Index of each audit_log partition -> the partitioned index it is attached to
+PARTITION_INDEXES = text("""
+    SELECT c.relname AS name, p.relname AS parent FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent
+    WHERE c.relkind = 'i'
+""")
+
+
+async def drain(rows: AsyncIterator) -> None:
+    async for _ in rows:
+        pass
+
+
+CHECKS = (
+    Check("user.find_by_email", lambda s: UserRepositoryImpl(s).find_by_email("bench@example.com"), "user_email_key"),
+    Check("user.find_by_id", lambda s: UserRepositoryImpl(s).find_by_id(USER_ID), "user_pkey"),
+    Check("user.find_all_name_by_user_id", lambda s: UserRepositoryImpl(s).find_all_name_by_user_id([USER_ID]), "user_pkey"),
+    Check("user.find_all_role_by_user_id", lambda s: UserRepositoryImpl(s).find_all_role_by_user_id([USER_ID]), "user_pkey"),
+
+    Check("auth_token.find_by_token_digest", lambda s: AuthTokenRepositoryImpl(s).find_by_token_digest(DIGEST), "ix_auth_token_token_digest"),
+    Check("auth_token.delete", lambda s: AuthTokenRepositoryImpl(s).delete(DIGEST), "ix_auth_token_token_digest"),
+    Check("auth_token.delete_expired", lambda s: AuthTokenRepositoryImpl(s).delete_expired(now=NOW, limit=1000), "ix_auth_token_expires_at"),
+
+    Check("auth_logs.get", lambda s: AuthLogsRepositoryImpl(s).get(USER_ID), "auth_logs_pkey"),
+    # One row per user, swept in the background every few minutes; not worth an index on blocked_until
+    Check("auth_logs.reset_stale", lambda s: AuthLogsRepositoryImpl(s).reset_stale(now=NOW, stale_before=NOW, limit=1000), None),
+
+    Check("encryption_key_store.get_public_key_by_user_id",
+          lambda s: EncryptionKeyStoreRepositoryImpl(s).get_public_key_by_user_id(USER_ID), "encryption_key_store_pkey"),
+    Check("encryption_key_store.get_private_key_by_user_id",
+          lambda s: EncryptionKeyStoreRepositoryImpl(s).get_private_key_by_user_id(USER_ID), "encryption_key_store_pkey"),
+    Check("encryption_key_store.get_public_keys_by_user_ids",
+          lambda s: EncryptionKeyStoreRepositoryImpl(s).get_public_keys_by_user_ids([USER_ID]), "encryption_key_store_pkey"),
+
+    Check("document.get_metadata_by_id", lambda s: DocumentRepositoryImpl(s).get_metadata_by_id(DOCUMENT_ID), "document_pkey"),
+    Check("document.get_encrypted_data", lambda s: DocumentRepositoryImpl(s).get_encrypted_data(DOCUMENT_ID), "document_pkey"),
+    Check("document.get_listing_by_owner_id",
+          lambda s: DocumentRepositoryImpl(s).get_listing_by_owner_id(USER_ID, cursor=None, limit=50), "ix_document_owner_id_created_at_id"),
+    Check("document.get_listing_by_owner_id (cursor)",
+          lambda s: DocumentRepositoryImpl(s).get_listing_by_owner_id(USER_ID, cursor=DOCUMENT_CURSOR, limit=50), "ix_document_owner_id_created_at_id"),
+    Check("document.get_listing_by_uploader_id",
+          lambda s: DocumentRepositoryImpl(s).get_listing_by_uploader_id(USER_ID, cursor=None, limit=50), "ix_document_uploader_id_created_at_id"),
+    Check("document.get_listing_by_uploader_id (cursor)",
+          lambda s: DocumentRepositoryImpl(s).get_listing_by_uploader_id(USER_ID, cursor=DOCUMENT_CURSOR, limit=50), "ix_document_uploader_id_created_at_id"),
+
+    Check("access_request.get_by_id", lambda s: AccessHistoryRepositoryImpl(s).get_by_id(uuid.uuid4()), "access_request_pkey"),
+    Check("access_request.mark_completed", lambda s: AccessHistoryRepositoryImpl(s).mark_completed(uuid.uuid4()), "access_request_pkey"),
+    Check("access_request.get_history_by_owner_id",
+          lambda s: AccessHistoryRepositoryImpl(s).get_history_by_owner_id(USER_ID, cursor=None, limit=50), "ix_access_request_owner_id_requested_at_id"),
+    Check("access_request.get_history_by_owner_id (cursor)",
+          lambda s: AccessHistoryRepositoryImpl(s).get_history_by_owner_id(USER_ID, cursor=ACCESS_CURSOR, limit=50), "ix_access_request_owner_id_requested_at_id"),
+    Check("access_request.get_pending_details_by_owner_id",
+          lambda s: AccessHistoryRepositoryImpl(s).get_pending_details_by_owner_id(USER_ID, cursor=None, limit=50), "ix_access_request_pending_owner_id_requested_at_id"),
+    Check("access_request.get_status_details_by_requester_id",
+          lambda s: AccessHistoryRepositoryImpl(s).get_status_details_by_requester_id(USER_ID, cursor=ACCESS_CURSOR, limit=50), "ix_access_request_requester_id_requested_at_id"),
+
+    Check("audit_log.get_page (user)",
+          lambda s: AuditLogRepositoryImpl(s).get_page(USER_AUDIT, cursor=AUDIT_CURSOR, limit=50), "ix_audit_log_user_id_timestamp"),
+    Check("audit_log.get_page (document)",
+          lambda s: AuditLogRepositoryImpl(s).get_page(DOCUMENT_AUDIT, cursor=None, limit=50), "ix_audit_log_doc_id_timestamp"),
+    Check("audit_log.stream_after (user)",
+          lambda s: drain(AuditLogRepositoryImpl(s).stream_after(USER_AUDIT, after=(NOW, 1), limit=5000)), "ix_audit_log_user_id_timestamp"),
+    Check("audit_log.stream_after (document)",
+          lambda s: drain(AuditLogRepositoryImpl(s).stream_after(DOCUMENT_AUDIT, after=None, limit=5000)), "ix_audit_log_doc_id_timestamp"),
+)
+
+
+def walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+async def capture(session: AsyncSession, run: Callable[[AsyncSession], Awaitable]) -> list[tuple[str, tuple]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        await run(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+async def explain(session: AsyncSession, statement: str, parameters: tuple) -> dict:
+    conn = await session.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+async def run_check(check: Check, parents: dict[str, str], verbose: bool) -> bool:
+    async with async_session() as session:
+        try:
+            statements = await capture(session, check.run)
+            # Planner settings: with these off, a Seq Scan or Sort in the plan means no index can serve the query
+            await session.execute(text("SET LOCAL enable_seqscan = off"))
+            await session.execute(text("SET LOCAL enable_sort = off"))
+
+            problems, indexes = [], set()
+            for statement, parameters in statements:
+                for node in walk(await explain(session, statement, parameters)):
+                    if "Index Name" in node:
+                        # A partitioned table is scanned through its partitions' indexes
+                        indexes.add(parents.get(node["Index Name"], node["Index Name"]))
+                    if node["Node Type"] == "Seq Scan" and check.expected_index is not None:
+                        problems.append(f"Seq Scan on {node['Relation Name']}")
+                    if node["Node Type"] == "Sort":
+                        problems.append(f"Sort on {', '.join(node['Sort Key'])}")
+            if check.expected_index is not None and check.expected_index not in indexes:
+                problems.append(f"expected index {check.expected_index} not used")
+        finally:
+            await session.rollback()
+
+    status = "FAIL" if problems else "ok"
+    print(f"{status:<5}{check.label:<52}{', '.join(sorted(indexes)) or 'no index'}")
+    for problem in problems:
+        print(f"       {problem}")
+    if verbose:
+        for statement, _ in statements:
+            print(f"       {' '.join(statement.split())}")
+    return not problems
+
+
+async def main(verbose: bool) -> int:
+    try:
+        await check_schema_version(engine)
+        async with engine.connect() as conn:
+            parents = {row.name: row.parent for row in await conn.execute(PARTITION_INDEXES)}
+        passed = [await run_check(check, parents, verbose) for check in CHECKS]
+    finally:
+        await engine.dispose()
+    print(f"{sum(passed)}/{len(passed)} queries served by their indexes")
+    return 0 if all(passed) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print the SQL of each query")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(verbose=args.verbose)))
@@ -1,4 +1,12 @@
 INVALID_DATABASE_URL = "'DOCUSHIELD_DB_URL' database environment variable is not found/set"
 ACCESS_DENIED_INVALID_TOKEN = "Access Denied! Invalid Token"
 INTERNAL_SERVER_ERROR = "Internal Server Error"
-ACCESS_DENIED_INVALID_ROLE = "Access denied: Insufficient Permission"
\ No newline at end of file
+ACCESS_DENIED_INVALID_ROLE = "Access denied: Insufficient Permission"
+SERVER_BUSY = "Server is busy. Please retry shortly"
+CLIENT_CLOSED_REQUEST = "Client closed request"
+INVALID_CURSOR = "Invalid pagination cursor"
+DOCUMENT_BATCH_MISMATCH = "Every file needs exactly one title, owner_id and owner_public_key, in the same order"
+DOCUMENT_ALREADY_EXISTS = "Document already exists"
+DOCUMENT_BATCH_TOO_LARGE = "A batch holds at most {max_files} files"
+SCHEMA_VERSION_MISMATCH = "Database schema is at revision {current}, this build expects {expected}. Run 'alembic upgrade head'"
+AUDIT_ACCESS_DENIED = "Access denied: audit trails are limited to your own activity and your documents"
\ No newline at end of file
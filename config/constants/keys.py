@@ -9,8 +9,68 @@ class Keys:
     if not JWT_SECRET:
         raise RuntimeError("'JWT_SECRET' TOKEN not found in Environment.")
     DATABASE_ENV_KEY = 'DOCUSHIELD_DB_URL'
+    READ_DATABASE_ENV_KEY = 'DOCUSHIELD_READ_DB_URL'  # optional read replica for the listing endpoints
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))  # per engine and worker process
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", -1))  # seconds before a connection is replaced; -1: never
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))  # prepared statements per connection; 0 behind pgbouncer
+    READ_YOUR_WRITES_WINDOW = int(os.getenv("READ_YOUR_WRITES_WINDOW", 5))  # seconds a writer's reads stay on the primary
     TOKEN_MAX_AGE = 7 * 24 * 60 * 60
     SIGNATURE_SEPARATOR = b'|||DOCUSHIELD_SIG|||'
     AES_RSA_SEPARATOR = b'|||DOCUSHIELD_HYBRID|||'
+    CONTAINER_MAGIC = b'DOCUSHLD'
+    CONTAINER_VERSION = 1
+    CONTAINER_CHUNK_SIZE = 256 * 1024
     MAX_RETRIES = 3
     BLOCK_DURATION_POST_MAX_RETRIES = 24 * 60 * 60
+    CRYPTO_PROCESS_WORKERS = int(os.getenv("CRYPTO_PROCESS_WORKERS", os.cpu_count() or 1))
+    CRYPTO_THREAD_WORKERS = int(os.getenv("CRYPTO_THREAD_WORKERS", 4))
+    CRYPTO_QUEUE_SIZE = int(os.getenv("CRYPTO_QUEUE_SIZE", 64))
+    CRYPTO_DISCONNECT_POLL_INTERVAL = 0.25
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
+    PASSWORD_HASH_RETRY_AFTER = 1
+    KEY_PAIR_POOL_SIZE = int(os.getenv("KEY_PAIR_POOL_SIZE", 8))
+    KEY_PAIR_POOL_RETRY_INTERVAL = 1.0
+    KEY_CACHE_SIZE = int(os.getenv("KEY_CACHE_SIZE", 1024))
+    KEY_CACHE_TTL = int(os.getenv("KEY_CACHE_TTL", 300))
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 10000))
+    SESSION_CACHE_MAX_TTL = int(os.getenv("SESSION_CACHE_MAX_TTL", 300))
+    SESSION_INVALIDATION_CHANNEL = os.getenv("SESSION_INVALIDATION_CHANNEL", "postgres")  # postgres | local
+    SESSION_NOTIFY_CHANNEL = "docushield_session_revoked"
+    SESSION_CHANNEL_RETRY_INTERVAL = 1.0
+    MAINTENANCE_INTERVAL = int(os.getenv("MAINTENANCE_INTERVAL", 300))
+    MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", 1000))
+    MAINTENANCE_LOCK_KEY = 0x446F6353  # pg advisory lock id shared by all workers
+    AUTH_LOG_STALE_AFTER = BLOCK_DURATION_POST_MAX_RETRIES
+    BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+    BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "blobs")
+    DOCUMENT_BATCH_MAX_FILES = int(os.getenv("DOCUMENT_BATCH_MAX_FILES", 100))
+    DOCUMENT_BATCH_CONCURRENCY = int(os.getenv("DOCUMENT_BATCH_CONCURRENCY", CRYPTO_THREAD_WORKERS))  # files encrypted at once per batch
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 200
+    ALEMBIC_CONFIG = os.getenv("ALEMBIC_CONFIG", "alembic.ini")
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_BATCH_SIZE = min(int(os.getenv("AUDIT_BATCH_SIZE", 500)), 5000)  # 6 bind params a row, Postgres allows 32767
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
+    AUDIT_DRAIN_TIMEOUT = 10.0
+    AUDIT_PARTITION_INTERVAL = int(os.getenv("AUDIT_PARTITION_INTERVAL", 3600))
+    AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", 3))  # months created ahead of the current one
+    AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", 24))  # 0 keeps every partition
+    AUDIT_PARTITION_LOCK_KEY = 0x446F6354  # pg advisory lock id shared by all workers
+    AUDIT_ARCHIVE_PATH = os.getenv("AUDIT_ARCHIVE_PATH", "audit_archive")
+    AUDIT_ARCHIVE_COMPRESSLEVEL = 6
+    AUDIT_EXPORT_BATCH_SIZE = int(os.getenv("AUDIT_EXPORT_BATCH_SIZE", 5000))  # rows per export transaction
+    AUDIT_EXPORT_FETCH_SIZE = 1000  # rows per server-side cursor fetch
+    LOG_PATH = os.getenv("LOG_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "logs"))
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "sqlalchemy=WARNING,asyncio=WARNING")  # per logger: "name=LEVEL,..."
+    LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")  # share of a noisy logger's records below WARNING kept: "name=0.1,..."
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_BACKUP_DAYS = int(os.getenv("LOG_BACKUP_DAYS", 14))
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+    STATEMENT_BUDGET = int(os.getenv("STATEMENT_BUDGET", 0))  # SQL statements per request before a warning; 0: off
+    LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.1))  # seconds between event-loop lag probes; 0: off
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # when set, /metrics requires "Authorization: Bearer <token>"
@@ -7,11 +7,15 @@ class InternalURIs:
     DOCUMENT_V1 = ME_V1 + "/document"
     DOCUMENT_DOWNLOAD_V1 = DOCUMENT_V1 + "/download"
     DOCUMENT_UPLOADS_V1 = DOCUMENT_V1 + "/upload"
+    DOCUMENT_BATCH_V1 = DOCUMENT_V1 + "/batch"
     ACCESS_HISTORY_V1 =  ME_V1 + "/access-history"
     REQUEST_ACCESS_V1 = ME_V1 + "/request-access"
     GRANT_ACCESS_V1 = ME_V1 + "/grant"
     REQUEST_STATUS_V1 = ME_V1 + "/request-status"
     DOWNLOAD_V1 = ME_V1 + "/download"
+    AUDIT_V1 = ME_V1 + "/audit"
+    AUDIT_EXPORT_V1 = AUDIT_V1 + "/export"
+    METRICS = "/metrics"
 
 class ExternalURLs:
     pass
@@ -1,17 +1,135 @@
 import os
+import time
 from typing import AsyncGenerator
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from config.constants.errors import INVALID_DATABASE_URL
 from config.constants.keys import Keys
+from util.logger import logger
+from util.metrics import observe_stage, count_event, STATEMENT_STAGE, COMMIT_EVENT
+from util.read_your_writes import mark_write, recently_wrote
 
 DATABASE_URL = os.getenv(Keys.DATABASE_ENV_KEY)
+READ_DATABASE_URL = os.getenv(Keys.READ_DATABASE_ENV_KEY)
 
 if not DATABASE_URL:
     raise RuntimeError(INVALID_DATABASE_URL)
 
-engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=False)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default async pool, recording how long each checkout waits for a connection
+    (and for opening one, on a miss) as the db.pool_checkout stage.
+    """
+    timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            observe_stage("db.pool_checkout", time.perf_counter() - started)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_size=Keys.DB_POOL_SIZE,
+        max_overflow=Keys.DB_MAX_OVERFLOW,
+        pool_timeout=Keys.DB_POOL_TIMEOUT,
+        pool_pre_ping=Keys.DB_POOL_PRE_PING,
+        pool_recycle=Keys.DB_POOL_RECYCLE,
+        # SQLAlchemy's prepared statement cache and asyncpg's own
+        connect_args={"prepared_statement_cache_size": Keys.DB_STATEMENT_CACHE_SIZE, "statement_cache_size": Keys.DB_STATEMENT_CACHE_SIZE}
+    )
+
+
+engine: AsyncEngine = _create_engine(DATABASE_URL)
+# The primary itself when no replica is configured
+read_engine: AsyncEngine = _create_engine(READ_DATABASE_URL) if READ_DATABASE_URL else engine
+
+
+class SqlStats:
+    """
+    Process-wide statement and commit counts, fed by the engine events below
+    """
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.slow = 0
+
+    def stats(self) -> dict:
+        return {"statements": self.statements, "commits": self.commits, "rollbacks": self.rollbacks, "slow": self.slow}
+
+
+sql_stats = SqlStats()
+
+
+def _redacted(parameters) -> str:
+    # Parameter values may be passwords, tokens or key material; log only their shape
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"[{len(parameters)} rows]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+def _before_cursor_execute(conn: Connection, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+    sql_stats.statements += 1
+    observe_stage(STATEMENT_STAGE, elapsed)
+    if elapsed * 1000 >= Keys.SLOW_QUERY_MS:
+        sql_stats.slow += 1
+        logger.warning(f"[SlowQuery] {elapsed * 1000:.1f}ms {' '.join(statement.split())} params={_redacted(parameters)}")
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get("statement_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _commit(conn: Connection) -> None:
+    sql_stats.commits += 1
+    count_event(COMMIT_EVENT)
+
+
+def _rollback(conn: Connection) -> None:
+    sql_stats.rollbacks += 1
+
+
+def _mark_write(conn: Connection) -> None:
+    mark_write()
+
+
+for _engine in {engine, read_engine}:
+    event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine.sync_engine, "handle_error", _handle_error)
+    event.listen(_engine.sync_engine, "commit", _commit)
+    event.listen(_engine.sync_engine, "rollback", _rollback)
+if read_engine is not engine:
+    event.listen(engine.sync_engine, "commit", _mark_write)
+
+
 async_session = async_sessionmaker(autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False)
+read_session = async_sessionmaker(autoflush=False, bind=read_engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -20,4 +138,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    For read-only endpoints: a session on the read replica, or on the primary when the caller committed
+    a write within READ_YOUR_WRITES_WINDOW seconds, which the replica may not have replayed yet.
+    """
+    sessionmaker = async_session if recently_wrote(request, Keys.READ_YOUR_WRITES_WINDOW) else read_session
+    async with sessionmaker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,32 @@
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config.constants.errors import SCHEMA_VERSION_MISMATCH
+from config.constants.keys import Keys
+from util.logger import logger
+
+
+async def check_schema_version(engine: AsyncEngine) -> None:
+    """
+    Refuse to start against a database that is behind this build's migrations. Reads the revision
+    alembic recorded instead of issuing DDL; migrations are applied with `alembic upgrade head`.
+    A revision this build does not know is assumed to be newer (a rolling deploy) and only logged.
+    :raises RuntimeError: if the schema is missing or behind
+    """
+    scripts = ScriptDirectory.from_config(Config(Keys.ALEMBIC_CONFIG))
+    expected = set(scripts.get_heads())
+
+    async with engine.connect() as conn:
+        current = set(await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).get_current_heads()))
+
+    if current == expected:
+        return
+
+    known = {script.revision for script in scripts.walk_revisions()}
+    if current and not current & known:
+        logger.warning(f"[Schema] Database is at unknown revision {sorted(current)}, assuming it is newer than {sorted(expected)}")
+        return
+
+    raise RuntimeError(SCHEMA_VERSION_MISMATCH.format(current=sorted(current) or "none", expected=sorted(expected)))
@@ -1,11 +1,12 @@
 from uuid import UUID
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Query
 from fastapi.params import Depends, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from aop.audit_log import audit_log
 from aop.require_role import require_role
+from config.constants.keys import Keys
 from config.constants.urls import InternalURIs
-from config.database import get_db
+from config.database import get_db, get_read_db
 from model.grant_access_request import GrantAccessRequest
 from model.request_access_payload import RequestAccessPayload
 from service import access_service, document_service
@@ -14,17 +15,17 @@ from util.enums import AccountType, AuditAction
 access_controller = APIRouter()
 
 @access_controller.get(InternalURIs.ACCESS_HISTORY_V1)
-async def get_access_history(request: Request, db_session: AsyncSession = Depends(get_db)):
-    # Individual gets their access history of all documents they own
+async def get_access_history(request: Request, cursor: str | None = None, limit: int = Query(Keys.PAGE_SIZE_DEFAULT, ge=1, le=Keys.PAGE_SIZE_MAX), db_session: AsyncSession = Depends(get_read_db)):
+    # Individual gets a page of the access history of all documents they own
     user_id = request.state.user_id
-    return await access_service.get_access_history(user_id=user_id, db_session=db_session)
+    return await access_service.get_access_history(user_id=user_id, cursor=cursor, limit=limit, db_session=db_session)
 
 
 @access_controller.get(InternalURIs.GRANT_ACCESS_V1)
-async def get_requested_access(request: Request, db_session: AsyncSession = Depends(get_db)):
-    # Individual (GETS) all pending requests
+async def get_requested_access(request: Request, cursor: str | None = None, limit: int = Query(Keys.PAGE_SIZE_DEFAULT, ge=1, le=Keys.PAGE_SIZE_MAX), db_session: AsyncSession = Depends(get_read_db)):
+    # Individual (GETS) a page of pending requests
     user_id = request.state.user_id
-    return await access_service.get_requested_access(user_id=user_id, db_session=db_session)
+    return await access_service.get_requested_access(user_id=user_id, cursor=cursor, limit=limit, db_session=db_session)
 
 
 @access_controller.post(InternalURIs.GRANT_ACCESS_V1)
@@ -44,19 +45,19 @@ async def grant_access(request: Request, access_request: GrantAccessRequest, db_
 async def request_access(request: Request, request_payload: RequestAccessPayload,  db_session: AsyncSession = Depends(get_db)):
     # Organization requests access to a document
     user_id = request.state.user_id
+    request.state.audit_doc_id = request_payload.document_id
     return await access_service.request_access(user_id=user_id, owner_id=request_payload.owner_id, document_id=request_payload.document_id, db_session=db_session)
 
 
 @access_controller.get(InternalURIs.REQUEST_STATUS_V1, dependencies=[Depends(require_role(AccountType.ORGANIZATION))])
-async def request_access_status(request: Request, db_session: AsyncSession = Depends(get_db)):
-    # Organization asks for all its historical requests
+async def request_access_status(request: Request, cursor: str | None = None, limit: int = Query(Keys.PAGE_SIZE_DEFAULT, ge=1, le=Keys.PAGE_SIZE_MAX), db_session: AsyncSession = Depends(get_read_db)):
+    # Organization asks for a page of its historical requests
     user_id = request.state.user_id
-    return await access_service.request_access_status(user_id=user_id, db_session=db_session)
+    return await access_service.request_access_status(user_id=user_id, cursor=cursor, limit=limit, db_session=db_session)
 
 
 @access_controller.get(InternalURIs.DOWNLOAD_V1, dependencies=[Depends(require_role(AccountType.ORGANIZATION))])
-@audit_log(AuditAction.DOWNLOADED_DOCUMENT)
 async def download_document(request: Request, access_id: UUID, db_session: AsyncSession = Depends(get_db)):
-    # Organization requests to download a document
+    # Organization requests to download a document; audited as DOWNLOADED_DOCUMENT once it has been verified
     user_id = request.state.user_id
-    return await document_service.document_download(user_id=user_id, access_id=access_id, db_session=db_session)
\ No newline at end of file
+    return await document_service.document_download(request=request, user_id=user_id, access_id=access_id, db_session=db_session)
\ No newline at end of file
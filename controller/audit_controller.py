@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Request, Query
+from fastapi.params import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.constants.keys import Keys
+from config.constants.urls import InternalURIs
+from config.database import get_db, get_read_db
+from model.audit_log_query import AuditLogQuery
+from model.audit_log_response import AuditLogResponse
+from model.page import Page
+from service import audit_service
+from util.enums import ExportFormat
+
+audit_controller = APIRouter()
+
+
+@audit_controller.get(InternalURIs.AUDIT_V1, response_model=Page[AuditLogResponse])
+async def get_audit_trail(request: Request, query: AuditLogQuery = Depends(), cursor: str | None = None, limit: int = Query(Keys.PAGE_SIZE_DEFAULT, ge=1, le=Keys.PAGE_SIZE_MAX), db_session: AsyncSession = Depends(get_read_db)):
+    # User gets a page of their own activity, or of the activity on a document they own or uploaded
+    user_id = request.state.user_id
+    return await audit_service.get_audit_trail(user_id=user_id, query=query, cursor=cursor, limit=limit, db_session=db_session)
+
+
+@audit_controller.get(InternalURIs.AUDIT_EXPORT_V1)
+async def export_audit_trail(request: Request, query: AuditLogQuery = Depends(), export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"), db_session: AsyncSession = Depends(get_db)):
+    # Same filters as the audit trail, streamed as a file of every matching row
+    user_id = request.state.user_id
+    return await audit_service.export_audit_trail(user_id=user_id, query=query, export_format=export_format, db_session=db_session)
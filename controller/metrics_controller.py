@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from config.constants.urls import InternalURIs
+from service import metrics_service
+
+metrics_controller = APIRouter()
+
+
+@metrics_controller.get(InternalURIs.METRICS, response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    # Prometheus scrape target; guarded by METRICS_TOKEN when one is configured
+    return PlainTextResponse(metrics_service.get_metrics(request=request), media_type="text/plain; version=0.0.4")
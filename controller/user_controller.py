@@ -1,14 +1,21 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import UploadFile, Form, Request, Depends, APIRouter
+from fastapi import UploadFile, Form, Request, Depends, APIRouter, Query, HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from starlette.datastructures import UploadFile as StarletteUploadFile
 
 from aop.audit_log import audit_log
 from aop.require_role import require_role
 from auth import auth_service
+from config.constants.errors import DOCUMENT_BATCH_MISMATCH
+from config.constants.keys import Keys
 from config.constants.urls import InternalURIs
-from config.database import get_db
+from config.database import get_db, get_read_db
+from model.document_batch_response import DocumentBatchResponse
 from model.document_response import DocumentResponse
 from model.document_upload_request import DocumentUploadRequest
+from model.page import Page
 from repository.document_repository import DocumentRepository
 from repository.document_repository_impl import DocumentRepositoryImpl
 from service import user_service, document_service
@@ -35,11 +42,11 @@ async def get_public_key(request: Request, db_session: AsyncSession = Depends(ge
     return await user_service.get_public_key(user_id=user_id, db_session=db_session)
 
 
-@user_controller.get(InternalURIs.DOCUMENT_V1, response_model=list[DocumentResponse])
-async def get_document_info(request: Request, db_session: AsyncSession = Depends(get_db)):
-    # Get document info
+@user_controller.get(InternalURIs.DOCUMENT_V1, response_model=Page[DocumentResponse])
+async def get_document_info(request: Request, cursor: str | None = None, limit: int = Query(Keys.PAGE_SIZE_DEFAULT, ge=1, le=Keys.PAGE_SIZE_MAX), db_session: AsyncSession = Depends(get_read_db)):
+    # Get a page of document info
     user_id = request.state.user_id
-    return await document_service.get_document_info(user_id=user_id, db_session=db_session)
+    return await document_service.get_document_info(user_id=user_id, cursor=cursor, limit=limit, db_session=db_session)
 
 
 @user_controller.get(InternalURIs.DOCUMENT_DOWNLOAD_V1)
@@ -71,6 +78,7 @@ async def add_document(
         owner_public_key=owner_public_key
     )
     return await document_service.add_document(
+        request=request,
         form_data=form_data,
         uploader_id=uploader_id,
         file=file,
@@ -78,8 +86,53 @@ async def add_document(
     )
 
 
-@user_controller.get(InternalURIs.DOCUMENT_UPLOADS_V1, dependencies=[Depends(require_role(AccountType.ORGANIZATION))])
-async def get_document_by_uploader_id(request: Request, db_session: AsyncSession = Depends(get_db)):
-    # Organization gets their own uploaded files.
+# The batch form is parsed by the endpoint, not by FastAPI, so it is described here for the OpenAPI docs
+DOCUMENT_BATCH_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["title", "owner_id", "owner_public_key", "file"],
+            "properties": {
+                "title": {"type": "array", "items": {"type": "string"}},
+                "owner_id": {"type": "array", "items": {"type": "string", "format": "uuid"}},
+                "owner_public_key": {"type": "array", "items": {"type": "string"}},
+                "file": {"type": "array", "items": {"type": "string", "format": "binary"}}
+            }
+        }}}
+    }
+}
+
+
+@user_controller.post(InternalURIs.DOCUMENT_BATCH_V1, response_model=DocumentBatchResponse, dependencies=[Depends(require_role(AccountType.ORGANIZATION))], openapi_extra=DOCUMENT_BATCH_FORM)
+async def add_documents(request: Request, db_session: AsyncSession = Depends(get_db)):
+    # Organization adds many documents, for any owners: each field is repeated once per file, in the order of the files.
+    # The limits are enforced while the multipart body is parsed, so an oversized batch is refused before it is spooled
+    uploader_id = request.state.user_id
+    async with request.form(max_files=Keys.DOCUMENT_BATCH_MAX_FILES, max_fields=3 * Keys.DOCUMENT_BATCH_MAX_FILES) as form:
+        files = form.getlist("file")
+        titles, owner_ids, owner_public_keys = form.getlist("title"), form.getlist("owner_id"), form.getlist("owner_public_key")
+        if (not files or not all(isinstance(f, StarletteUploadFile) for f in files)
+                or not len(files) == len(titles) == len(owner_ids) == len(owner_public_keys)):
+            raise HTTPException(status_code=400, detail=DOCUMENT_BATCH_MISMATCH)
+        try:
+            uploads = [
+                DocumentUploadRequest(title=t, owner_id=o, owner_public_key=k)
+                for t, o, k in zip(titles, owner_ids, owner_public_keys)
+            ]
+        except ValidationError as e:
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)])
+        return await document_service.add_documents(
+            request=request,
+            uploads=uploads,
+            files=files,
+            uploader_id=uploader_id,
+            db_session=db_session
+        )
+
+
+@user_controller.get(InternalURIs.DOCUMENT_UPLOADS_V1, response_model=Page[DocumentResponse], dependencies=[Depends(require_role(AccountType.ORGANIZATION))])
+async def get_document_by_uploader_id(request: Request, cursor: str | None = None, limit: int = Query(Keys.PAGE_SIZE_DEFAULT, ge=1, le=Keys.PAGE_SIZE_MAX), db_session: AsyncSession = Depends(get_read_db)):
+    # Organization gets a page of their own uploaded files.
     user_id = request.state.user_id
-    return await document_service.get_document_by_uploader_id(uploader_id=user_id, db_session=db_session)
+    return await document_service.get_document_by_uploader_id(uploader_id=user_id, cursor=cursor, limit=limit, db_session=db_session)
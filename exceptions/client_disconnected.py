@@ -0,0 +1,4 @@
+class ClientDisconnectedError(Exception):
+    def __init__(self, message="Client disconnected before the work completed"):
+        self.message = message
+        super().__init__(self.message)
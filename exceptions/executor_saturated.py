@@ -0,0 +1,4 @@
+class ExecutorSaturatedError(Exception):
+    def __init__(self, message="Worker pool queue is full"):
+        self.message = message
+        super().__init__(self.message)
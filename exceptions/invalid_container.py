@@ -0,0 +1,4 @@
+class InvalidContainerError(Exception):
+    def __init__(self, message="Malformed encrypted document container"):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,4 @@
+class InvalidCursorError(Exception):
+    def __init__(self, message="Invalid cursor"):
+        self.message = message
+        super().__init__(self.message)
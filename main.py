@@ -2,15 +2,44 @@ from util import logger
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-from config.database import engine, Base
+from config.constants.keys import Keys
+from config.database import engine
+from config.schema_version import check_schema_version
 import routes
+from auth.session_cache import session_cache
+from service.audit_partition_service import audit_partition_task
+from service.maintenance_service import maintenance_task
+from util.crypto_executor import crypto_executor, crypto_thread_executor, password_executor
+from util.audit_writer import audit_writer
+from util.key_pair_pool import key_pair_pool
+from util.loop_lag import loop_lag_monitor
+from util.metrics import MetricsMiddleware
+from util.read_your_writes import ReadYourWritesMiddleware
+from util.request_context import RequestContextMiddleware
 
 
 @asynccontextmanager
 async def lifespan(fastApiApp: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await check_schema_version(engine)
+    crypto_executor.start()
+    crypto_thread_executor.start()
+    password_executor.start()
+    key_pair_pool.start()
+    await session_cache.start()
+    audit_writer.start()
+    maintenance_task.start()
+    audit_partition_task.start()
+    loop_lag_monitor.start()
     yield
+    await loop_lag_monitor.stop()
+    await audit_partition_task.stop()
+    await maintenance_task.stop()
+    await audit_writer.stop()
+    await session_cache.stop()
+    await key_pair_pool.stop()
+    password_executor.shutdown()
+    crypto_thread_executor.shutdown()
+    crypto_executor.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -25,5 +54,8 @@ app.add_middleware(
     allow_methods=["*"],  # Allowed HTTP Methods
     allow_headers=["*"], # Allowed HTTP Headers
 )
+app.add_middleware(MetricsMiddleware, statement_budget=Keys.STATEMENT_BUDGET)
+app.add_middleware(ReadYourWritesMiddleware, window=Keys.READ_YOUR_WRITES_WINDOW)
+app.add_middleware(RequestContextMiddleware)  # outermost, so every log record of a request carries its id
 
 routes.register(app)
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Move auth_token from the raw JWT column to an indexed SHA-256 token_digest.
+
+Run from the repository root, before starting the new application version:
+
+    python -m migration.auth_token_digest [--batch-size 10000] [--keep-token-column]
+
+Each step is idempotent, so an interrupted run can be repeated:
+1. Add a nullable token_digest column and drop NOT NULL on token (new code stops writing it).
+2. Backfill digests in short batches, committing each one so locks stay brief on a large table.
+3. Delete duplicate digests, keeping the newest row of each: tokens issued before `jti` to the same
+   user within one second are byte-identical.
+4. Build the unique digest index and the user_id index CONCURRENTLY (replacing an INVALID one left by
+   a failed build), then set token_digest NOT NULL.
+5. Drop the token column unless --keep-token-column is given.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config.database import engine
+from util.logger import logger
+
+BACKFILL_BATCH = text("""
+    UPDATE auth_token SET token_digest = encode(sha256(convert_to(token, 'UTF8')), 'hex')
+    WHERE id IN (
+        SELECT id FROM auth_token WHERE token_digest IS NULL ORDER BY id LIMIT :batch_size
+    )
+""")
+
+
+DELETE_DUPLICATE_DIGESTS = text("""
+    DELETE FROM auth_token a USING auth_token b
+    WHERE a.token_digest = b.token_digest AND a.id < b.id
+""")
+
+INVALID_INDEX = text("""
+    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace AND NOT i.indisvalid
+""")
+
+
+async def drop_if_invalid(conn: AsyncConnection, index: str) -> None:
+    # A failed CONCURRENTLY build leaves an INVALID index behind, which IF NOT EXISTS would then skip
+    if (await conn.execute(INVALID_INDEX, {"name": index})).first() is not None:
+        logger.warning(f"[auth_token_digest] Dropping invalid index {index}")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index}"))
+
+
+async def column_exists(conn: AsyncConnection, column: str) -> bool:
+    result = await conn.execute(
+        text("SELECT 1 FROM information_schema.columns WHERE table_name = 'auth_token' AND column_name = :column"),
+        {"column": column}
+    )
+    return result.scalar() is not None
+
+
+async def migrate(batch_size: int, keep_token_column: bool) -> None:
+    async with engine.connect() as connection:
+        conn = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        has_token = await column_exists(conn, "token")
+
+        # 1. Prepare columns
+        await conn.execute(text("ALTER TABLE auth_token ADD COLUMN IF NOT EXISTS token_digest VARCHAR(64)"))
+        if has_token:
+            await conn.execute(text("ALTER TABLE auth_token ALTER COLUMN token DROP NOT NULL"))
+
+            # 2. Backfill in batches, each UPDATE commits on its own
+            total = 0
+            started = time.monotonic()
+            while True:
+                result = await conn.execute(BACKFILL_BATCH, {"batch_size": batch_size})
+                if result.rowcount == 0:
+                    break
+                total += result.rowcount
+                logger.info(f"[auth_token_digest] Backfilled {total} rows")
+            print(f"Backfilled {total} rows in {time.monotonic() - started:.1f}s")
+
+        # 3. Identical legacy tokens share a digest; either row authenticates the same JWT
+        result = await conn.execute(DELETE_DUPLICATE_DIGESTS)
+        if result.rowcount:
+            print(f"Deleted {result.rowcount} rows with a duplicate token_digest")
+
+        # 4. Indexes without blocking writers; names match what SQLAlchemy generates for the schema
+        await drop_if_invalid(conn, "ix_auth_token_token_digest")
+        await drop_if_invalid(conn, "ix_auth_token_user_id")
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_auth_token_token_digest ON auth_token (token_digest)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_auth_token_user_id ON auth_token (user_id)"
+        ))
+        await conn.execute(text("ALTER TABLE auth_token ALTER COLUMN token_digest SET NOT NULL"))
+
+        # 5. The raw JWT is no longer needed at rest
+        if has_token and not keep_token_column:
+            await conn.execute(text("ALTER TABLE auth_token DROP COLUMN token"))
+
+    await engine.dispose()
+    print("auth_token migration complete")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--keep-token-column", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(migrate(batch_size=args.batch_size, keep_token_column=args.keep_token_column))
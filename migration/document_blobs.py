@@ -0,0 +1,74 @@
+"""
+Move inline document payloads (document.encrypted_data) into the blob store.
+
+Run from the repository root with the same BLOB_STORE_* settings as the application:
+
+    python -m migration.document_blobs [--batch-size 50]
+
+Each step is idempotent, so an interrupted run can be repeated:
+1. Add the nullable blob_ref column and drop NOT NULL on encrypted_data.
+2. Walk documents still holding an inline payload in id order, a batch at a time. Each payload is
+   written to the blob store before its row is switched to blob_ref and the inline copy is cleared,
+   and each batch commits on its own.
+The freed TOAST space is reused by Postgres; run VACUUM FULL document (which locks the table)
+if it must be returned to the operating system.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from config.database import engine
+from storage.blob_store import blob_store
+from util.logger import logger
+
+SELECT_BATCH = text("""
+    SELECT id, encrypted_data FROM document
+    WHERE blob_ref IS NULL AND encrypted_data IS NOT NULL AND id > :last_id
+    ORDER BY id LIMIT :batch_size
+""")
+
+MOVE_ROW = text("""
+    UPDATE document SET blob_ref = :blob_ref, encrypted_data = NULL
+    WHERE id = :id AND blob_ref IS NULL
+""")
+
+
+async def migrate(batch_size: int) -> None:
+    async with engine.connect() as conn:
+        # 1. Prepare columns
+        await conn.execute(text("ALTER TABLE document ADD COLUMN IF NOT EXISTS blob_ref VARCHAR(64)"))
+        await conn.execute(text("ALTER TABLE document ALTER COLUMN encrypted_data DROP NOT NULL"))
+        await conn.commit()
+
+        # 2. Move payloads batch by batch, keyed on id so each batch is an index range scan
+        moved, moved_bytes, last_id = 0, 0, ""
+        started = time.monotonic()
+        while True:
+            rows = (await conn.execute(SELECT_BATCH, {"last_id": last_id, "batch_size": batch_size})).all()
+            await conn.commit()  # do not hold a snapshot open while writing blobs
+            if not rows:
+                break
+
+            updates = []
+            for document_id, encrypted_data in rows:
+                blob_ref = await blob_store.put(encrypted_data)
+                updates.append({"id": document_id, "blob_ref": blob_ref})
+                moved_bytes += len(encrypted_data)
+
+            await conn.execute(MOVE_ROW, updates)
+            await conn.commit()
+            moved += len(rows)
+            last_id = rows[-1][0]
+            logger.info(f"[document_blobs] Moved {moved} documents ({moved_bytes} bytes)")
+
+    await engine.dispose()
+    print(f"Moved {moved} documents ({moved_bytes / (1024 * 1024):.1f} MiB) in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(migrate(batch_size=args.batch_size))
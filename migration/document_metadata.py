@@ -0,0 +1,86 @@
+"""
+Add document.size and document.content_type, and backfill size for existing documents.
+
+Run from the repository root with the same BLOB_STORE_* settings as the application:
+
+    python -m migration.document_metadata [--batch-size 200]
+
+Sizes are read from the container frame headers, so no key is needed. Documents in the legacy
+separator format, and all existing content types, stay NULL because they were never recorded.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from config.database import engine
+from exceptions.invalid_container import InvalidContainerError
+from storage.blob_store import blob_store
+from util.container import ContainerReader, is_container
+from util.logger import logger
+
+SELECT_BATCH = text("""
+    SELECT id, blob_ref FROM document
+    WHERE size IS NULL AND id > :last_id
+    ORDER BY id LIMIT :batch_size
+""")
+
+SET_SIZE = text("UPDATE document SET size = :size WHERE id = :id AND size IS NULL")
+
+
+async def read_size(conn, document_id: str, blob_ref: str | None) -> int | None:
+    if blob_ref:
+        payload = await blob_store.read(blob_ref)
+    else:
+        payload = (await conn.execute(
+            text("SELECT encrypted_data FROM document WHERE id = :id"), {"id": document_id}
+        )).scalar()
+    if payload is None or not is_container(payload):
+        return None
+    try:
+        return ContainerReader(payload).plaintext_length
+    except InvalidContainerError as e:
+        logger.warning(f"[document_metadata] Unreadable container for document {document_id}: {e}")
+        return None
+
+
+async def migrate(batch_size: int) -> None:
+    async with engine.connect() as conn:
+        # 1. Prepare columns
+        await conn.execute(text("ALTER TABLE document ADD COLUMN IF NOT EXISTS size BIGINT"))
+        await conn.execute(text("ALTER TABLE document ADD COLUMN IF NOT EXISTS content_type VARCHAR(255)"))
+        await conn.commit()
+
+        # 2. Backfill sizes batch by batch, keyed on id
+        updated, skipped, last_id = 0, 0, ""
+        started = time.monotonic()
+        while True:
+            rows = (await conn.execute(SELECT_BATCH, {"last_id": last_id, "batch_size": batch_size})).all()
+            if not rows:
+                await conn.commit()
+                break
+
+            updates = []
+            for document_id, blob_ref in rows:
+                size = await read_size(conn, document_id, blob_ref)
+                if size is None:
+                    skipped += 1
+                else:
+                    updates.append({"id": document_id, "size": size})
+            if updates:
+                await conn.execute(SET_SIZE, updates)
+            await conn.commit()
+            updated += len(updates)
+            last_id = rows[-1][0]
+            logger.info(f"[document_metadata] Sized {updated} documents, {skipped} skipped")
+
+    await engine.dispose()
+    print(f"Sized {updated} documents, skipped {skipped}, in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(migrate(batch_size=args.batch_size))
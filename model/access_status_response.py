@@ -15,4 +15,5 @@ class AccessStatusResponse(BaseModel):
     pending: list[AccessStatusDetails]
     approved: list[AccessStatusDetails]
     declined: list[AccessStatusDetails]
-    completed: list[AccessStatusDetails]
\ No newline at end of file
+    completed: list[AccessStatusDetails]
+    next_cursor: str | None = None
\ No newline at end of file
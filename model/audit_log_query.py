@@ -0,0 +1,12 @@
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+from util.enums import AuditAction
+
+
+class AuditLogQuery(BaseModel):
+    user_id: Optional[UUID] = None
+    doc_id: Optional[str] = None
+    action: Optional[AuditAction] = None
+    since: Optional[int] = None  # epoch seconds, inclusive
+    until: Optional[int] = None  # epoch seconds, exclusive
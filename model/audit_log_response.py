@@ -0,0 +1,13 @@
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class AuditLogResponse(BaseModel):
+    id: int
+    user_id: UUID
+    action: str
+    doc_id: Optional[str] = None
+    timestamp: int
+    ip_address: str
+    user_agent: str
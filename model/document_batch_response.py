@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class DocumentBatchItem(BaseModel):
+    index: int  # position of the file in the request
+    filename: str | None
+    title: str
+    status: int  # the status code POST /v1/me/document would have answered for this file alone
+    document_id: str | None = None
+    detail: str | None = None
+
+
+class DocumentBatchResponse(BaseModel):
+    created: int
+    failed: int
+    items: list[DocumentBatchItem]
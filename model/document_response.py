@@ -8,4 +8,6 @@ class DocumentResponse(BaseModel):
     title: str
     uploaded_by: str | None
     uploaded_for: str | None
-    created_at: int
\ No newline at end of file
+    created_at: int
+    size: int | None = None
+    content_type: str | None = None
\ No newline at end of file
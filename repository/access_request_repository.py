@@ -1,21 +1,25 @@
 from typing import Protocol
 from uuid import UUID
+from sqlalchemy import Row
 from schema.access_request_schema import AccessRequestSchema
 
 
 class AccessHistoryRepository(Protocol):
 
-    async def get_by_doc_id(self, doc_id: list[UUID]) -> list[AccessRequestSchema]:
+    async def add(self, request: AccessRequestSchema):
         ...
 
-    async def add(self, request: AccessRequestSchema):
+    async def get_history_by_owner_id(self, owner_id: UUID, cursor: str | None, limit: int) -> tuple[list[Row], str | None]:
         ...
 
-    async def get_pending_requests_by_owner_id(self, owner_id: UUID) -> list[AccessRequestSchema]:
+    async def get_pending_details_by_owner_id(self, owner_id: UUID, cursor: str | None, limit: int) -> tuple[list[Row], str | None]:
         ...
 
     async def get_by_id(self, access_id: UUID) -> AccessRequestSchema:
         ...
 
-    async def get_by_requester_id(self, user_id: UUID) -> list[AccessRequestSchema]:
+    async def mark_completed(self, access_id: UUID) -> bool:
+        ...
+
+    async def get_status_details_by_requester_id(self, user_id: UUID, cursor: str | None, limit: int) -> tuple[list[Row], str | None]:
         ...
\ No newline at end of file
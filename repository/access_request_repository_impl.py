@@ -1,36 +1,77 @@
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update, Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from repository.access_request_repository import AccessHistoryRepository
 from schema.access_request_schema import AccessRequestSchema
+from schema.document_schema import DocumentSchema
+from schema.user_schema import UserSchema
 from util.enums import AccessStatus
+from util.pagination import keyset_page, split_page
+from util.metrics import instrument_repository
 
+ACCESS_REQUEST_PAGE_KEY = (AccessRequestSchema.requested_at, AccessRequestSchema.id)
 
+# Dashboard rows carry the request columns plus the joined document title, so each page is one statement
+ACCESS_REQUEST_DETAILS = (
+    AccessRequestSchema.id,
+    AccessRequestSchema.status,
+    AccessRequestSchema.requested_at,
+    AccessRequestSchema.approved_at,
+    DocumentSchema.title.label("document_title")
+)
+
+Requester = aliased(UserSchema, name="requester")
+Owner = aliased(UserSchema, name="owner")
+Uploader = aliased(UserSchema, name="uploader")
+
+
+@instrument_repository("access_request")
 class AccessHistoryRepositoryImpl(AccessHistoryRepository):
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
 
-    async def get_by_doc_id(self, doc_id: list[UUID]) -> list[AccessRequestSchema]:
-        query = select(AccessRequestSchema).where(AccessRequestSchema.doc_id.in_(doc_id))
-        result = await self.db_session.execute(query)
-        return result.scalars().all()
-
-
     async def add(self, request: AccessRequestSchema):
         self.db_session.add(request)
         await self.db_session.commit()
         await self.db_session.refresh(request)
 
 
-    async def get_pending_requests_by_owner_id(self, owner_id: UUID):
-        query = select(AccessRequestSchema).where(
-            (AccessRequestSchema.owner_id == owner_id) &
-            (AccessRequestSchema.status == AccessStatus.PENDING)
+    async def get_history_by_owner_id(self, owner_id: UUID, cursor: str | None, limit: int) -> tuple[list[Row], str | None]:
+        """
+        One page of requests for an owner's documents, newest first, with the document title and requester name
+        :return: (rows, cursor of the next page or None)
+        """
+        query = (
+            select(*ACCESS_REQUEST_DETAILS, Requester.name.label("requester_name"))
+            .join(DocumentSchema, DocumentSchema.id == AccessRequestSchema.doc_id)
+            .join(Requester, Requester.id == AccessRequestSchema.requester_id)
+            .where(AccessRequestSchema.owner_id == owner_id)
         )
-        result = await self.db_session.execute(query)
-        return result.scalars().all()
+        result = await self.db_session.execute(keyset_page(query, ACCESS_REQUEST_PAGE_KEY, cursor, limit))
+        return split_page(result.all(), ACCESS_REQUEST_PAGE_KEY, limit)
+
+
+    async def get_pending_details_by_owner_id(self, owner_id: UUID, cursor: str | None, limit: int) -> tuple[list[Row], str | None]:
+        """
+        One page of pending requests for an owner's documents, newest first, with the document title,
+        requester name and uploader name
+        :return: (rows, cursor of the next page or None)
+        """
+        query = (
+            select(*ACCESS_REQUEST_DETAILS, Requester.name.label("requester_name"), Uploader.name.label("uploader_name"))
+            .join(DocumentSchema, DocumentSchema.id == AccessRequestSchema.doc_id)
+            .join(Requester, Requester.id == AccessRequestSchema.requester_id)
+            .join(Uploader, Uploader.id == DocumentSchema.uploader_id)
+            .where(
+                (AccessRequestSchema.owner_id == owner_id) &
+                (AccessRequestSchema.status == AccessStatus.PENDING)
+            )
+        )
+        result = await self.db_session.execute(keyset_page(query, ACCESS_REQUEST_PAGE_KEY, cursor, limit))
+        return split_page(result.all(), ACCESS_REQUEST_PAGE_KEY, limit)
 
 
     async def get_by_id(self, access_id: UUID) -> AccessRequestSchema:
@@ -39,7 +80,30 @@ class AccessHistoryRepositoryImpl(AccessHistoryRepository):
         return result.scalar_one_or_none()
 
 
-    async def get_by_requester_id(self, user_id: UUID) -> list[AccessRequestSchema]:
-        query = select(AccessRequestSchema).where(AccessRequestSchema.requester_id == user_id)
+    async def mark_completed(self, access_id: UUID) -> bool:
+        """
+        Move an APPROVED request to COMPLETED. Conditional, so of two concurrent downloads only one completes it
+        :return: True if this call completed the request
+        """
+        query = (
+            update(AccessRequestSchema)
+            .where(AccessRequestSchema.id == access_id, AccessRequestSchema.status == AccessStatus.APPROVED)
+            .values(status=AccessStatus.COMPLETED)
+        )
         result = await self.db_session.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        return result.rowcount == 1
+
+
+    async def get_status_details_by_requester_id(self, user_id: UUID, cursor: str | None, limit: int) -> tuple[list[Row], str | None]:
+        """
+        One page of a requester's requests, newest first, with the document title and owner name
+        :return: (rows, cursor of the next page or None)
+        """
+        query = (
+            select(*ACCESS_REQUEST_DETAILS, Owner.name.label("owner_name"))
+            .join(DocumentSchema, DocumentSchema.id == AccessRequestSchema.doc_id)
+            .join(Owner, Owner.id == AccessRequestSchema.owner_id)
+            .where(AccessRequestSchema.requester_id == user_id)
+        )
+        result = await self.db_session.execute(keyset_page(query, ACCESS_REQUEST_PAGE_KEY, cursor, limit))
+        return split_page(result.all(), ACCESS_REQUEST_PAGE_KEY, limit)
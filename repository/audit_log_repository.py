@@ -1,10 +1,22 @@
-from typing import Protocol
+from typing import Protocol, AsyncIterator, List
 from uuid import UUID
 
+from sqlalchemy import Row
+
+from model.audit_log_query import AuditLogQuery
 from schema.audit_log_schema import AuditLogSchema
 from util.enums import AuditAction
 
 
 class AuditLogRepository(Protocol):
     async def add(self, log: AuditLogSchema) -> None:
-        ...
\ No newline at end of file
+        ...
+
+    async def add_all(self, logs: list[dict]) -> None:
+        ...
+
+    async def get_page(self, query: AuditLogQuery, cursor: str | None, limit: int) -> tuple[List[Row], str | None]:
+        ...
+
+    def stream_after(self, query: AuditLogQuery, after: tuple[int, int] | None, limit: int) -> AsyncIterator[Row]:
+        ...
@@ -1,11 +1,79 @@
 import time
+from typing import AsyncIterator, List
+from sqlalchemy import insert, select, tuple_, Row, Select
 from sqlalchemy.ext.asyncio import AsyncSession
+from config.constants.keys import Keys
+from model.audit_log_query import AuditLogQuery
 from schema.audit_log_schema import AuditLogSchema
 from repository.audit_log_repository import AuditLogRepository
+from util.pagination import keyset_page, split_page
+from util.metrics import instrument_repository
 
+AUDIT_LOG_COLUMNS = (
+    AuditLogSchema.id,
+    AuditLogSchema.user_id,
+    AuditLogSchema.action,
+    AuditLogSchema.doc_id,
+    AuditLogSchema.timestamp,
+    AuditLogSchema.ip_address,
+    AuditLogSchema.user_agent
+)
+AUDIT_LOG_PAGE_KEY = (AuditLogSchema.timestamp, AuditLogSchema.id)
+
+
+@instrument_repository("audit_log")
 class AuditLogRepositoryImpl(AuditLogRepository):
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
 
     async def add(self, log: AuditLogSchema):
         self.db.add(log)
+
+    async def add_all(self, logs: list[dict]) -> None:
+        """
+        Insert a batch of audit rows as a single multi-row INSERT; does not commit
+        :param logs: column values of each row
+        """
+        if logs:
+            await self.db.execute(insert(AuditLogSchema).values(logs))
+
+    async def get_page(self, query: AuditLogQuery, cursor: str | None, limit: int) -> tuple[List[Row], str | None]:
+        """
+        One page of matching audit rows, newest first
+        :return: (rows, cursor of the next page or None)
+        """
+        result = await self.db.execute(keyset_page(_filtered(query), AUDIT_LOG_PAGE_KEY, cursor, limit))
+        return split_page(result.all(), AUDIT_LOG_PAGE_KEY, limit)
+
+    async def stream_after(self, query: AuditLogQuery, after: tuple[int, int] | None, limit: int) -> AsyncIterator[Row]:
+        """
+        Up to `limit` matching audit rows, oldest first, after the (timestamp, id) key `after`.
+        Rows are read through a server-side cursor, AUDIT_EXPORT_FETCH_SIZE at a time.
+        """
+        statement = _filtered(query)
+        if after is not None:
+            statement = statement.where(tuple_(*AUDIT_LOG_PAGE_KEY) > after)
+        statement = (
+            statement.order_by(*AUDIT_LOG_PAGE_KEY)
+            .limit(limit)
+            .execution_options(yield_per=Keys.AUDIT_EXPORT_FETCH_SIZE)
+        )
+        result = await self.db.stream(statement)
+        async for row in result:
+            yield row
+
+
+def _filtered(query: AuditLogQuery) -> Select:
+    # Bounds on timestamp let the planner skip partitions outside the window
+    statement = select(*AUDIT_LOG_COLUMNS)
+    if query.user_id is not None:
+        statement = statement.where(AuditLogSchema.user_id == query.user_id)
+    if query.doc_id is not None:
+        statement = statement.where(AuditLogSchema.doc_id == query.doc_id)
+    if query.action is not None:
+        statement = statement.where(AuditLogSchema.action == query.action)
+    if query.since is not None:
+        statement = statement.where(AuditLogSchema.timestamp >= query.since)
+    if query.until is not None:
+        statement = statement.where(AuditLogSchema.timestamp < query.until)
+    return statement
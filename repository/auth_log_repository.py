@@ -13,3 +13,7 @@ class AuthLogsRepository(Protocol):
 
     async def upsert(self, log: AuthLogsSchema) -> None:
         ...
+
+
+    async def reset_stale(self, now: int, stale_before: int, limit: int) -> int:
+        ...
@@ -1,10 +1,12 @@
 from uuid import UUID
 import time
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from repository.auth_log_repository import AuthLogsRepository
 from schema.auth_logs_schema import AuthLogsSchema
+from util.metrics import instrument_repository
 
+@instrument_repository("auth_logs")
 class AuthLogsRepositoryImpl(AuthLogsRepository):
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
@@ -25,3 +27,30 @@ class AuthLogsRepositoryImpl(AuthLogsRepository):
     async def upsert(self, log: AuthLogsSchema) -> None:
         # Because `log` is already attached to session, just commit
         await self.db.commit()
+
+    async def reset_stale(self, now: int, stale_before: int, limit: int) -> int:
+        """
+        Clear up to `limit` expired lockouts, and failure counters untouched since `stale_before`
+        :return: number of rows reset
+        """
+        stale_ids = (
+            select(AuthLogsSchema.user_id)
+            .where(or_(
+                AuthLogsSchema.blocked_until < now,
+                and_(
+                    AuthLogsSchema.blocked_until.is_(None),
+                    AuthLogsSchema.failed_attempts > 0,
+                    AuthLogsSchema.last_attempt < stale_before
+                )
+            ))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(AuthLogsSchema)
+            .where(AuthLogsSchema.user_id.in_(stale_ids))
+            .values(failed_attempts=0, blocked_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(query)
+        return result.rowcount
@@ -5,11 +5,15 @@ from schema.auth_token_schema import AuthTokenSchema
 
 
 class AuthTokenRepository(Protocol):
-    async def add(self, user_id: UUID, token: str, created_at: int, expires_at: int):
+    async def add(self, user_id: UUID, token_digest: str, created_at: int, expires_at: int):
         ...
 
-    async def find_by_auth_token(self, auth_token: str) -> AuthTokenSchema:
+    async def find_by_token_digest(self, token_digest: str) -> AuthTokenSchema:
         ...
 
-    async def delete(self, token: str):
-        ...
\ No newline at end of file
+    async def delete(self, token_digest: str):
+        ...
+
+
+    async def delete_expired(self, now: int, limit: int) -> int:
+        ...
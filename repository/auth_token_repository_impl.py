@@ -3,28 +3,46 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from repository.auth_token_repository import AuthTokenRepository
 from schema.auth_token_schema import AuthTokenSchema
+from util.metrics import instrument_repository
 
 
+@instrument_repository("auth_token")
 class AuthTokenRepositoryImpl(AuthTokenRepository):
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def add(self, user_id: UUID, token: str, created_at: int, expires_at: int):
+    async def add(self, user_id: UUID, token_digest: str, created_at: int, expires_at: int):
         auth_token = AuthTokenSchema(
             user_id=user_id,
-            token=token,
+            token_digest=token_digest,
             created_at=created_at,
             expires_at=expires_at
         )
         self.db_session.add(auth_token)
 
 
-    async def find_by_auth_token(self, auth_token: str) -> AuthTokenSchema | None:
-        query = select(AuthTokenSchema).where(AuthTokenSchema.token == auth_token)
+    async def find_by_token_digest(self, token_digest: str) -> AuthTokenSchema | None:
+        query = select(AuthTokenSchema).where(AuthTokenSchema.token_digest == token_digest)
         result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
 
-    async def delete(self, token: str):
-        query = delete(AuthTokenSchema).where(AuthTokenSchema.token == token)
+    async def delete(self, token_digest: str):
+        query = delete(AuthTokenSchema).where(AuthTokenSchema.token_digest == token_digest)
+        await self.db_session.execute(query)
+
+
+    async def delete_expired(self, now: int, limit: int) -> int:
+        """
+        Delete up to `limit` expired tokens, skipping rows locked by concurrent logouts
+        :return: number of rows deleted
+        """
+        expired_ids = (
+            select(AuthTokenSchema.id)
+            .where(AuthTokenSchema.expires_at < now)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = delete(AuthTokenSchema).where(AuthTokenSchema.id.in_(expired_ids))
         result = await self.db_session.execute(query)
+        return result.rowcount
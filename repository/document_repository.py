@@ -1,20 +1,24 @@
 from typing import Protocol
 from uuid import UUID
 from typing import List
+from sqlalchemy import Row
 from schema.document_schema import DocumentSchema
 
 class DocumentRepository(Protocol):
-    async def get_by_owner_id(self, owner_id: UUID) -> List[DocumentSchema]:
+    async def get_listing_by_owner_id(self, owner_id: UUID, cursor: str | None, limit: int) -> tuple[List[Row], str | None]:
         ...
 
-    async def get_by_id(self, document_id: str) -> DocumentSchema | None:
+    async def get_metadata_by_id(self, document_id: str) -> Row | None:
         ...
 
-    async def get_all_by_id(self, document_id: list[str]) -> list[DocumentSchema]:
+    async def get_encrypted_data(self, document_id: str) -> bytes | None:
         ...
 
     async def add(self, document: DocumentSchema):
         ...
 
-    async def get_all_by_uploader_id(self, user_id: UUID) -> List[DocumentSchema]:
-        ...
\ No newline at end of file
+    async def add_all_new(self, documents: list[DocumentSchema]) -> set[str]:
+        ...
+
+    async def get_listing_by_uploader_id(self, user_id: UUID, cursor: str | None, limit: int) -> tuple[List[Row], str | None]:
+        ...
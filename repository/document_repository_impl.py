@@ -1,30 +1,71 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, Row
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
 from typing import List
 from uuid import UUID
 from schema.document_schema import DocumentSchema
+from schema.user_schema import UserSchema
 from repository.document_repository import DocumentRepository
+from util.pagination import keyset_page, split_page
+from util.metrics import instrument_repository
 
+# Every column but the inline payload. Listings and authorization checks read these rows;
+# the payload is fetched only on the download path.
+DOCUMENT_METADATA = (
+    DocumentSchema.id,
+    DocumentSchema.title,
+    DocumentSchema.owner_id,
+    DocumentSchema.uploader_id,
+    DocumentSchema.created_at,
+    DocumentSchema.size,
+    DocumentSchema.content_type,
+    DocumentSchema.blob_ref
+)
+DOCUMENT_PAGE_KEY = (DocumentSchema.created_at, DocumentSchema.id)
+
+# The columns a listing renders; the counterparty's name is joined in by the listing query
+DOCUMENT_LISTING = (
+    DocumentSchema.id,
+    DocumentSchema.title,
+    DocumentSchema.created_at,
+    DocumentSchema.size,
+    DocumentSchema.content_type
+)
+
+Owner = aliased(UserSchema, name="owner")
+Uploader = aliased(UserSchema, name="uploader")
+
+
+@instrument_repository("document")
 class DocumentRepositoryImpl(DocumentRepository):
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def get_by_owner_id(self, owner_id: UUID) -> List[DocumentSchema] | None:
-        query = select(DocumentSchema).where(DocumentSchema.owner_id == owner_id).order_by(DocumentSchema.created_at.desc())
-        result = await self.db_session.execute(query)
-        return result.scalars().all()
+    async def get_listing_by_owner_id(self, owner_id: UUID, cursor: str | None, limit: int) -> tuple[List[Row], str | None]:
+        """
+        One page of an owner's documents, newest first, with the uploader's name
+        :return: (rows, cursor of the next page or None)
+        """
+        query = (
+            select(*DOCUMENT_LISTING, Uploader.name.label("uploader_name"))
+            .join(Uploader, Uploader.id == DocumentSchema.uploader_id)
+            .where(DocumentSchema.owner_id == owner_id)
+        )
+        result = await self.db_session.execute(keyset_page(query, DOCUMENT_PAGE_KEY, cursor, limit))
+        return split_page(result.all(), DOCUMENT_PAGE_KEY, limit)
 
 
-    async def get_by_id(self, document_id: str) -> DocumentSchema | None:
-        query = select(DocumentSchema).where(DocumentSchema.id == document_id)
+    async def get_metadata_by_id(self, document_id: str) -> Row | None:
+        query = select(*DOCUMENT_METADATA).where(DocumentSchema.id == document_id)
         result = await self.db_session.execute(query)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
 
 
-    async def get_all_by_id(self, document_id: list[str]) -> list[DocumentSchema]:
-        query = select(DocumentSchema).where(DocumentSchema.id.in_(document_id))
+    async def get_encrypted_data(self, document_id: str) -> bytes | None:
+        query = select(DocumentSchema.encrypted_data).where(DocumentSchema.id == document_id)
         result = await self.db_session.execute(query)
-        return result.scalars().all()
+        return result.scalar_one_or_none()
 
 
     async def add(self, document: DocumentSchema):
@@ -33,7 +74,34 @@ class DocumentRepositoryImpl(DocumentRepository):
         await self.db_session.refresh(document)
 
 
-    async def get_all_by_uploader_id(self, user_id: UUID) -> List[DocumentSchema]:
-        query = select(DocumentSchema).where(DocumentSchema.uploader_id == user_id).order_by(DocumentSchema.created_at.desc())
+    async def add_all_new(self, documents: list[DocumentSchema]) -> set[str]:
+        """
+        Insert the documents in one statement and commit; a document whose id is already taken,
+        by an existing row or an earlier one in the list, is skipped
+        :return: blob_refs of the inserted documents
+        """
+        rows = [{column.key: getattr(document, column.key) for column in DOCUMENT_METADATA} for document in documents]
+        query = (
+            insert(DocumentSchema)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[DocumentSchema.id])
+            .returning(DocumentSchema.blob_ref)
+        )
         result = await self.db_session.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        inserted = set(result.scalars().all())
+        await self.db_session.commit()
+        return inserted
+
+
+    async def get_listing_by_uploader_id(self, user_id: UUID, cursor: str | None, limit: int) -> tuple[List[Row], str | None]:
+        """
+        One page of an uploader's documents, newest first, with the owner's name
+        :return: (rows, cursor of the next page or None)
+        """
+        query = (
+            select(*DOCUMENT_LISTING, Owner.name.label("owner_name"))
+            .join(Owner, Owner.id == DocumentSchema.owner_id)
+            .where(DocumentSchema.uploader_id == user_id)
+        )
+        result = await self.db_session.execute(keyset_page(query, DOCUMENT_PAGE_KEY, cursor, limit))
+        return split_page(result.all(), DOCUMENT_PAGE_KEY, limit)
@@ -11,4 +11,7 @@ class EncryptionKeyStoreRepository(Protocol):
         ...
 
     async def get_private_key_by_user_id(self, user_id: UUID) -> str | None:
+        ...
+
+    async def get_public_keys_by_user_ids(self, user_ids: list[UUID]) -> dict[UUID, str]:
         ...
\ No newline at end of file
@@ -4,8 +4,10 @@ from repository.encryption_key_store_repository import EncryptionKeyStoreReposit
 from uuid import UUID
 import time
 from schema.encryption_key_store_schema import EncryptionKeyStoreSchema
+from util.metrics import instrument_repository
 
 
+@instrument_repository("encryption_key_store")
 class EncryptionKeyStoreRepositoryImpl(EncryptionKeyStoreRepository):
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
@@ -31,4 +33,13 @@ class EncryptionKeyStoreRepositoryImpl(EncryptionKeyStoreRepository):
     async def get_private_key_by_user_id(self, user_id: UUID) -> str | None:
         query = select(EncryptionKeyStoreSchema.encrypted_private_key).where(EncryptionKeyStoreSchema.user_id == user_id)
         result = await self.db_session.execute(query)
-        return result.scalar_one_or_none()
\ No newline at end of file
+        return result.scalar_one_or_none()
+
+
+    async def get_public_keys_by_user_ids(self, user_ids: list[UUID]) -> dict[UUID, str]:
+        """
+        :return: public key PEM by user_id, for the users that have one
+        """
+        query = select(EncryptionKeyStoreSchema.user_id, EncryptionKeyStoreSchema.public_key).where(EncryptionKeyStoreSchema.user_id.in_(user_ids))
+        result = await self.db_session.execute(query)
+        return {row.user_id: row.public_key for row in result.all()}
\ No newline at end of file
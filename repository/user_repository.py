@@ -16,5 +16,8 @@ class UserRepository(Protocol):
     async def find_all_name_by_user_id(self, user_ids: list[UUID]) -> dict | None:
         ...
 
+    async def find_all_role_by_user_id(self, user_ids: list[UUID]) -> dict:
+        ...
+
     async def find_by_id(self, owner_id) -> UserSchema | None:
         ...
\ No newline at end of file
@@ -3,8 +3,10 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from repository.user_repository import UserRepository
 from schema.user_schema import UserSchema
+from util.metrics import instrument_repository
 
 
+@instrument_repository("user")
 class UserRepositoryImpl(UserRepository):
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
@@ -43,6 +45,17 @@ class UserRepositoryImpl(UserRepository):
         return {row.id: row.name for row in user_result.fetchall()}
 
 
+    async def find_all_role_by_user_id(self, user_ids: list[UUID]) -> dict:
+        """
+        Searches for the roles of a list of user_ids
+        :param user_ids: A list of user ids
+        :return: a dictionary mapping of the user_ids found to their AccountType
+        """
+        query = select(UserSchema.id, UserSchema.role).where(UserSchema.id.in_(user_ids))
+        user_result = await self.db_session.execute(query)
+        return {row.id: row.role for row in user_result.fetchall()}
+
+
     async def find_by_id(self, user_id: UUID) -> UserSchema | None:
         """
         Searches for a user and returns if the user is present
@@ -2,7 +2,9 @@ from fastapi import FastAPI, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from controller.access_controller import access_controller
+from controller.audit_controller import audit_controller
 from controller.auth_controller import auth_controller
+from controller.metrics_controller import metrics_controller
 from config.database import get_db
 from auth.auth_bearer import JWTBearer
 from controller.user_controller import user_controller
@@ -16,7 +18,9 @@ async def get_auth_dependency(request: Request, session: AsyncSession = Depends(
 def register(app: FastAPI):
     # Unprotected routes
     app.include_router(auth_controller)
+    app.include_router(metrics_controller)
 
     # Protected Routes
     app.include_router(user_controller, dependencies=[Depends(get_auth_dependency)])
-    app.include_router(access_controller, dependencies=[Depends(get_auth_dependency)])
\ No newline at end of file
+    app.include_router(access_controller, dependencies=[Depends(get_auth_dependency)])
+    app.include_router(audit_controller, dependencies=[Depends(get_auth_dependency)])
\ No newline at end of file
@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, Enum, ForeignKey, BigInteger, String
+from sqlalchemy import Column, Enum, ForeignKey, BigInteger, String, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import uuid4
 from util.enums import AccessStatus
@@ -14,4 +14,13 @@ class AccessRequestSchema(Base):
     owner_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False)
     status = Column(Enum(AccessStatus), default=AccessStatus.PENDING, nullable=False)
     requested_at = Column(BigInteger, nullable=False)
-    approved_at = Column(BigInteger, nullable=True)
\ No newline at end of file
+    approved_at = Column(BigInteger, nullable=True)
+
+    # Keyset pagination of listings, newest first; doc_id for lookups by document
+    __table_args__ = (
+        Index("ix_access_request_owner_id_requested_at_id", "owner_id", "requested_at", "id"),
+        Index("ix_access_request_requester_id_requested_at_id", "requester_id", "requested_at", "id"),
+        Index("ix_access_request_pending_owner_id_requested_at_id", "owner_id", "requested_at", "id",
+              postgresql_where=text("status = 'PENDING'")),
+        Index("ix_access_request_doc_id", "doc_id"),
+    )
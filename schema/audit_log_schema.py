@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, Enum, ForeignKey, BigInteger, Text, String
+from sqlalchemy import Column, Enum, ForeignKey, BigInteger, Text, String, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from util.enums import AuditAction
 
@@ -11,7 +11,13 @@ class AuditLogSchema(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False)
     action = Column(Enum(AuditAction), nullable=False)
     doc_id = Column(String(64), ForeignKey("document.id"), nullable=True)
-    timestamp = Column(BigInteger, nullable=False)
+    timestamp = Column(BigInteger, primary_key=True, nullable=False)  # partition key, so part of the primary key
     ip_address = Column(String(45), nullable=False)  # supports IPv6
     user_agent = Column(Text, nullable=False)
 
+    # Monthly range partitions, managed by service/audit_partition_service.py; a user's or a document's activity by time
+    __table_args__ = (
+        Index("ix_audit_log_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_audit_log_doc_id_timestamp", "doc_id", "timestamp", postgresql_where=text("doc_id IS NOT NULL")),
+        {"postgresql_partition_by": "RANGE (timestamp)"}
+    )
@@ -7,7 +7,7 @@ class AuthTokenSchema(Base):
     __tablename__ = "auth_token"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False)
-    token = Column(String, nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False, index=True)
+    token_digest = Column(String(64), nullable=False, unique=True, index=True)  # SHA-256 hex of the JWT
     created_at = Column(BigInteger, nullable=False)
-    expires_at = Column(BigInteger, nullable=False)
+    expires_at = Column(BigInteger, nullable=False, index=True)
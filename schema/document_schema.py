@@ -1,5 +1,6 @@
-from sqlalchemy import Column, ForeignKey, String, Text, BigInteger
+from sqlalchemy import Column, ForeignKey, String, Text, BigInteger, Index
 from sqlalchemy.dialects.postgresql import UUID, BYTEA
+from sqlalchemy.orm import deferred
 from config.database import Base
 
 
@@ -9,6 +10,16 @@ class DocumentSchema(Base):
     id = Column(String(64), primary_key=True, nullable=False)
     uploader_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False)
-    encrypted_data = Column(BYTEA, nullable=False)
+    blob_ref = Column(String(64), nullable=True)  # SHA-256 of the payload in the blob store
+    # legacy inline payload, moved out by migration/document_blobs.py; never loaded unless asked for
+    encrypted_data = deferred(Column(BYTEA, nullable=True))
+    size = Column(BigInteger, nullable=True)  # plaintext bytes
+    content_type = Column(String(255), nullable=True)
     created_at = Column(BigInteger, nullable=False)
     title = Column(Text, nullable=False)
+
+    # Keyset pagination of listings, newest first
+    __table_args__ = (
+        Index("ix_document_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_document_uploader_id_created_at_id", "uploader_id", "created_at", "id"),
+    )
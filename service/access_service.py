@@ -3,55 +3,43 @@ import uuid
 from uuid import UUID
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from config.constants.errors import INTERNAL_SERVER_ERROR
+from config.constants.errors import INTERNAL_SERVER_ERROR, INVALID_CURSOR
+from exceptions.invalid_cursor import InvalidCursorError
 from exceptions.object_not_found import ObjectNotFoundError
 from model.access_history_response import AccessHistoryResponse
 from model.access_status_response import AccessStatusResponse, AccessStatusDetails
+from model.page import Page
 from model.pending_access_response import PendingAccessResponse
 from repository.access_request_repository import AccessHistoryRepository
 from repository.access_request_repository_impl import AccessHistoryRepositoryImpl
 from repository.document_repository import DocumentRepository
 from repository.document_repository_impl import DocumentRepositoryImpl
-from repository.user_repository import UserRepository
-from repository.user_repository_impl import UserRepositoryImpl
 from schema.access_request_schema import AccessRequestSchema
-from schema.document_schema import DocumentSchema
 from util.enums import AccessStatus
 from util.logger import logger
 
 
-async def get_access_history(user_id: UUID, db_session: AsyncSession):
+async def get_access_history(user_id: UUID, cursor: str | None, limit: int, db_session: AsyncSession) -> Page[AccessHistoryResponse]:
     try:
-        document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
-        user_documents: list[DocumentSchema] = await document_repo.get_by_owner_id(user_id)
-
-        if not user_documents:
-            return []
-
-        doc_ids = [doc.id for doc in user_documents]
-        doc_title_map = {doc.id: doc.title for doc in user_documents}
-
-
+        # One page of requests on the user's documents, joined with document titles and requester names
         access_repo: AccessHistoryRepository = AccessHistoryRepositoryImpl(db_session=db_session)
-        access_requests = await access_repo.get_by_doc_id(doc_id=doc_ids)
-        if not access_requests:
-            return []
-
-        requester_ids = list({ar.requester_id for ar in access_requests})
-        user_repo: UserRepository = UserRepositoryImpl(db_session=db_session)
-        requester_name_map: dict = await user_repo.find_all_name_by_user_id(user_ids=requester_ids)
+        access_requests, next_cursor = await access_repo.get_history_by_owner_id(owner_id=user_id, cursor=cursor, limit=limit)
 
-        return [
+        return Page(items=[
             AccessHistoryResponse(
                 access_id=ar.id,
-                document_title=doc_title_map.get(ar.doc_id, "Unknown Document"),
-                organization_name=requester_name_map.get(ar.requester_id, "Unknown Org"),
+                document_title=ar.document_title,
+                organization_name=ar.requester_name,
                 status=ar.status.value,
                 requested_at=ar.requested_at,
                 approved_at=ar.approved_at
             )
             for ar in access_requests
-        ]
+        ], next_cursor=next_cursor)
+
+    except InvalidCursorError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR)
 
     except Exception as e:
         await db_session.rollback()
@@ -62,7 +50,7 @@ async def get_access_history(user_id: UUID, db_session: AsyncSession):
 async def request_access(user_id: UUID, owner_id: UUID, document_id: str, db_session: AsyncSession):
     try:
         document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
-        document = await document_repo.get_by_id(document_id=document_id)
+        document = await document_repo.get_metadata_by_id(document_id=document_id)
         if not document:
             raise ObjectNotFoundError("Document is not present")
 
@@ -87,47 +75,28 @@ async def request_access(user_id: UUID, owner_id: UUID, document_id: str, db_ses
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
 
-async def get_requested_access(user_id: UUID, db_session: AsyncSession):
+async def get_requested_access(user_id: UUID, cursor: str | None, limit: int, db_session: AsyncSession) -> Page[PendingAccessResponse]:
     try:
-        # 1. Fetch all pending requests where user is the owner
+        # One page of pending requests where user is the owner, joined with document titles,
+        # requester names and uploader names
         access_repo: AccessHistoryRepository = AccessHistoryRepositoryImpl(db_session=db_session)
-        pending_requests: list[AccessRequestSchema] = await access_repo.get_pending_requests_by_owner_id(
-            owner_id=user_id)
-        if not pending_requests:
-            return []
-
-        # 2. Extract doc_ids and requester_ids
-        doc_ids = list({req.doc_id for req in pending_requests})
-        requester_ids = list({req.requester_id for req in pending_requests})
-
-        # 3. Fetch document titles
-        document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
-        documents: list[DocumentSchema] = await document_repo.get_all_by_id(document_id=doc_ids)
-        doc_map = {doc.id: doc for doc in documents}
-        uploader_ids = [doc.uploader_id for doc in documents]
-        all_user_ids = list(set(requester_ids + uploader_ids))
-
-        # 4. Fetch requester names
-        user_repo: UserRepository = UserRepositoryImpl(db_session=db_session)
-        user_name_map = await user_repo.find_all_name_by_user_id(user_ids=all_user_ids)
-
-        # 5. Build response list
-        response: list[PendingAccessResponse] = []
-        for req in pending_requests:
-            doc = doc_map.get(req.doc_id)
-            if not doc:
-                continue  # skip if doc missing
-
-            response.append(
-                PendingAccessResponse(
-                    request_id=req.id,
-                    document_title=doc.title,
-                    requester_name=user_name_map.get(req.requester_id, "Unknown"),
-                    issuer_name=user_name_map.get(doc.uploader_id, "Unknown"),
-                    requested_at=req.requested_at
-                )
+        pending_requests, next_cursor = await access_repo.get_pending_details_by_owner_id(
+            owner_id=user_id, cursor=cursor, limit=limit)
+
+        response: list[PendingAccessResponse] = [
+            PendingAccessResponse(
+                request_id=req.id,
+                document_title=req.document_title,
+                requester_name=req.requester_name,
+                issuer_name=req.uploader_name,
+                requested_at=req.requested_at
             )
-        return response
+            for req in pending_requests
+        ]
+        return Page(items=response, next_cursor=next_cursor)
+    except InvalidCursorError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR)
     except Exception as e:
         await db_session.rollback()
         logger.error(f"Error occurred getting pending requests {e}")
@@ -164,23 +133,15 @@ async def grant_access(user_id: str, access_id: UUID, approve: bool, db_session:
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
 
-async def request_access_status(user_id: str, db_session: AsyncSession):
+async def request_access_status(user_id: str, cursor: str | None, limit: int, db_session: AsyncSession):
     try:
+        # One page of the organization's requests, newest first, joined with document titles and owner names
         access_repo: AccessHistoryRepository = AccessHistoryRepositoryImpl(db_session=db_session)
-        access_requests = await access_repo.get_by_requester_id(user_id=UUID(user_id))
+        access_requests, next_cursor = await access_repo.get_status_details_by_requester_id(
+            user_id=UUID(user_id), cursor=cursor, limit=limit)
         if not access_requests:
             return AccessStatusResponse(pending=[], approved=[], declined=[], completed=[])
 
-        # 2: Get document & user info
-        doc_ids = [r.doc_id for r in access_requests]
-        owner_ids = list({r.owner_id for r in access_requests})
-
-        document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
-        doc_map = {d.id: d for d in await document_repo.get_all_by_id(doc_ids)}
-
-        user_repo: UserRepository = UserRepositoryImpl(db_session=db_session)
-        owner_name_map = await user_repo.find_all_name_by_user_id(owner_ids)
-
         result = {
             "pending": [],
             "approved": [],
@@ -192,14 +153,17 @@ async def request_access_status(user_id: str, db_session: AsyncSession):
             status_key = req.status.name.lower()  # enum to string: 'PENDING' -> 'pending'
             result[status_key].append(AccessStatusDetails(
                 access_id=req.id,
-                document_title=doc_map.get(req.doc_id).title if doc_map.get(req.doc_id) else "Unknown",
-                owner_name=owner_name_map.get(req.owner_id, "Unknown"),
+                document_title=req.document_title,
+                owner_name=req.owner_name,
                 requested_at=req.requested_at,
                 approved_at=req.approved_at,
                 status=req.status.name
             ))
 
-        return AccessStatusResponse(**result)
+        return AccessStatusResponse(**result, next_cursor=next_cursor)
+    except InvalidCursorError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR)
     except Exception as e:
         await db_session.rollback()
         logger.error(f"Error occurred getting pending requests {e}")
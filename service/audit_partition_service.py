@@ -0,0 +1,140 @@
+"""
+Monthly range partitions of audit_log on `timestamp` (epoch seconds, UTC months).
+
+Partitions are named audit_log_y<YYYY>m<MM>; the retention job relies on the name to know a
+partition's month. Upcoming months are created ahead of time, since a row with no partition for its
+timestamp is rejected. Partitions past the retention window are detached, archived to
+<AUDIT_ARCHIVE_PATH>/<partition>.csv.gz and only then dropped.
+"""
+import re
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config.constants.keys import Keys
+from config.database import engine
+from storage.audit_archive import audit_archive
+from util.logger import logger
+from util.periodic_task import PeriodicTask
+
+PARTITION_NAME = re.compile(r"^audit_log_y(\d{4})m(\d{2})$")
+
+ATTACHED_PARTITIONS = text("""
+    SELECT c.relname, i.inhdetachpending FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'audit_log'::regclass
+""")
+
+# Tables left detached by an earlier run that stopped before archiving or dropping them
+DETACHED_PARTITIONS = text(r"""
+    SELECT c.relname FROM pg_class c
+    WHERE c.relkind = 'r' AND c.relname LIKE 'audit\_log\_y%'
+      AND c.relnamespace = current_schema()::regnamespace
+      AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+""")
+
+
+def add_months(year: int, month: int, months: int) -> tuple[int, int]:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def month_start(year: int, month: int) -> int:
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"audit_log_y{year:04d}m{month:02d}"
+
+
+async def manage_partitions() -> dict | None:
+    """
+    Create the partitions for the current and next AUDIT_PARTITIONS_AHEAD months, then detach,
+    archive and drop the ones older than AUDIT_RETENTION_MONTHS.
+    Only the worker holding the advisory lock runs; the others skip the run.
+    :return: partitions created and archived, or None if another worker holds the lock
+    """
+    started = time.monotonic()
+    async with engine.connect() as conn:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        locked = (await conn.execute(select(func.pg_try_advisory_lock(Keys.AUDIT_PARTITION_LOCK_KEY)))).scalar()
+        if not locked:
+            logger.debug("[AuditPartitions] Skipped, another worker holds the lock")
+            return None
+
+        try:
+            now = datetime.now(timezone.utc)
+            created = await _create_upcoming(conn, now.year, now.month)
+            archived = await _archive_expired(conn, now.year, now.month) if Keys.AUDIT_RETENTION_MONTHS > 0 else []
+        finally:
+            await conn.execute(select(func.pg_advisory_unlock(Keys.AUDIT_PARTITION_LOCK_KEY)))
+
+    result = {
+        "created": created,
+        "archived": archived,
+        "elapsed_seconds": round(time.monotonic() - started, 3)
+    }
+    if created or archived:
+        logger.info(f"[AuditPartitions] {result}")
+    return result
+
+
+async def _create_upcoming(conn: AsyncConnection, year: int, month: int) -> list[str]:
+    attached = {row.relname for row in await conn.execute(ATTACHED_PARTITIONS)}
+    created = []
+    for offset in range(Keys.AUDIT_PARTITIONS_AHEAD + 1):
+        start_year, start_month = add_months(year, month, offset)
+        name = partition_name(start_year, start_month)
+        if name in attached:
+            continue
+        end_year, end_month = add_months(start_year, start_month, 1)
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_log "
+            f"FOR VALUES FROM ({month_start(start_year, start_month)}) TO ({month_start(end_year, end_month)})"
+        ))
+        created.append(name)
+    return created
+
+
+async def _archive_expired(conn: AsyncConnection, year: int, month: int) -> list[dict]:
+    # A partition expires once its whole month is older than the retention window
+    cutoff = partition_name(*add_months(year, month, -Keys.AUDIT_RETENTION_MONTHS))
+    for row in (await conn.execute(ATTACHED_PARTITIONS)).all():
+        if not PARTITION_NAME.match(row.relname) or row.relname >= cutoff:
+            continue
+        if row.inhdetachpending:
+            # An interrupted concurrent detach must be finalized before anything else
+            await conn.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {row.relname} FINALIZE"))
+        else:
+            await conn.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {row.relname} CONCURRENTLY"))
+        logger.info(f"[AuditPartitions] Detached {row.relname}")
+
+    archived = []
+    for name in sorted(row.relname for row in await conn.execute(DETACHED_PARTITIONS)):
+        if not PARTITION_NAME.match(name) or name >= cutoff:
+            continue
+        archived.append(await _archive_and_drop(conn, name))
+    return archived
+
+
+async def _archive_and_drop(conn: AsyncConnection, name: str) -> dict:
+    writer = await audit_archive.open(name)
+    try:
+        raw = await conn.get_raw_connection()
+        status = await raw.driver_connection.copy_from_table(name, output=writer.write, format="csv", header=True)
+        compressed = await writer.commit()
+    except BaseException:
+        await writer.abort()
+        raise
+
+    # The archive is durable on disk before the rows are dropped
+    await conn.execute(text(f"DROP TABLE {name}"))
+    rows = int(status.split()[-1])
+    logger.info(f"[AuditPartitions] Archived {rows} rows of {name} to {writer.final_path} "
+                f"({writer.bytes_in} -> {compressed} bytes) and dropped it")
+    return {"partition": name, "rows": rows, "archive": writer.final_path, "bytes": compressed}
+
+
+audit_partition_task = PeriodicTask(name="audit-partitions", interval=Keys.AUDIT_PARTITION_INTERVAL, fn=manage_partitions)
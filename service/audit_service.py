@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+import time
+from typing import AsyncIterator
+from uuid import UUID
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.constants.errors import INTERNAL_SERVER_ERROR, INVALID_CURSOR, AUDIT_ACCESS_DENIED
+from config.constants.keys import Keys
+from config.database import async_session
+from exceptions.invalid_cursor import InvalidCursorError
+from exceptions.object_not_found import ObjectNotFoundError
+from model.audit_log_query import AuditLogQuery
+from model.audit_log_response import AuditLogResponse
+from model.page import Page
+from repository.audit_log_repository import AuditLogRepository
+from repository.audit_log_repository_impl import AuditLogRepositoryImpl, AUDIT_LOG_COLUMNS
+from repository.document_repository import DocumentRepository
+from repository.document_repository_impl import DocumentRepositoryImpl
+from util.enums import ExportFormat
+from util.logger import logger
+
+EXPORT_FIELDS = [column.key for column in AUDIT_LOG_COLUMNS]
+EXPORT_MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv"}
+
+
+async def get_audit_trail(user_id: str, query: AuditLogQuery, cursor: str | None, limit: int, db_session: AsyncSession) -> Page[AuditLogResponse]:
+    try:
+        query = await _authorize(user_id=UUID(user_id), query=query, db_session=db_session)
+        audit_repo: AuditLogRepository = AuditLogRepositoryImpl(db_session=db_session)
+        rows, next_cursor = await audit_repo.get_page(query=query, cursor=cursor, limit=limit)
+        return Page(items=[AuditLogResponse(**_to_dict(row)) for row in rows], next_cursor=next_cursor)
+
+    except ObjectNotFoundError as obj:
+        await db_session.rollback()
+        raise HTTPException(status_code=404, detail=obj.message)
+    except InvalidCursorError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR)
+    except HTTPException as http_exc:
+        await db_session.rollback()
+        raise http_exc
+    except Exception as e:
+        await db_session.rollback()
+        logger.error(f"Error fetching audit trail: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
+
+
+async def export_audit_trail(user_id: str, query: AuditLogQuery, export_format: ExportFormat, db_session: AsyncSession) -> StreamingResponse:
+    try:
+        query = await _authorize(user_id=UUID(user_id), query=query, db_session=db_session)
+        # Release the request's connection; the export reads on its own short transactions
+        await db_session.close()
+
+        filename = f"audit_{int(time.time())}.{export_format.value}"
+        return StreamingResponse(
+            _export_rows(query=query, export_format=export_format),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+
+    except ObjectNotFoundError as obj:
+        await db_session.rollback()
+        raise HTTPException(status_code=404, detail=obj.message)
+    except HTTPException as http_exc:
+        await db_session.rollback()
+        raise http_exc
+    except Exception as e:
+        await db_session.rollback()
+        logger.error(f"Error exporting audit trail: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
+
+
+async def _authorize(user_id: UUID, query: AuditLogQuery, db_session: AsyncSession) -> AuditLogQuery:
+    """
+    Restrict a query to trails the user may read: their own activity, or any activity on a document
+    they own or uploaded. Without a user or document filter the query defaults to their own activity.
+    :return: the query to run
+    """
+    if query.doc_id is not None:
+        document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
+        document = await document_repo.get_metadata_by_id(document_id=query.doc_id)
+        if not document or user_id not in (document.owner_id, document.uploader_id):
+            raise ObjectNotFoundError(f"Document with id {query.doc_id} is not found")
+        return query
+    if query.user_id is None:
+        return query.model_copy(update={"user_id": user_id})
+    if query.user_id != user_id:
+        raise HTTPException(status_code=403, detail=AUDIT_ACCESS_DENIED)
+    return query
+
+
+async def _export_rows(query: AuditLogQuery, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    """
+    Encode matching rows oldest first, AUDIT_EXPORT_BATCH_SIZE rows per transaction.
+    Each batch is read and encoded, and its transaction closed, before it is sent, so a slow client
+    never holds a transaction or a connection open; memory is bounded by one encoded batch.
+    """
+    if export_format == ExportFormat.CSV:
+        yield _encode_csv([EXPORT_FIELDS])
+
+    after = None
+    exported = 0
+    while True:
+        rows = []
+        async with async_session() as session:
+            audit_repo: AuditLogRepository = AuditLogRepositoryImpl(db_session=session)
+            async for row in audit_repo.stream_after(query=query, after=after, limit=Keys.AUDIT_EXPORT_BATCH_SIZE):
+                rows.append(row)
+        if not rows:
+            break
+
+        after = (rows[-1].timestamp, rows[-1].id)
+        exported += len(rows)
+        if export_format == ExportFormat.CSV:
+            chunk = _encode_csv([[row.id, row.user_id, row.action.value, row.doc_id or "", row.timestamp, row.ip_address, row.user_agent] for row in rows])
+        else:
+            chunk = "".join(json.dumps(_to_dict(row)) + "\n" for row in rows).encode()
+        del rows
+        yield chunk
+
+        if exported % Keys.AUDIT_EXPORT_BATCH_SIZE:
+            break  # a short batch is the last one
+    logger.info(f"[AuditExport] Exported {exported} rows as {export_format.value}")
+
+
+def _encode_csv(rows: list[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _to_dict(row: Row) -> dict:
+    return {
+        "id": row.id,
+        "user_id": str(row.user_id),
+        "action": row.action.value,
+        "doc_id": row.doc_id,
+        "timestamp": row.timestamp,
+        "ip_address": row.ip_address,
+        "user_agent": row.user_agent
+    }
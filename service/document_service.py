@@ -1,47 +1,59 @@
+import asyncio
 import io
 import time
 import uuid
+from typing import Iterator, AsyncIterator
 from uuid import UUID
-from fastapi import UploadFile, HTTPException
-from fastapi.responses import StreamingResponse
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from fastapi import UploadFile, HTTPException, Request
+from fastapi.responses import StreamingResponse, FileResponse
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from config.constants.errors import INTERNAL_SERVER_ERROR
+from config.constants.errors import INTERNAL_SERVER_ERROR, SERVER_BUSY, CLIENT_CLOSED_REQUEST, INVALID_CURSOR, DOCUMENT_BATCH_MISMATCH, DOCUMENT_BATCH_TOO_LARGE, DOCUMENT_ALREADY_EXISTS
 from config.constants.keys import Keys
+from config.database import async_session
+from exceptions.client_disconnected import ClientDisconnectedError
+from exceptions.executor_saturated import ExecutorSaturatedError
+from exceptions.invalid_cursor import InvalidCursorError
 from exceptions.object_not_found import ObjectNotFoundError
+from model.document_batch_response import DocumentBatchResponse, DocumentBatchItem
 from model.document_response import DocumentResponse
 from model.document_upload_request import DocumentUploadRequest
+from model.page import Page
+from repository.access_request_repository import AccessHistoryRepository
 from repository.access_request_repository_impl import AccessHistoryRepositoryImpl
 from repository.document_repository import DocumentRepository
 from repository.document_repository_impl import DocumentRepositoryImpl
-from repository.encryption_key_store_repository import EncryptionKeyStoreRepository
-from repository.encryption_key_store_repository_impl import EncryptionKeyStoreRepositoryImpl
 from repository.user_repository import UserRepository
 from repository.user_repository_impl import UserRepositoryImpl
 from schema.access_request_schema import AccessRequestSchema
 from schema.document_schema import DocumentSchema
+from service import key_service
+from storage.blob_store import blob_store
 from util import utils
-from util.enums import AccountType, AccessStatus
+from util.audit_writer import audit_writer
+from util.container import ContainerWriter
+from util.crypto_executor import crypto_thread_executor
+from util.enums import AccountType, AccessStatus, AuditAction
 from util.logger import logger
 
 
-async def get_document_info(user_id: UUID, db_session: AsyncSession) -> list[DocumentResponse]:
+async def get_document_info(user_id: UUID, cursor: str | None, limit: int, db_session: AsyncSession) -> Page[DocumentResponse]:
     try:
-        # Fetch by user id all documents
+        # One page of the user's documents, joined with the uploader's name
         document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
-        documents: list[DocumentSchema] = await document_repo.get_by_owner_id(owner_id=user_id)
+        documents, next_cursor = await document_repo.get_listing_by_owner_id(owner_id=user_id, cursor=cursor, limit=limit)
 
-        uploader_ids = list({doc.uploader_id for doc in documents})
-        if not uploader_ids:
-            return []
-
-        # Fetch all names of doc uploader ids
-        user_repo: UserRepository = UserRepositoryImpl(db_session=db_session)
-        org_name_map = await user_repo.find_all_name_by_user_id(user_ids=uploader_ids)
-
-        return [
-            DocumentResponse(id=doc.id, title=doc.title, created_at=doc.created_at, uploaded_by=org_name_map.get(doc.uploader_id, "Unknown Org"), uploaded_for=None)
+        return Page(items=[
+            DocumentResponse(id=doc.id, title=doc.title, created_at=doc.created_at, uploaded_by=doc.uploader_name, uploaded_for=None,
+                             size=doc.size, content_type=doc.content_type)
             for doc in documents
-        ]
+        ], next_cursor=next_cursor)
+
+    except InvalidCursorError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR)
 
     except Exception as e:
         await db_session.rollback()
@@ -49,58 +61,57 @@ async def get_document_info(user_id: UUID, db_session: AsyncSession) -> list[Doc
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
 
-async def add_document(form_data: DocumentUploadRequest, uploader_id: UUID, file: UploadFile, db_session: AsyncSession):
+async def add_document(request: Request, form_data: DocumentUploadRequest, uploader_id: UUID, file: UploadFile, db_session: AsyncSession):
+    # The blob written for this upload until a committed row references it; removed if the upload fails
+    unreferenced_blob_ref: str | None = None
     try:
-        # 1. Read File Bytes
-        file_bytes = await file.read()
-
-        # 2. Validate owner if exists
+        # 1. Validate owner if exists
         user_repo: UserRepository = UserRepositoryImpl(db_session=db_session)
         owner = await user_repo.find_by_id(form_data.owner_id)
         if not owner or owner.role != AccountType.INDIVIDUAL:
             raise ObjectNotFoundError("Owner of public key doesn't exist")
 
-        # 3. Validate if it is the public of key owner
-        eks: EncryptionKeyStoreRepository  = EncryptionKeyStoreRepositoryImpl(db_session=db_session)
-        stored_public_key = await eks.get_public_key_by_user_id(user_id=form_data.owner_id)
+        # 2. Validate if it is the public of key owner by comparing fingerprints of the cached parsed keys
+        stored_public_key = await key_service.get_public_key_entry(user_id=form_data.owner_id, db_session=db_session)
         if not stored_public_key:
             raise ObjectNotFoundError("Owner of public key doesn't exist")
 
-        stored_key_bytes = utils.normalize_public_key(pem_str=stored_public_key)
-        provided_key_bytes = utils.normalize_public_key(pem_str=form_data.owner_public_key)
-        if stored_key_bytes != provided_key_bytes:
+        try:
+            provided_public_key = key_service.parse_public_key(pem_str=form_data.owner_public_key)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Provided public key is not a valid PEM public key.")
+        if stored_public_key.fingerprint != provided_public_key.fingerprint:
             raise HTTPException(status_code=400, detail="Provided public key does not match owner's public key.")
 
-        # 4. Encrypt using the owner's public key
-        encrypted_data = utils.encrypt_data(file_bytes, form_data.owner_public_key)
-
-        # 5. Fetch Uploader private key (Organization)
-        encrypted_pem = await eks.get_private_key_by_user_id(uploader_id)
-        org_pvt_key = utils.decrypt_private_key(encrypted_pem)
+        # 3. Fetch Uploader private key (Organization)
+        org_pvt_key = await key_service.get_private_key(user_id=uploader_id, db_session=db_session)
         if not org_pvt_key:
             raise HTTPException(status_code=500, detail="Organization keys not found")
 
-        # 6. Sign the original file using organization's private key
-        signature = utils.sign_data(file_bytes, org_pvt_key)
-
-        # 7. Combine signature + encrypted content
-        signed_encrypted_blob = signature + Keys.SIGNATURE_SEPARATOR + encrypted_data
-
-        # 8. Generate SHA256-Hash
-        document_sha256 = utils.compute_sha256sum(file_bytes)
+        # 4. Encrypt chunk by chunk using the owner's public key, sign with organization's private key
+        #    and store the payload in the blob store as it is produced
+        unreferenced_blob_ref, document_sha256, document_size = await _encrypt_upload(
+            file=file,
+            owner_public_key=stored_public_key.key,
+            org_pvt_key=org_pvt_key,
+            request=request
+        )
 
-        # 9. Store in database
+        # 5. Store the metadata in database, keyed by the SHA256-Hash of the original file
         document_repo: DocumentRepository = DocumentRepositoryImpl(db_session)
         await document_repo.add(
             document=DocumentSchema(
                 id=document_sha256,
                 uploader_id=uploader_id,
                 owner_id=form_data.owner_id,
-                encrypted_data=signed_encrypted_blob,
+                blob_ref=unreferenced_blob_ref,
+                size=document_size,
+                content_type=file.content_type[:255] if file.content_type else None,
                 created_at=int(time.time()),
                 title=form_data.title
             )
         )
+        unreferenced_blob_ref = None
 
         return { "message": "Document uploaded successfully." }
 
@@ -108,21 +119,159 @@ async def add_document(form_data: DocumentUploadRequest, uploader_id: UUID, file
         await db_session.rollback()
         raise HTTPException(status_code=404, detail=obj.message)
 
+    except IntegrityError:
+        # The document id is the SHA256 of its content, so the same file was uploaded before
+        await db_session.rollback()
+        raise HTTPException(status_code=409, detail=DOCUMENT_ALREADY_EXISTS)
+
     except HTTPException as http_ex:
         await db_session.rollback()
         raise http_ex
 
+    except ExecutorSaturatedError as e:
+        await db_session.rollback()
+        logger.warning(f"[AddDocument] Rejected: {e.message}")
+        raise HTTPException(status_code=503, detail=SERVER_BUSY)
+
+    except ClientDisconnectedError:
+        await db_session.rollback()
+        logger.info("[AddDocument] Client disconnected, crypto work cancelled")
+        raise HTTPException(status_code=499, detail=CLIENT_CLOSED_REQUEST)
+
     except Exception as e:
         await db_session.rollback()
         logger.error(f"[AddDocument] Failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
+    finally:
+        # The blob's content is unique to this upload (fresh document key), so no other row can reference it
+        if unreferenced_blob_ref is not None:
+            await blob_store.delete(unreferenced_blob_ref)
+
+
+async def add_documents(request: Request, uploads: list[DocumentUploadRequest], files: list[UploadFile], uploader_id: UUID, db_session: AsyncSession) -> DocumentBatchResponse:
+    # Blobs written but not yet referenced by a committed row; removed if the batch fails
+    unreferenced_blob_refs: list[str] = []
+    try:
+        if len(files) > Keys.DOCUMENT_BATCH_MAX_FILES:
+            raise HTTPException(status_code=400, detail=DOCUMENT_BATCH_TOO_LARGE.format(max_files=Keys.DOCUMENT_BATCH_MAX_FILES))
+        if len(uploads) != len(files):
+            raise HTTPException(status_code=400, detail=DOCUMENT_BATCH_MISMATCH)
+
+        # 1. Validate every owner and their key, with one query for the roles and one for the uncached keys
+        owner_ids = list({upload.owner_id for upload in uploads})
+        user_repo: UserRepository = UserRepositoryImpl(db_session=db_session)
+        owner_roles = await user_repo.find_all_role_by_user_id(owner_ids)
+        stored_public_keys = await key_service.get_public_key_entries(user_ids=owner_ids, db_session=db_session)
+        items = []
+        for index, (upload, file) in enumerate(zip(uploads, files)):
+            status, detail = _check_owner_key(upload=upload, owner_roles=owner_roles, stored_public_keys=stored_public_keys)
+            items.append(DocumentBatchItem(index=index, filename=file.filename, title=upload.title, status=status, detail=detail))
+
+        # 2. Fetch Uploader private key (Organization), once for the batch
+        org_pvt_key = await key_service.get_private_key(user_id=uploader_id, db_session=db_session)
+        if not org_pvt_key:
+            raise HTTPException(status_code=500, detail="Organization keys not found")
+
+        # 3. Encrypt, sign and store the accepted files concurrently; the bound leaves executor room for single uploads
+        accepted = [item.index for item in items if item.status == 200]
+        semaphore = asyncio.Semaphore(Keys.DOCUMENT_BATCH_CONCURRENCY)
+
+        async def encrypt_and_store(index: int) -> tuple[str, str, int]:
+            async with semaphore:
+                blob_ref, document_sha256, document_size = await _encrypt_upload(
+                    file=files[index],
+                    owner_public_key=stored_public_keys[uploads[index].owner_id].key,
+                    org_pvt_key=org_pvt_key,
+                    request=request
+                )
+                unreferenced_blob_refs.append(blob_ref)
+                return blob_ref, document_sha256, document_size
+
+        results = await asyncio.gather(*(encrypt_and_store(index) for index in accepted), return_exceptions=True)
+        created_at = int(time.time())
+        documents: dict[int, DocumentSchema] = {}
+        for index, result in zip(accepted, results):
+            item = items[index]
+            if isinstance(result, ClientDisconnectedError):
+                raise result
+            if isinstance(result, ExecutorSaturatedError):
+                item.status, item.detail = 503, SERVER_BUSY
+            elif isinstance(result, Exception):
+                logger.error(f"[AddDocuments] File {index} failed: {result}", exc_info=result)
+                item.status, item.detail = 500, INTERNAL_SERVER_ERROR
+            else:
+                blob_ref, document_sha256, document_size = result
+                item.document_id = document_sha256
+                documents[index] = DocumentSchema(
+                    id=document_sha256,
+                    uploader_id=uploader_id,
+                    owner_id=uploads[index].owner_id,
+                    blob_ref=blob_ref,
+                    size=document_size,
+                    content_type=files[index].content_type[:255] if files[index].content_type else None,
+                    created_at=created_at,
+                    title=uploads[index].title
+                )
+
+        # 4. Insert every document in one transaction; a file whose document already exists is reported, not inserted
+        inserted_blob_refs = set()
+        if documents:
+            document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
+            inserted_blob_refs = await document_repo.add_all_new(documents=list(documents.values()))
+        unreferenced_blob_refs[:] = [blob_ref for blob_ref in unreferenced_blob_refs if blob_ref not in inserted_blob_refs]
+        for index, document in documents.items():
+            if document.blob_ref in inserted_blob_refs:
+                audit_writer.record(user_id=uploader_id, action=AuditAction.ADDED_DOCUMENT, request=request, doc_id=document.id)
+            else:
+                items[index].status, items[index].detail = 409, DOCUMENT_ALREADY_EXISTS
+
+        created = sum(1 for item in items if item.status == 200)
+        return DocumentBatchResponse(created=created, failed=len(items) - created, items=items)
+
+    except HTTPException as http_ex:
+        await db_session.rollback()
+        raise http_ex
+
+    except ExecutorSaturatedError as e:
+        await db_session.rollback()
+        logger.warning(f"[AddDocuments] Rejected: {e.message}")
+        raise HTTPException(status_code=503, detail=SERVER_BUSY)
+
+    except ClientDisconnectedError:
+        await db_session.rollback()
+        logger.info("[AddDocuments] Client disconnected, crypto work cancelled")
+        raise HTTPException(status_code=499, detail=CLIENT_CLOSED_REQUEST)
+
+    except Exception as e:
+        await db_session.rollback()
+        logger.error(f"[AddDocuments] Failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
+
+    finally:
+        # Each blob's content is unique to this upload (fresh document key), so no other row can reference it
+        for blob_ref in unreferenced_blob_refs:
+            await blob_store.delete(blob_ref)
+
+
+def _check_owner_key(upload: DocumentUploadRequest, owner_roles: dict, stored_public_keys: dict) -> tuple[int, str | None]:
+    # The checks of add_document, against owners and keys loaded for the whole batch
+    if owner_roles.get(upload.owner_id) != AccountType.INDIVIDUAL or upload.owner_id not in stored_public_keys:
+        return 404, "Owner of public key doesn't exist"
+    try:
+        provided_public_key = key_service.parse_public_key(pem_str=upload.owner_public_key)
+    except ValueError:
+        return 400, "Provided public key is not a valid PEM public key."
+    if stored_public_keys[upload.owner_id].fingerprint != provided_public_key.fingerprint:
+        return 400, "Provided public key does not match owner's public key."
+    return 200, None
+
 
 async def get_document(document_id: str, user_id: UUID, db_session: AsyncSession):
     try:
-        # Fetch document
+        # Fetch document metadata; the payload is read only once access is confirmed
         document_repo = DocumentRepositoryImpl(db_session)
-        document = await document_repo.get_by_id(document_id)
+        document = await document_repo.get_metadata_by_id(document_id)
 
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -131,11 +280,15 @@ async def get_document(document_id: str, user_id: UUID, db_session: AsyncSession
         if str(document.owner_id) != str(user_id):
             raise HTTPException(status_code=403, detail="Access denied")
 
-        # Return the encrypted file as binary stream
+        # Return the encrypted file as binary stream, straight from disk when the blob store is local
+        filename = f"{document.title}.bin"
+        blob_path = blob_store.path(document.blob_ref) if document.blob_ref else None
+        if blob_path:
+            return FileResponse(blob_path, media_type="application/octet-stream", filename=filename)
         return StreamingResponse(
-            io.BytesIO(document.encrypted_data),
+            io.BytesIO(await _load_payload(document=document, db_session=db_session)),
             media_type="application/octet-stream",
-            headers={"Content-Disposition": f"attachment; filename={document.title}.bin"}
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
 
     except HTTPException as http_ex:
@@ -148,25 +301,27 @@ async def get_document(document_id: str, user_id: UUID, db_session: AsyncSession
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
-async def get_document_by_uploader_id(uploader_id: UUID, db_session) -> list[DocumentResponse]:
+async def get_document_by_uploader_id(uploader_id: UUID, cursor: str | None, limit: int, db_session) -> Page[DocumentResponse]:
     try:
         docRepo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
-        docs =  await docRepo.get_all_by_uploader_id(user_id=uploader_id)
+        docs, next_cursor = await docRepo.get_listing_by_uploader_id(user_id=uploader_id, cursor=cursor, limit=limit)
 
-        userRepo: UserRepository = UserRepositoryImpl(db_session=db_session)
-        name = await userRepo.find_all_name_by_user_id(user_ids=[doc.owner_id for doc in docs])
-        return [
+        return Page(items=[
             DocumentResponse(id=doc.id, title=doc.title, created_at=doc.created_at,
-                             uploaded_for=name.get(doc.owner_id, "Unknown Owner"), uploaded_by=None)
+                             uploaded_for=doc.owner_name, uploaded_by=None,
+                             size=doc.size, content_type=doc.content_type)
             for doc in docs
-        ]
+        ], next_cursor=next_cursor)
+    except InvalidCursorError:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR)
     except Exception as e:
         await db_session.rollback()
         logger.error(f"Error fetching documents: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
 
-async def document_download(user_id: str, access_id: UUID, db_session: AsyncSession):
+async def document_download(request: Request, user_id: str, access_id: UUID, db_session: AsyncSession):
     try:
         # 1. Load the request
         access_repo = AccessHistoryRepositoryImpl(db_session)
@@ -182,27 +337,38 @@ async def document_download(user_id: str, access_id: UUID, db_session: AsyncSess
 
         # 3. Load the encrypted document
         doc_repo = DocumentRepositoryImpl(db_session)
-        document: DocumentSchema = await doc_repo.get_by_id(document_id=access_req.doc_id)
+        document = await doc_repo.get_metadata_by_id(document_id=access_req.doc_id)
         if not document:
             raise ObjectNotFoundError("Document does not exist")
+        request.state.audit_doc_id = document.id
+
+        # 4. Unwrap the document key; frames are decrypted and authenticated while streaming, and the
+        #    request is marked COMPLETED only once the last frame and the signature have verified
+        owner_private_key = await key_service.get_private_key(user_id=access_req.owner_id, db_session=db_session)
+        issuer_public_key = await key_service.get_public_key(user_id=document.uploader_id, db_session=db_session)
+        if not owner_private_key or not issuer_public_key:
+            raise ObjectNotFoundError("Document keys do not exist")
+        plaintext_length, plaintext_chunks = await crypto_thread_executor.run(
+            utils.open_decrypt_stream,
+            await _load_payload(document=document, db_session=db_session),
+            owner_private_key,
+            issuer_public_key,
+            request=request
+        )
 
-        # 4. Decrypt
-        eks: EncryptionKeyStoreRepository = EncryptionKeyStoreRepositoryImpl(db_session)
-        blob = document.encrypted_data
-        encrypted_private_key = await eks.get_private_key_by_user_id(access_req.owner_id)
-        issuer_public_pem = await eks.get_public_key_by_user_id(document.uploader_id)
-        plaintext = utils.decrypt_data(blob=blob, enc_priv=encrypted_private_key, org_pub_pem=issuer_public_pem)
-
-        # 4. Mark as Completed
-        access_req.status = AccessStatus.COMPLETED
-        await db_session.commit()
-
-        # 11. Stream back document
+        # 5. Stream back document; the connection is not held for the length of the stream.
+        #    The stored content_type is the uploader's claim, so it is never served: the bytes go out
+        #    as an opaque attachment the browser must not sniff and render
+        await db_session.close()
         filename = f"{document.title}.pdf"
         return StreamingResponse(
-            io.BytesIO(plaintext),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+            _stream_plaintext(request=request, user_id=user_id, access_id=access_id, document_id=document.id, plaintext_chunks=plaintext_chunks),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Length": str(plaintext_length),
+                "X-Content-Type-Options": "nosniff"
+            }
         )
 
     except ObjectNotFoundError as obj:
@@ -211,8 +377,70 @@ async def document_download(user_id: str, access_id: UUID, db_session: AsyncSess
     except HTTPException as http_exc:
         await db_session.rollback()
         raise http_exc
+    except ExecutorSaturatedError as e:
+        await db_session.rollback()
+        logger.warning(f"[DocumentDownload] Rejected: {e.message}")
+        raise HTTPException(status_code=503, detail=SERVER_BUSY)
+    except ClientDisconnectedError:
+        await db_session.rollback()
+        logger.info("[DocumentDownload] Client disconnected, crypto work cancelled")
+        raise HTTPException(status_code=499, detail=CLIENT_CLOSED_REQUEST)
     except Exception as e:
         await db_session.rollback()
         logger.error(f"Error fetching documents: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR)
 
+
+async def _encrypt_upload(file: UploadFile, owner_public_key: RSAPublicKey, org_pvt_key: RSAPrivateKey, request: Request) -> tuple[str, str, int]:
+    # Frames are encrypted on threads with each chunk passed by reference and written to the blob store
+    # as they come, so an upload holds about one chunk of ciphertext in memory whatever the file size.
+    # Returns the committed blob_ref; the blob is discarded if encryption fails or is cancelled
+    writer = await crypto_thread_executor.run(ContainerWriter, owner_public_key)
+    plaintext_size = 0
+    async with blob_store.open_writer() as blob_writer:
+        await blob_writer.write(writer.header)
+        while chunk := await file.read(writer.chunk_size):
+            plaintext_size += len(chunk)
+            await blob_writer.write(await crypto_thread_executor.run(writer.encrypt_chunk, chunk, request=request))
+
+        signature = await crypto_thread_executor.run(utils.sign_digest, writer.plaintext_hash.digest(), org_pvt_key, request=request)
+        await blob_writer.write(writer.finalize(signature))
+        blob_ref = await blob_writer.commit()
+    return blob_ref, writer.plaintext_hash.hexdigest(), plaintext_size
+
+
+async def _load_payload(document: Row, db_session: AsyncSession):
+    # Documents not yet moved to the blob store still carry their payload inline
+    if document.blob_ref:
+        return await blob_store.read(document.blob_ref)
+    document_repo: DocumentRepository = DocumentRepositoryImpl(db_session=db_session)
+    return await document_repo.get_encrypted_data(document_id=document.id)
+
+
+async def _stream_plaintext(request: Request, user_id: str, access_id: UUID, document_id: str, plaintext_chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    # A failed frame tag or signature aborts the response short of Content-Length,
+    # so the client never receives a complete unverified document.
+    # The last chunk comes out of plaintext_chunks only after the signature verified; it is held back until
+    # the request is COMPLETED, so a failed check or a disconnect leaves the approval unused, and of two
+    # concurrent downloads only the one that completes the request delivers the whole document.
+    pending = None
+    try:
+        # Admitted once, by open_decrypt_stream before the response started: with the headers sent, a
+        # saturated executor must not cut the download short
+        while (chunk := await crypto_thread_executor.run(next, plaintext_chunks, None, stage="decrypt_frame", admitted=True)) is not None:
+            if pending is not None:
+                yield pending
+            pending = chunk
+    except Exception as e:
+        logger.error(f"[DocumentDownload] Verification failed for document {document_id}: {e}", exc_info=True)
+        raise
+
+    async with async_session() as db_session:
+        access_repo: AccessHistoryRepository = AccessHistoryRepositoryImpl(db_session)
+        completed = await access_repo.mark_completed(access_id=access_id)
+        await db_session.commit()
+    if not completed:
+        raise RuntimeError(f"Access request {access_id} was completed by a concurrent download")
+    audit_writer.record(user_id=user_id, action=AuditAction.DOWNLOADED_DOCUMENT, request=request, doc_id=document_id)
+    if pending is not None:
+        yield pending
@@ -0,0 +1,95 @@
+from typing import NamedTuple
+from uuid import UUID
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.constants.keys import Keys
+from repository.encryption_key_store_repository import EncryptionKeyStoreRepository
+from repository.encryption_key_store_repository_impl import EncryptionKeyStoreRepositoryImpl
+from util import utils
+from util.crypto_executor import crypto_thread_executor
+from util.ttl_cache import TTLCache
+
+
+class PublicKeyEntry(NamedTuple):
+    key: RSAPublicKey
+    fingerprint: str  # SHA-256 of the SubjectPublicKeyInfo DER
+
+
+# Loaded key objects by user_id. Hits skip the key store query, the Fernet decrypt and the PEM parse.
+# Parsed keys cannot cross a process boundary, so operations using them run on crypto_thread_executor.
+private_key_cache = TTLCache(maxsize=Keys.KEY_CACHE_SIZE, ttl=Keys.KEY_CACHE_TTL)
+public_key_cache = TTLCache(maxsize=Keys.KEY_CACHE_SIZE, ttl=Keys.KEY_CACHE_TTL)
+# Client-supplied public key PEMs, so repeated uploads for the same owner are not re-parsed
+provided_public_key_cache = TTLCache(maxsize=Keys.KEY_CACHE_SIZE, ttl=Keys.KEY_CACHE_TTL)
+
+
+async def get_private_key(user_id: UUID, db_session: AsyncSession) -> RSAPrivateKey | None:
+    private_key = private_key_cache.get(user_id)
+    if private_key is None:
+        eks: EncryptionKeyStoreRepository = EncryptionKeyStoreRepositoryImpl(db_session=db_session)
+        encrypted_pem = await eks.get_private_key_by_user_id(user_id)
+        if not encrypted_pem:
+            return None
+        private_key = await crypto_thread_executor.run(utils.load_private_key, encrypted_pem)
+        private_key_cache.set(user_id, private_key)
+    return private_key
+
+
+async def get_public_key(user_id: UUID, db_session: AsyncSession) -> RSAPublicKey | None:
+    entry = await get_public_key_entry(user_id=user_id, db_session=db_session)
+    return entry.key if entry else None
+
+
+async def get_public_key_entry(user_id: UUID, db_session: AsyncSession) -> PublicKeyEntry | None:
+    entry = public_key_cache.get(user_id)
+    if entry is None:
+        eks: EncryptionKeyStoreRepository = EncryptionKeyStoreRepositoryImpl(db_session=db_session)
+        public_pem = await eks.get_public_key_by_user_id(user_id)
+        if not public_pem:
+            return None
+        entry = _to_entry(utils.load_public_key(public_pem))
+        public_key_cache.set(user_id, entry)
+    return entry
+
+
+async def get_public_key_entries(user_ids: list[UUID], db_session: AsyncSession) -> dict[UUID, PublicKeyEntry]:
+    """
+    get_public_key_entry for many users, with one key store query for all that are not cached
+    :return: entry by user_id, for the users that have a key
+    """
+    entries, missing = {}, []
+    for user_id in user_ids:
+        entry = public_key_cache.get(user_id)
+        if entry is None:
+            missing.append(user_id)
+        else:
+            entries[user_id] = entry
+    if missing:
+        eks: EncryptionKeyStoreRepository = EncryptionKeyStoreRepositoryImpl(db_session=db_session)
+        for user_id, public_pem in (await eks.get_public_keys_by_user_ids(missing)).items():
+            entries[user_id] = _to_entry(utils.load_public_key(public_pem))
+            public_key_cache.set(user_id, entries[user_id])
+    return entries
+
+
+def parse_public_key(pem_str: str) -> PublicKeyEntry:
+    """
+    Parse a client-supplied public key PEM, reusing earlier parses of the same text
+    :param pem_str: PEM encoded public key
+    :return: parsed key and fingerprint. Raises ValueError if the PEM is invalid
+    """
+    entry = provided_public_key_cache.get(pem_str)
+    if entry is None:
+        entry = _to_entry(utils.load_public_key(pem_str))
+        provided_public_key_cache.set(pem_str, entry)
+    return entry
+
+
+def _to_entry(public_key: RSAPublicKey) -> PublicKeyEntry:
+    return PublicKeyEntry(key=public_key, fingerprint=utils.public_key_fingerprint(public_key))
+
+
+def invalidate(user_id: UUID) -> None:
+    # Call whenever a user's key store entry is written
+    private_key_cache.invalidate(user_id)
+    public_key_cache.invalidate(user_id)
@@ -0,0 +1,80 @@
+import time
+from functools import partial
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from config.constants.keys import Keys
+from config.database import engine
+from repository.auth_log_repository import AuthLogsRepository
+from repository.auth_log_repository_impl import AuthLogsRepositoryImpl
+from repository.auth_token_repository import AuthTokenRepository
+from repository.auth_token_repository_impl import AuthTokenRepositoryImpl
+from util.logger import logger
+from util.periodic_task import PeriodicTask
+
+
+async def sweep() -> dict | None:
+    """
+    Delete expired auth tokens and reset stale auth log lockouts, one short transaction per batch.
+    Only the worker holding the advisory lock sweeps; the others skip the run.
+    :return: rows removed/reset and elapsed seconds, or None if another worker holds the lock
+    """
+    started = time.monotonic()
+    async with engine.connect() as conn:
+        # Session-level lock, so it must be taken and released on this same connection
+        locked = (await conn.execute(select(func.pg_try_advisory_lock(Keys.MAINTENANCE_LOCK_KEY)))).scalar()
+        await conn.commit()
+        if not locked:
+            logger.debug("[Maintenance] Skipped, another worker holds the lock")
+            return None
+
+        try:
+            now = int(time.time())
+            tokens_deleted = await _in_batches(conn, partial(_delete_expired_tokens, now=now))
+            auth_logs_reset = await _in_batches(conn, partial(_reset_stale_auth_logs, now=now))
+        finally:
+            await conn.execute(select(func.pg_advisory_unlock(Keys.MAINTENANCE_LOCK_KEY)))
+            await conn.commit()
+
+    result = {
+        "tokens_deleted": tokens_deleted,
+        "auth_logs_reset": auth_logs_reset,
+        "elapsed_seconds": round(time.monotonic() - started, 3)
+    }
+    logger.info(f"[Maintenance] Sweep complete: {result}")
+    return result
+
+
+async def _delete_expired_tokens(session: AsyncSession, now: int) -> int:
+    token_repo: AuthTokenRepository = AuthTokenRepositoryImpl(db_session=session)
+    return await token_repo.delete_expired(now=now, limit=Keys.MAINTENANCE_BATCH_SIZE)
+
+
+async def _reset_stale_auth_logs(session: AsyncSession, now: int) -> int:
+    auth_log_repo: AuthLogsRepository = AuthLogsRepositoryImpl(db_session=session)
+    return await auth_log_repo.reset_stale(
+        now=now,
+        stale_before=now - Keys.AUTH_LOG_STALE_AFTER,
+        limit=Keys.MAINTENANCE_BATCH_SIZE
+    )
+
+
+async def _in_batches(conn: AsyncConnection, run_batch: Callable[[AsyncSession], Awaitable[int]]) -> int:
+    # Each batch commits on its own so row locks are held briefly; stop at the first short batch
+    total = 0
+    async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+        while True:
+            try:
+                count = await run_batch(session)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            total += count
+            if count < Keys.MAINTENANCE_BATCH_SIZE:
+                return total
+
+
+maintenance_task = PeriodicTask(name="maintenance", interval=Keys.MAINTENANCE_INTERVAL, fn=sweep)
@@ -0,0 +1,58 @@
+import hmac
+from typing import Iterable
+
+from fastapi import HTTPException, Request
+
+from auth.session_cache import session_cache
+from config.constants.errors import ACCESS_DENIED_INVALID_TOKEN
+from config.constants.keys import Keys
+from config.database import engine, read_engine, sql_stats
+from service.audit_partition_service import audit_partition_task
+from service.maintenance_service import maintenance_task
+from util.audit_writer import audit_writer
+from util.crypto_executor import crypto_executor, crypto_thread_executor, password_executor
+from util.key_pair_pool import key_pair_pool
+from util.logger import log_pipeline
+from util.loop_lag import loop_lag_monitor
+from util.metrics import registry, stats_samples
+
+
+def _pool_samples() -> Iterable[tuple[str, str, float]]:
+    pools = {"primary": engine.pool}
+    if read_engine is not engine:
+        pools["replica"] = read_engine.pool
+    for name, pool in pools.items():
+        labels = f'{{pool="{name}"}}'
+        yield f"docushield_db_pool_size{labels}", "Connections the pool keeps open", pool.size()
+        yield f"docushield_db_pool_checked_in{labels}", "Idle connections in the pool", pool.checkedin()
+        yield f"docushield_db_pool_checked_out{labels}", "Connections in use", pool.checkedout()
+        yield f"docushield_db_pool_overflow{labels}", "Connections open beyond the pool size (negative: pool not yet full)", pool.overflow()
+        yield f"docushield_db_pool_timeouts{labels}", "Checkouts that timed out waiting for a connection", getattr(pool, "timeouts", 0)
+    yield from stats_samples("docushield_db", sql_stats.stats())
+
+
+def _component_samples() -> Iterable[tuple[str, str, float]]:
+    for executor in (crypto_executor, crypto_thread_executor, password_executor):
+        yield from stats_samples("docushield_executor", executor.stats(), {"executor": executor.name})
+    for task in (maintenance_task, audit_partition_task):
+        stats = {key: value for key, value in task.stats().items() if key != "last_result"}
+        yield from stats_samples("docushield_periodic_task", stats, {"task": task.name})
+    yield from stats_samples("docushield_audit_writer", audit_writer.stats())
+    yield from stats_samples("docushield_session_cache", session_cache.stats())
+    yield from stats_samples("docushield_key_pair_pool", key_pair_pool.stats())
+    yield from stats_samples("docushield_log_queue", log_pipeline.stats())
+    # Labelled by pid: with several workers, each scrape reaches one of them
+    lag = loop_lag_monitor.stats()
+    yield from stats_samples("docushield_event_loop", {"lag": lag["lag"]}, {"pid": str(lag["pid"])})
+
+
+registry.add_collector(_pool_samples)
+registry.add_collector(_component_samples)
+
+
+def get_metrics(request: Request) -> str:
+    if Keys.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), Keys.METRICS_TOKEN.encode()):
+            raise HTTPException(status_code=403, detail=ACCESS_DENIED_INVALID_TOKEN)
+    return registry.render()
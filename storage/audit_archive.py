@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import os
+import re
+import uuid
+
+from config.constants.keys import Keys
+
+_ARCHIVE_NAME = re.compile(r"^[a-z0-9_]+$")
+
+
+class ArchiveWriter:
+    """
+    A gzip file being written to a temp path. `commit` fsyncs it and renames it into place, so a
+    crash mid-archive never leaves a truncated archive under the final name.
+    """
+    def __init__(self, final_path: str, compresslevel: int):
+        self.final_path = final_path
+        self.temp_path = f"{final_path}.{uuid.uuid4().hex}.tmp"
+        self.bytes_in = 0
+        self._file = open(self.temp_path, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=compresslevel)
+
+    async def write(self, chunk: bytes) -> None:
+        self.bytes_in += len(chunk)
+        await asyncio.to_thread(self._gzip.write, chunk)
+
+    async def commit(self) -> int:
+        """
+        :return: compressed size in bytes
+        """
+        return await asyncio.to_thread(self._commit)
+
+    async def abort(self) -> None:
+        await asyncio.to_thread(self._abort)
+
+    def _commit(self) -> int:
+        self._gzip.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, self.final_path)
+        fd = os.open(os.path.dirname(self.final_path), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return os.path.getsize(self.final_path)
+
+    def _abort(self) -> None:
+        self._gzip.close()
+        self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class AuditArchive:
+    """
+    Compressed archives of detached audit_log partitions under `root`, one `<partition>.csv.gz` each.
+    Rewriting an archive replaces it whole, so archiving the same partition again is safe.
+    """
+    def __init__(self, root: str, compresslevel: int):
+        self.root = os.path.abspath(root)
+        self.compresslevel = compresslevel
+
+    def path(self, name: str) -> str:
+        if not _ARCHIVE_NAME.match(name):
+            raise ValueError(f"Invalid archive name '{name}'")
+        return os.path.join(self.root, f"{name}.csv.gz")
+
+    async def open(self, name: str) -> ArchiveWriter:
+        final_path = self.path(name)
+        await asyncio.to_thread(os.makedirs, self.root, exist_ok=True)
+        return await asyncio.to_thread(ArchiveWriter, final_path, self.compresslevel)
+
+
+audit_archive = AuditArchive(root=Keys.AUDIT_ARCHIVE_PATH, compresslevel=Keys.AUDIT_ARCHIVE_COMPRESSLEVEL)
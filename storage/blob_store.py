@@ -0,0 +1,74 @@
+from typing import Protocol
+
+
+class BlobWriter(Protocol):
+    """
+    A blob written piece by piece, for payloads produced incrementally. Nothing is visible until `commit`;
+    leaving the `async with` block without committing discards what was written.
+    """
+    async def write(self, data) -> None:
+        """
+        :param data: bytes-like piece, appended to the blob
+        """
+        ...
+
+    async def commit(self) -> str:
+        """
+        Store the written content unless a blob with the same content already exists
+        :return: blob reference
+        """
+        ...
+
+    async def __aenter__(self) -> "BlobWriter":
+        ...
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        ...
+
+
+class BlobStore(Protocol):
+    """
+    Immutable, content-addressed storage for encrypted document payloads.
+    A blob reference is the SHA-256 hex of the stored bytes, so writing the same bytes twice is a no-op
+    and a stored blob is never overwritten.
+    """
+    async def put(self, data: bytes) -> str:
+        """
+        Store `data` unless a blob with the same content already exists
+        :param data: bytes-like payload
+        :return: blob reference
+        """
+        ...
+
+    def open_writer(self) -> BlobWriter:
+        """
+        :return: a writer for a blob whose content is not in memory at once
+        """
+        ...
+
+    async def read(self, blob_ref: str):
+        """
+        :return: a bytes-like view of the blob. Raises FileNotFoundError if missing
+        """
+        ...
+
+    async def delete(self, blob_ref: str) -> None:
+        ...
+
+    def path(self, blob_ref: str) -> str | None:
+        """
+        :return: local filesystem path for zero-copy serving, or None if the backend is not on local disk
+        """
+        ...
+
+
+def create_blob_store() -> BlobStore:
+    from config.constants.keys import Keys
+    from storage.local_blob_store import LocalBlobStore
+
+    if Keys.BLOB_STORE_BACKEND == "local":
+        return LocalBlobStore(root=Keys.BLOB_STORE_PATH)
+    raise RuntimeError(f"Unsupported blob store backend '{Keys.BLOB_STORE_BACKEND}'")
+
+
+blob_store: BlobStore = create_blob_store()
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import re
+import uuid
+
+from storage.blob_store import BlobStore, BlobWriter
+
+_BLOB_REF = re.compile(r"^[0-9a-f]{64}$")
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs under `root`, fanned out as `<ref[:2]>/<ref[2:4]>/<ref>`.
+    Writes go to a temp file that is fsynced and then hard-linked into place, so readers never see a
+    partial blob and an existing blob is never replaced.
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    async def put(self, data: bytes) -> str:
+        return await asyncio.to_thread(self._put, data)
+
+    def open_writer(self) -> BlobWriter:
+        return LocalBlobWriter(store=self)
+
+    async def read(self, blob_ref: str):
+        return await asyncio.to_thread(self._read, blob_ref)
+
+    async def delete(self, blob_ref: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self.path(blob_ref))
+        except FileNotFoundError:
+            pass
+
+    def path(self, blob_ref: str) -> str:
+        if not _BLOB_REF.match(blob_ref):
+            raise ValueError(f"Invalid blob reference '{blob_ref}'")
+        return os.path.join(self.root, blob_ref[:2], blob_ref[2:4], blob_ref)
+
+    def _put(self, data: bytes) -> str:
+        blob_ref = hashlib.sha256(data).hexdigest()
+        final_path = self.path(blob_ref)
+        if os.path.exists(final_path):
+            return blob_ref
+
+        directory = os.path.dirname(final_path)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{blob_ref}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._link(temp_path, final_path)
+        finally:
+            os.remove(temp_path)
+        return blob_ref
+
+    def _link(self, temp_path: str, final_path: str) -> None:
+        directory = os.path.dirname(final_path)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            os.link(temp_path, final_path)
+        except FileExistsError:
+            pass  # a concurrent writer stored the same content
+        self._fsync_directory(directory)
+
+    def _read(self, blob_ref: str):
+        # Memory-mapped, so large blobs are paged in as frames are decrypted rather than loaded whole
+        with open(self.path(blob_ref), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class LocalBlobWriter(BlobWriter):
+    """
+    Appends to a temp file under the store root, hashing as it goes; `commit` fsyncs it and links it into
+    place under the hash, so only the piece being written is held in memory.
+    """
+    def __init__(self, store: LocalBlobStore):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._temp_path = None
+
+    async def __aenter__(self) -> "LocalBlobWriter":
+        await asyncio.to_thread(self._open)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # Synchronous, so a cancelled upload still removes its temp file
+        self._discard()
+
+    async def write(self, data) -> None:
+        await asyncio.to_thread(self._write, data)
+
+    async def commit(self) -> str:
+        return await asyncio.to_thread(self._commit)
+
+    def _open(self) -> None:
+        os.makedirs(self._store.root, exist_ok=True)
+        self._temp_path = os.path.join(self._store.root, f".{uuid.uuid4().hex}.tmp")
+        self._file = open(self._temp_path, "wb")
+
+    def _write(self, data) -> None:
+        self._file.write(data)
+        self._hash.update(data)
+
+    def _commit(self) -> str:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        blob_ref = self._hash.hexdigest()
+        self._store._link(self._temp_path, self._store.path(blob_ref))
+        return blob_ref
+
+    def _discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._temp_path is not None:
+            try:
+                os.remove(self._temp_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy.exc import DataError, IntegrityError
+
+from config.constants.keys import Keys
+from config.database import async_session
+from repository.audit_log_repository import AuditLogRepository
+from repository.audit_log_repository_impl import AuditLogRepositoryImpl
+from util.enums import AuditAction
+from util.latency_stats import LatencyStats
+from util.logger import logger
+
+
+class AuditWriter:
+    """
+    Takes audit events off the request path: `record` enqueues without touching the database and a
+    background task writes them in batches, one multi-row INSERT per batch on its own session.
+    A batch is flushed once it holds `batch_size` events or `flush_interval` seconds after its first event.
+    When the queue is full the new event is dropped and counted, so a slow database never blocks requests.
+    A batch rejected for its data (a constraint or a bad value) is retried in halves down to single rows,
+    so only the offending events are dropped and counted as failed; any other failure drops the whole batch.
+    """
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self._dropped_unreported = 0
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.flush_time = LatencyStats()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._closing = False
+        self._task = asyncio.create_task(self._flush_loop(), name="audit-writer")
+
+    async def stop(self) -> None:
+        """
+        Flush everything queued, waiting up to AUDIT_DRAIN_TIMEOUT; events still queued after that are dropped
+        """
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            self._queue.put_nowait(None)  # wake the flusher if it is waiting on an empty queue
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._task, timeout=Keys.AUDIT_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            lost = self._queue.qsize()
+            self.dropped += lost
+            logger.error(f"[AuditWriter] Drain timed out, dropped {lost} queued events")
+        self._task = None
+
+    def record(self, user_id: UUID | str, action: AuditAction, request: Request, doc_id: str | None = None) -> None:
+        event = {
+            "user_id": user_id if isinstance(user_id, UUID) else UUID(user_id),
+            "action": action,
+            "doc_id": doc_id,
+            "timestamp": int(time.time()),
+            "ip_address": request.client.host if request.client else "",
+            "user_agent": request.headers.get("user-agent", "")
+        }
+        try:
+            self._queue.put_nowait(event)
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._dropped_unreported += 1
+
+    async def _flush_loop(self) -> None:
+        while not (self._closing and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+            if self._dropped_unreported:
+                logger.warning(f"[AuditWriter] Queue full, dropped {self._dropped_unreported} events")
+                self._dropped_unreported = 0
+
+    async def _collect(self) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        batch: list[dict] = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if self._closing:
+                # Draining: take whatever is queued without waiting
+                if self._queue.empty():
+                    break
+                event = self._queue.get_nowait()
+            else:
+                # Wait indefinitely for the first event, then until the batch's flush deadline
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+            if event is None:
+                continue
+            batch.append(event)
+            if deadline is None:
+                deadline = loop.time() + self.flush_interval
+        return batch
+
+    async def _write(self, batch: list[dict]) -> None:
+        started = time.monotonic()
+        await self._insert(batch)
+        self.flush_time.record(time.monotonic() - started)
+
+    async def _insert(self, batch: list[dict]) -> None:
+        try:
+            async with async_session() as session:
+                audit_repo: AuditLogRepository = AuditLogRepositoryImpl(db_session=session)
+                await audit_repo.add_all(batch)
+                await session.commit()
+            self.flushed += len(batch)
+            self.batches += 1
+        except (IntegrityError, DataError) as e:
+            if len(batch) == 1:
+                self.failed += 1
+                logger.error(f"[AuditWriter] Dropped an event, write rejected: {e}")
+                return
+            # One bad row fails the whole INSERT; bisect so the rest of the batch is still written
+            middle = len(batch) // 2
+            await self._insert(batch[:middle])
+            await self._insert(batch[middle:])
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"[AuditWriter] Dropped a batch of {len(batch)} events, write failed: {e}", exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "flush_time": self.flush_time.snapshot()
+        }
+
+
+audit_writer = AuditWriter(
+    maxsize=Keys.AUDIT_QUEUE_SIZE,
+    batch_size=Keys.AUDIT_BATCH_SIZE,
+    flush_interval=Keys.AUDIT_FLUSH_INTERVAL
+)
@@ -0,0 +1,174 @@
+"""
+Versioned, length-prefixed container for encrypted documents.
+
+    header  := MAGIC(8) | version(u8) | chunk_size(u32) | key_len(u16) | wrapped_key(key_len) | nonce_prefix(7)
+    frame   := kind(u8) | length(u32) | ciphertext || tag(length)
+    trailer := sig_len(u16) | signature(sig_len)
+
+The payload is split into AES-256-GCM frames of at most `chunk_size` plaintext bytes.
+Every frame nonce is `nonce_prefix | counter(u32) | kind(u8)` and the header is bound as
+associated data, so frames cannot be reordered, dropped, or moved between documents.
+The stream ends with an empty FINAL frame, which makes truncation detectable.
+The trailer holds the uploader's RSA-PSS signature over the SHA-256 of the plaintext.
+"""
+import hashlib
+import os
+import struct
+from typing import Iterator
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from config.constants.keys import Keys
+from exceptions.invalid_container import InvalidContainerError
+
+FRAME_DATA = 0
+FRAME_FINAL = 1
+
+_HEADER = struct.Struct(">BIH")
+_FRAME = struct.Struct(">BI")
+_COUNTER = struct.Struct(">I")
+_SIG_LEN = struct.Struct(">H")
+_NONCE_PREFIX_SIZE = 7
+_TAG_SIZE = 16
+
+_OAEP = padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()), algorithm=hashes.SHA256(), label=None)
+
+
+def unwrap_key(private_key, wrapped_key: bytes) -> bytes:
+    return private_key.decrypt(wrapped_key, _OAEP)
+
+
+def is_container(blob) -> bool:
+    return bytes(blob[:len(Keys.CONTAINER_MAGIC)]) == Keys.CONTAINER_MAGIC
+
+
+def _nonce(prefix: bytes, counter: int, kind: int) -> bytes:
+    return prefix + _COUNTER.pack(counter) + bytes((kind,))
+
+
+class ContainerWriter:
+    def __init__(self, public_key: RSAPublicKey, chunk_size: int = Keys.CONTAINER_CHUNK_SIZE):
+        aes_key = AESGCM.generate_key(bit_length=256)
+        wrapped_key = public_key.encrypt(aes_key, _OAEP)
+
+        self._aesgcm = AESGCM(aes_key)
+        self._nonce_prefix = os.urandom(_NONCE_PREFIX_SIZE)
+        self._counter = 0
+        self._finalized = False
+        self.chunk_size = chunk_size
+        self.plaintext_hash = hashlib.sha256()
+        self.header = (
+            Keys.CONTAINER_MAGIC +
+            _HEADER.pack(Keys.CONTAINER_VERSION, chunk_size, len(wrapped_key)) +
+            wrapped_key +
+            self._nonce_prefix
+        )
+
+    def _frame(self, chunk, kind: int) -> bytes:
+        if self._finalized:
+            raise InvalidContainerError("Container is already finalized")
+        nonce = _nonce(self._nonce_prefix, self._counter, kind)
+        ciphertext = self._aesgcm.encrypt(nonce, chunk, self.header)
+        self._counter += 1
+        return _FRAME.pack(kind, len(ciphertext)) + ciphertext
+
+    def encrypt_chunk(self, chunk) -> bytes:
+        """
+        Encrypt one plaintext chunk into a DATA frame
+        :param chunk: bytes-like plaintext of at most `chunk_size` bytes
+        :return: the encoded frame
+        """
+        if len(chunk) > self.chunk_size:
+            raise InvalidContainerError(f"Chunk of {len(chunk)} bytes exceeds frame size {self.chunk_size}")
+        self.plaintext_hash.update(chunk)
+        return self._frame(chunk, FRAME_DATA)
+
+    def finalize(self, signature: bytes) -> bytes:
+        """
+        Close the frame stream and append the signature trailer
+        :param signature: RSA-PSS signature over the SHA-256 of the plaintext
+        :return: the FINAL frame followed by the trailer
+        """
+        final_frame = self._frame(b"", FRAME_FINAL)
+        self._finalized = True
+        return final_frame + _SIG_LEN.pack(len(signature)) + signature
+
+
+class ContainerReader:
+    def __init__(self, blob):
+        self._view = memoryview(blob)
+        view = self._view
+
+        magic_len = len(Keys.CONTAINER_MAGIC)
+        if bytes(view[:magic_len]) != Keys.CONTAINER_MAGIC:
+            raise InvalidContainerError("Not a DocuShield container")
+        offset = magic_len
+        version, self.chunk_size, key_len = self._unpack(_HEADER, offset)
+        if version != Keys.CONTAINER_VERSION:
+            raise InvalidContainerError(f"Unsupported container version {version}")
+        offset += _HEADER.size
+        self.wrapped_key = bytes(view[offset:offset + key_len])
+        offset += key_len
+        self._nonce_prefix = bytes(view[offset:offset + _NONCE_PREFIX_SIZE])
+        offset += _NONCE_PREFIX_SIZE
+        if len(self._nonce_prefix) != _NONCE_PREFIX_SIZE:
+            raise InvalidContainerError("Truncated container header")
+        self._header = view[:offset]
+
+        # Walk frame headers only, so length and trailer are known before any decryption
+        self._frames: list[tuple[int, int, int]] = []
+        self.plaintext_length = 0
+        while True:
+            kind, length = self._unpack(_FRAME, offset)
+            offset += _FRAME.size
+            if length < _TAG_SIZE or length > self.chunk_size + _TAG_SIZE or offset + length > len(view):
+                raise InvalidContainerError("Corrupt frame length")
+            self._frames.append((kind, offset, length))
+            offset += length
+            if kind == FRAME_FINAL:
+                break
+            if kind != FRAME_DATA:
+                raise InvalidContainerError(f"Unknown frame kind {kind}")
+            self.plaintext_length += length - _TAG_SIZE
+
+        (sig_len,) = self._unpack(_SIG_LEN, offset)
+        offset += _SIG_LEN.size
+        if offset + sig_len != len(view):
+            raise InvalidContainerError("Corrupt signature trailer")
+        self.signature = bytes(view[offset:])
+        self.plaintext_hash = hashlib.sha256()
+        self._aesgcm: AESGCM | None = None
+
+    def _unpack(self, layout: struct.Struct, offset: int) -> tuple:
+        if offset + layout.size > len(self._view):
+            raise InvalidContainerError("Truncated container")
+        return layout.unpack_from(self._view, offset)
+
+    def open(self, aes_key: bytes) -> None:
+        """
+        Provide the document AES key, unwrapped from `wrapped_key` by the owner's private key
+        :param aes_key: 256-bit AES key
+        :return: None
+        """
+        self._aesgcm = AESGCM(aes_key)
+
+    def decrypt_frames(self) -> Iterator[bytes]:
+        """
+        Decrypt and authenticate frame by frame. Raises InvalidTag on tampering.
+        :return: iterator of plaintext chunks, one per DATA frame
+        """
+        if self._aesgcm is None:
+            raise InvalidContainerError("Container key is not unwrapped")
+        for counter, (kind, offset, length) in enumerate(self._frames):
+            nonce = _nonce(self._nonce_prefix, counter, kind)
+            plaintext = self._aesgcm.decrypt(nonce, self._view[offset:offset + length], self._header)
+            if kind == FRAME_FINAL:
+                if plaintext:
+                    raise InvalidTag()
+                return
+            self.plaintext_hash.update(plaintext)
+            yield plaintext
@@ -0,0 +1,194 @@
+"""
+Bounded executors for CPU-bound crypto, so RSA and AES work never runs on the event loop.
+
+`crypto_executor` is a process pool (falling back to threads where processes are unavailable)
+for work with small, picklable inputs, such as RSA key generation.
+`crypto_thread_executor` is a thread pool for work over large buffers or live objects, such as
+AES-GCM frames and RSA operations on cached key objects. Arguments are passed by reference
+there, so buffers are never pickled or copied.
+`password_executor` is a small thread pool for bcrypt (which releases the GIL), capped so a
+login storm is shed with 503s rather than queued without bound.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable
+
+from fastapi import Request
+
+from config.constants.keys import Keys
+from exceptions.client_disconnected import ClientDisconnectedError
+from exceptions.executor_saturated import ExecutorSaturatedError
+from util.latency_stats import LatencyStats
+from util.logger import logger
+from util.metrics import observe_stage
+
+
+def _timed_call(fn: Callable, args: tuple) -> tuple[float, float, Any]:
+    # time.monotonic is system-wide on Linux, so worker timestamps compare with the parent's
+    started = time.monotonic()
+    result = fn(*args)
+    return started, time.monotonic(), result
+
+
+class CryptoExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int, use_processes: bool, log_calls: bool = False):
+        self.name = name
+        self.log_calls = log_calls
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+
+    @property
+    def mode(self) -> str:
+        return "process" if isinstance(self._executor, ProcessPoolExecutor) else "thread"
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.use_processes:
+            try:
+                context = multiprocessing.get_context("forkserver")
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                self._executor.submit(int)  # spawn workers now rather than on the first request
+                return
+            except (OSError, ValueError, NotImplementedError) as e:
+                logger.warning(f"[CryptoExecutor:{self.name}] Process pool unavailable, using threads: {e}")
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _fall_back_to_threads(self, broken: Executor, error: Exception) -> None:
+        if self._executor is not broken:
+            return  # already replaced by a concurrent caller
+        logger.error(f"[CryptoExecutor:{self.name}] Process pool broke, falling back to threads: {error}")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+
+    def _submit(self, fn: Callable, args: tuple) -> tuple[Executor, Future]:
+        self.start()
+        executor = self._executor
+        try:
+            return executor, executor.submit(_timed_call, fn, args)
+        except BrokenProcessPool as e:
+            self._fall_back_to_threads(executor, e)
+            return self._submit(fn, args)
+
+    async def run(self, fn: Callable, *args, request: Request | None = None, stage: str | None = None, admitted: bool = False) -> Any:
+        """
+        Run fn(*args) on the pool.
+        Raises ExecutorSaturatedError when workers and queue are full, and
+        ClientDisconnectedError when `request` is given and its client goes away first.
+        :param fn: callable; must be a picklable top-level function on a process pool
+        :param args: positional arguments for fn
+        :param request: optional request whose disconnect cancels the work
+        :param stage: name the run time is recorded under, as <executor>.<stage>; defaults to fn's name
+        :param admitted: the caller's work was already admitted by an earlier run, such as a response
+                         that is streaming; skips the saturation check, but still counts as in flight
+        :return: fn's return value
+        """
+        if not admitted and self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorSaturatedError(f"{self.name} executor is saturated ({self._in_flight} in flight)")
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        executor, concurrent_future = self._submit(fn, args)
+        self.submitted += 1
+        self._in_flight += 1
+        # Release the slot only when the worker is really done, not when the awaiting task is cancelled
+        concurrent_future.add_done_callback(partial(self._on_done, loop))
+        future = asyncio.wrap_future(concurrent_future)
+
+        try:
+            if request is None:
+                started_at, finished_at, result = await future
+            else:
+                started_at, finished_at, result = await self._await_unless_disconnected(future, request)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except BrokenProcessPool as e:
+            self._fall_back_to_threads(executor, e)
+            return await self.run(fn, *args, request=request, stage=stage, admitted=admitted)
+
+        self.queue_wait.record(started_at - submitted_at)
+        self.run_time.record(finished_at - started_at)
+        observe_stage(f"{self.name}.queue_wait", started_at - submitted_at)
+        observe_stage(f"{self.name}.{stage or getattr(fn, '__name__', 'call')}", finished_at - started_at)
+        if self.log_calls:
+            logger.debug(
+                f"[CryptoExecutor:{self.name}] {getattr(fn, '__name__', fn)} "
+                f"waited {(started_at - submitted_at) * 1000:.1f}ms, ran {(finished_at - started_at) * 1000:.1f}ms"
+            )
+        return result
+
+    async def _await_unless_disconnected(self, future: asyncio.Future, request: Request):
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=Keys.CRYPTO_DISCONNECT_POLL_INTERVAL)
+            if done:
+                return future.result()
+            if await request.is_disconnected():
+                future.cancel()
+                self.cancelled += 1
+                raise ClientDisconnectedError()
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, _: Future) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "queue_limit": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.max_workers),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot()
+        }
+
+
+crypto_executor = CryptoExecutor(
+    name="crypto",
+    max_workers=Keys.CRYPTO_PROCESS_WORKERS,
+    max_queue=Keys.CRYPTO_QUEUE_SIZE,
+    use_processes=True
+)
+
+crypto_thread_executor = CryptoExecutor(
+    name="crypto-thread",
+    max_workers=Keys.CRYPTO_THREAD_WORKERS,
+    max_queue=Keys.CRYPTO_QUEUE_SIZE,
+    use_processes=False
+)
+
+password_executor = CryptoExecutor(
+    name="password",
+    max_workers=Keys.PASSWORD_HASH_WORKERS,
+    max_queue=Keys.PASSWORD_HASH_QUEUE_SIZE,
+    use_processes=False,
+    log_calls=True
+)
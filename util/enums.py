@@ -21,4 +21,8 @@ class AccessStatus(Enum):
     PENDING = "PENDING"
     APPROVED = "APPROVED"
     DECLINED = "DECLINED"
-    COMPLETED = "COMPLETED"
\ No newline at end of file
+    COMPLETED = "COMPLETED"
+
+class ExportFormat(Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
\ No newline at end of file
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from collections import deque
+
+from fastapi import Request
+
+from config.constants.keys import Keys
+from exceptions.executor_saturated import ExecutorSaturatedError
+from util import utils
+from util.crypto_executor import crypto_executor
+from util.latency_stats import LatencyStats
+from util.logger import logger
+
+
+class KeyPairPool:
+    """
+    Keeps `target_size` RSA key pairs (public PEM, Fernet-wrapped private PEM) generated ahead of sign-up.
+    A single background task refills one pair at a time, leaving the other crypto workers for requests.
+    """
+    def __init__(self, target_size: int):
+        self.target_size = target_size
+        self._pairs: deque[tuple[str, str]] = deque()
+        self._taken_at: deque[float] = deque()
+        self._refill_needed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.refill_lag = LatencyStats()
+
+    def start(self) -> None:
+        if self.target_size <= 0 or self._task is not None:
+            return
+        self._refill_needed.set()
+        self._task = asyncio.create_task(self._refill_loop(), name="key-pair-pool")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def acquire(self, request: Request | None = None) -> tuple[str, str]:
+        """
+        Take a pre-generated key pair, generating one inline only when the pool is empty
+        :param request: optional request whose disconnect cancels inline generation
+        :return: (public_key_pem, encrypted_private_key)
+        """
+        if self._pairs:
+            self.hits += 1
+            self._taken_at.append(time.monotonic())
+            self._refill_needed.set()
+            return self._pairs.popleft()
+
+        self.misses += 1
+        self._refill_needed.set()
+        return await crypto_executor.run(utils.generate_encryption_key_pair, request=request)
+
+    async def _refill_loop(self) -> None:
+        while True:
+            await self._refill_needed.wait()
+            while len(self._pairs) < self.target_size:
+                try:
+                    pair = await crypto_executor.run(utils.generate_encryption_key_pair)
+                except ExecutorSaturatedError:
+                    await asyncio.sleep(Keys.KEY_PAIR_POOL_RETRY_INTERVAL)
+                    continue
+                except Exception as e:
+                    logger.error(f"[KeyPairPool] Refill failed: {e}", exc_info=True)
+                    await asyncio.sleep(Keys.KEY_PAIR_POOL_RETRY_INTERVAL)
+                    continue
+
+                self._pairs.append(pair)
+                if self._taken_at:
+                    self.refill_lag.record(time.monotonic() - self._taken_at.popleft())
+            self._refill_needed.clear()
+
+    def stats(self) -> dict:
+        taken = self.hits + self.misses
+        return {
+            "size": len(self._pairs),
+            "target_size": self.target_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / taken) if taken else 0.0,
+            "pending_refills": len(self._taken_at),
+            "refill_lag": self.refill_lag.snapshot()
+        }
+
+
+key_pair_pool = KeyPairPool(target_size=Keys.KEY_PAIR_POOL_SIZE)
@@ -1,28 +1,147 @@
+"""
+Logging pipeline: records are enqueued by a QueueHandler on the root logger, without touching disk,
+and written by a QueueListener thread as one JSON object per line to <LOG_PATH>/app.log, which rolls
+over at UTC midnight into app.<YYYY-MM-DD>.log, keeping LOG_BACKUP_DAYS days.
+
+Levels: LOG_LEVEL for the root logger, LOG_LEVELS for individual loggers ("sqlalchemy=WARNING").
+Sampling: LOG_SAMPLING keeps a share of a noisy logger's records below WARNING ("uvicorn.access=0.1").
+"""
+import atexit
+import copy
+import json
 import logging
-import sys
-from logging.handlers import RotatingFileHandler
 import os
-from datetime import datetime
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+from config.constants.keys import Keys
+from util.request_context import request_id_var, user_id_var
+
+
+def _parse_pairs(spec: str) -> dict[str, str]:
+    """
+    :param spec: "name=value,name=value"
+    """
+    pairs = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        pairs[name.strip()] = value.strip()
+    return pairs
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps records with the request and user of the current context. Runs in the caller's thread,
+    before the record is queued and the context is lost.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps `rate` of the records below WARNING logged on its logger; warnings and errors always pass
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
 
-# Get the base directory
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
 
-# Ensure logs directory exists
-logs_dir = os.path.join(base_dir, 'logs')
-os.makedirs(logs_dir, exist_ok=True)
 
-# Custom log filename format
-def get_log_file_name():
-    return os.path.join(logs_dir, f"app_{datetime.now().strftime('%Y-%m-%d')}.log")
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.module}:{record.lineno}",
+            "request_id": getattr(record, "request_id", None),
+            "user_id": getattr(record, "user_id", None)
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
 
-# Rotating file handler with dynamic file names
-class CustomRotatingFileHandler(RotatingFileHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
 
-    def doRollover(self):
-        self.baseFilename = get_log_file_name()  # Update the filename dynamically
-        super().doRollover()
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Queues records for the listener thread. When the queue is full the record is dropped and
+    counted instead of blocking the caller.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now: args and exc_info may not outlive the call
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    Root logger -> bounded queue -> listener thread -> `handlers`
+    """
+    def __init__(self, handlers: list[logging.Handler], maxsize: int):
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.handler = NonBlockingQueueHandler(self._queue)
+        self.handler.addFilter(ContextFilter())
+        self._listener = QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._started = False
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._listener.start()
+        self._started = True
+
+    def stop(self) -> None:
+        """
+        Write out everything queued and stop the listener thread
+        """
+        if not self._started:
+            return
+        self._listener.stop()
+        self._started = False
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "dropped": self.handler.dropped
+        }
+
+
+def _file_handler() -> logging.Handler:
+    os.makedirs(Keys.LOG_PATH, exist_ok=True)
+    handler = TimedRotatingFileHandler(
+        os.path.join(Keys.LOG_PATH, "app.log"), when="midnight", utc=True, backupCount=Keys.LOG_BACKUP_DAYS, encoding="utf-8"
+    )
+    # app.log.2026-01-31 -> app.2026-01-31.log
+    handler.namer = lambda name: name.replace("app.log.", "app.") + ".log"
+    handler.setFormatter(JsonFormatter())
+    return handler
 
 
 def wrap_logger_with_exc_info(logger):
@@ -30,25 +149,24 @@ def wrap_logger_with_exc_info(logger):
         def wrapper(msg, *args, **kwargs):
             if sys.exc_info()[0] is not None and 'exc_info' not in kwargs:
                 kwargs['exc_info'] = True
+            kwargs.setdefault('stacklevel', 2)  # report the caller, not this wrapper
             return method(msg, *args, **kwargs)
         return wrapper
 
     for level in ['debug', 'info', 'warning', 'error', 'critical', 'exception']:
         setattr(logger, level, make_wrapper(getattr(logger, level)))
 
-# Configure the custom handler
-log_file = get_log_file_name()
-handler = CustomRotatingFileHandler(
-    log_file, maxBytes=1024 * 1024 * 5, backupCount=5  # 5MB per log file, keep 5 backups
-)
 
-# Set log formatting
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
+log_pipeline = LogPipeline(handlers=[_file_handler()], maxsize=Keys.LOG_QUEUE_SIZE)
+log_pipeline.start()
+atexit.register(log_pipeline.stop)
 
 # Configure the root logger
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-
-logger.addHandler(handler)
-wrap_logger_with_exc_info(logger)
\ No newline at end of file
+logger.setLevel(Keys.LOG_LEVEL.upper())
+logger.addHandler(log_pipeline.handler)
+for name, level in _parse_pairs(Keys.LOG_LEVELS).items():
+    logging.getLogger(name).setLevel(level.upper())
+for name, rate in _parse_pairs(Keys.LOG_SAMPLING).items():
+    logging.getLogger(name).addFilter(SamplingFilter(float(rate)))
+wrap_logger_with_exc_info(logger)
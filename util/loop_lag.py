@@ -0,0 +1,49 @@
+import asyncio
+import os
+import time
+
+from config.constants.keys import Keys
+from util.latency_stats import LatencyStats
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: sleeps `interval` seconds at a time and records how much later than
+    asked it woke up. Lag is time every ready callback spent waiting for a loop busy with something
+    else (CPU work or blocking calls on the loop), so it adds straight to request latency.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        self.lag = LatencyStats()
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._probe(), name="loop-lag")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag.record(max(0.0, time.monotonic() - expected))
+
+    def stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "interval": self.interval,
+            "lag": self.lag.snapshot()
+        }
+
+
+loop_lag_monitor = LoopLagMonitor(interval=Keys.LOOP_LAG_INTERVAL)
@@ -0,0 +1,238 @@
+"""
+In-process metrics in the Prometheus text format, and per-request stage timings.
+
+`observe_stage` records how long a stage of a request took (a repository call, a bcrypt verify, an
+RSA operation, ...) into the docushield_stage_duration_seconds histogram, and adds it to the current
+request's timings, which MetricsMiddleware returns in a Server-Timing header. `count_event` counts
+an untimed event (a commit) for the current request only. Everything runs on the event loop: an
+observation is a couple of dict lookups and a bisect, cheap enough to leave on.
+"""
+import bisect
+import inspect
+import math
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from util.logger import logger
+
+STATEMENT_STAGE = "db.statement"
+COMMIT_EVENT = "db.commit"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage -> [seconds (None for untimed events), calls] for the request being served; None outside a request
+_request_timings: ContextVar[dict[str, list] | None] = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set. Not thread-safe; observe from the event loop only.
+    """
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, seconds: float, *labelvalues: str) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        for labelvalues, (counts, total) in sorted(self._series.items()):
+            labels = _labels(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                yield f"{self.name}_bucket{_labels([*zip(self.labelnames, labelvalues), ('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Histograms observed as requests run, plus collectors called at scrape time for values that
+    already live elsewhere (pool and executor stats). A collector returns (name, description, value)
+    triples, rendered as untyped samples; the name may carry labels.
+    """
+    def __init__(self):
+        self._histograms: list[Histogram] = []
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, float]]]] = []
+
+    def histogram(self, name: str, description: str, labelnames: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        histogram = Histogram(name, description, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple[str, str, float]]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        # The samples of a metric must be contiguous, whichever collector or label set they came from
+        families: dict[str, tuple[str, list[str]]] = {}
+        for collector in self._collectors:
+            for name, description, value in collector():
+                base = name.split("{", 1)[0]
+                families.setdefault(base, (description, []))[1].append(f"{name} {value}")
+        for base, (description, samples) in families.items():
+            lines.append(f"# HELP {base} {description}")
+            lines.append(f"# TYPE {base} untyped")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: Iterable[tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def stats_samples(prefix: str, stats: dict, labels: dict[str, str] | None = None) -> Iterable[tuple[str, str, float]]:
+    """
+    Flattens a component's stats() into samples: numeric fields become <prefix>_<field>, nested
+    dicts (LatencyStats snapshots) <prefix>_<field>_<key>; other fields are skipped
+    """
+    rendered = _labels((labels or {}).items())
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from stats_samples(f"{prefix}_{key}", value, labels)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}_{key}{rendered}", f"{prefix.replace('_', ' ')} {key.replace('_', ' ')}", value
+
+
+registry = MetricsRegistry()
+
+request_duration = registry.histogram(
+    "docushield_http_request_duration_seconds", "Time to the response headers, per route", ("method", "route", "status")
+)
+stage_duration = registry.histogram(
+    "docushield_stage_duration_seconds", "Time spent in each stage of a request", ("stage",)
+)
+request_statements = registry.histogram(
+    "docushield_http_request_statements", "SQL statements run per request, per route", ("method", "route"),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    stage_duration.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.get(stage)
+        if entry is None:
+            timings[stage] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+def count_event(name: str) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(name, [None, 0])
+        entry[1] += 1
+
+
+def timed(stage: str):
+    """
+    Decorator recording each call of an async function as `stage`
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                observe_stage(stage, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def instrument_repository(name: str):
+    """
+    Class decorator timing every public async method of a repository as repo.<name>.<method>.
+    Async generators (streamed reads) are left alone: their time is spent by the caller's loop.
+    """
+    def decorator(cls):
+        for attr, fn in list(vars(cls).items()):
+            if not attr.startswith("_") and inspect.iscoroutinefunction(fn):
+                setattr(cls, attr, timed(f"repo.{name}.{attr}")(fn))
+        return cls
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Records request latency per route and returns the request's stage timings in a Server-Timing
+    header, e.g. `repo.user.find_by_id;dur=1.2;desc="x1", db.commit;desc="x1", total;dur=9.8`. Stages
+    that run after the headers are sent (a streamed body) reach the histograms but not the header.
+    Once the request is done its SQL statements are counted per route, and a request running more
+    than `statement_budget` of them (0: no budget) is logged as a warning, so an N+1 shows up in testing.
+    """
+    def __init__(self, app: ASGIApp, statement_budget: int = 0):
+        self.app = app
+        self.statement_budget = statement_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: dict[str, list] = {}
+        token = _request_timings.set(timings)
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                request_duration.observe(elapsed, scope["method"], _route(scope), str(message["status"]))
+                entries = [
+                    f'{stage};desc="x{calls}"' if seconds is None else f'{stage};dur={seconds * 1000:.1f};desc="x{calls}"'
+                    for stage, (seconds, calls) in timings.items()
+                ]
+                entries.append(f"total;dur={elapsed * 1000:.1f}")
+                message["headers"] = [*message.get("headers", []), (b"server-timing", ", ".join(entries).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _request_timings.reset(token)
+            self._check_statements(scope, timings)
+
+    def _check_statements(self, scope: Scope, timings: dict[str, list]) -> None:
+        route = scope.get("route")
+        if route is None:
+            return
+        statements = timings.get(STATEMENT_STAGE, (0.0, 0))[1]
+        request_statements.observe(statements, scope["method"], route.path)
+        if self.statement_budget and statements > self.statement_budget:
+            commits = timings.get(COMMIT_EVENT, (None, 0))[1]
+            logger.warning(
+                f"[StatementBudget] {scope['method']} {route.path} ran {statements} SQL statements "
+                f"and {commits} commits, over the budget of {self.statement_budget}"
+            )
+
+
+def _route(scope: Scope) -> str:
+    # The route template, not the raw path, keeps the label set bounded
+    route = scope.get("route")
+    return route.path if route else "unmatched"
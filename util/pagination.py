@@ -0,0 +1,57 @@
+"""
+Opaque keyset cursors for listing queries.
+
+A page is fetched with `WHERE (sort_key, id) < (:last_sort_key, :last_id) ORDER BY sort_key DESC, id DESC
+LIMIT :limit + 1`, so each page is an index range scan whose cost does not grow with depth. The extra
+row only tells whether another page exists. The cursor is the URL-safe base64 of the last row's key.
+"""
+import base64
+import json
+from typing import Any, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from exceptions.invalid_cursor import InvalidCursorError
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([str(value) if not isinstance(value, (int, str)) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[InstrumentedAttribute]) -> tuple:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return tuple(column.type.python_type(value) for column, value in zip(columns, values))
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+
+
+def keyset_page(query: Select, columns: Sequence[InstrumentedAttribute], cursor: str | None, limit: int) -> Select:
+    """
+    Order `query` newest first on `columns` and restrict it to the page after `cursor`
+    :param query: select to paginate
+    :param columns: sort key, ending in a unique column
+    :param cursor: cursor from the previous page, or None for the first page
+    :param limit: page size
+    :return: the paginated select, fetching one row beyond `limit`
+    """
+    if cursor:
+        query = query.where(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    return query.order_by(*(column.desc() for column in columns)).limit(limit + 1)
+
+
+def split_page(rows: Sequence, columns: Sequence[InstrumentedAttribute], limit: int) -> tuple[list, str | None]:
+    """
+    :param rows: result of a keyset_page query
+    :return: (rows of this page, cursor for the next page or None on the last page)
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
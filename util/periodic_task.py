@@ -0,0 +1,62 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable
+
+from util.latency_stats import LatencyStats
+from util.logger import logger
+
+
+class PeriodicTask:
+    """
+    Runs `fn` every `interval` seconds on the event loop until stopped.
+    The first run waits a random fraction of the interval so workers started together do not fire together.
+    A failing run is logged and retried at the next interval.
+    """
+    def __init__(self, name: str, interval: float, fn: Callable[[], Awaitable[dict | None]]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.failures = 0
+        self.run_time = LatencyStats()
+        self.last_result: dict | None = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            started = time.monotonic()
+            try:
+                self.last_result = await self.fn()
+                self.runs += 1
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"[PeriodicTask:{self.name}] Run failed: {e}", exc_info=True)
+            self.run_time.record(time.monotonic() - started)
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "run_time": self.run_time.snapshot(),
+            "last_result": self.last_result
+        }
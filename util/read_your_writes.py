@@ -0,0 +1,60 @@
+import time
+from contextvars import ContextVar
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.constants.keys import ENVIRONMENT
+from util.enums import Environment
+
+WRITE_COOKIE = "last_write"
+
+# [wrote] for the request being served; a list, so the flag set from SQLAlchemy's greenlets is seen here
+_request_wrote: ContextVar[list[bool] | None] = ContextVar("request_wrote", default=None)
+
+
+def mark_write() -> None:
+    # Called when a transaction commits on the primary; a no-op outside a request
+    wrote = _request_wrote.get()
+    if wrote is not None:
+        wrote[0] = True
+
+
+def recently_wrote(request: Request, window: int) -> bool:
+    try:
+        return time.time() - int(request.cookies.get(WRITE_COOKIE, "")) < window
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Stamps the response of a request that committed a write with a short-lived cookie holding the write
+    time, so the client's reads in the next `window` seconds go to the primary, whichever worker serves
+    them: a replica may not have replayed the write yet. A client can only forge the cookie to read
+    from the primary. Plain ASGI, like RequestContextMiddleware, so the flag lives in the endpoint's task.
+    """
+    def __init__(self, app: ASGIApp, window: int):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        wrote = [False]
+
+        async def send_with_write_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and wrote[0]:
+                cookie = f"{WRITE_COOKIE}={int(time.time())}; Max-Age={self.window}; Path=/; HttpOnly; SameSite=lax"
+                if ENVIRONMENT == Environment.PROD:
+                    cookie += "; Secure"
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        token = _request_wrote.set(wrote)
+        try:
+            await self.app(scope, receive, send_with_write_cookie)
+        finally:
+            _request_wrote.reset(token)
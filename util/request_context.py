@@ -0,0 +1,44 @@
+import re
+import uuid
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = "x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Set for the duration of a request; read by the log formatter, so every record carries them
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[str | None] = ContextVar("user_id", default=None)
+
+
+class RequestContextMiddleware:
+    """
+    Gives each HTTP request an id, taken from a well-formed X-Request-ID header or generated, and
+    echoes it in the response. Plain ASGI rather than BaseHTTPMiddleware, so the context variables
+    are set in the task that runs the endpoint and its dependencies.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next((value.decode("latin-1") for name, value in scope["headers"] if name == REQUEST_ID_HEADER.encode()), "")
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), request_id.encode())]
+            await send(message)
+
+        request_token = request_id_var.set(request_id)
+        user_token = user_id_var.set(None)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            user_id_var.reset(user_token)
+            request_id_var.reset(request_token)
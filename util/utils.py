@@ -1,16 +1,20 @@
 import os
 import hashlib
 import base64
+from typing import Iterator
 
 from cryptography.exceptions import InvalidSignature
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from fastapi import HTTPException
 
 from config.constants.keys import Keys
+from util.container import ContainerReader, is_container, unwrap_key
 from util.logger import logger
 
 
@@ -87,10 +91,23 @@ def sign_data(data: bytes, private_key_pem: str) -> bytes:
     )
 
 
+def sign_digest(digest: bytes, private_key: RSAPrivateKey) -> bytes:
+    # Same PSS signature as sign_data, computed from an incrementally hashed SHA-256 digest
+    return private_key.sign(
+        digest,
+        padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+        Prehashed(hashes.SHA256())
+    )
+
+
 def compute_sha256sum(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def normalize_public_key(pem_str: str):
     key = serialization.load_pem_public_key(pem_str.encode())
     return key.public_bytes(
@@ -99,6 +116,14 @@ def normalize_public_key(pem_str: str):
     )
 
 
+def public_key_fingerprint(public_key: RSAPublicKey) -> str:
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(der).hexdigest()
+
+
 def decrypt_private_key(encrypted_private_key: str) -> str:
     # Re-derive Fernet key from shared secret
     symmetric_key = base64.urlsafe_b64encode(Keys.RSA_PAIR_SECRET.encode('utf-8')[:32].ljust(32, b'0'))
@@ -109,20 +134,74 @@ def decrypt_private_key(encrypted_private_key: str) -> str:
 
 
 def decrypt_data(blob: bytes, enc_priv: str, org_pub_pem: str) -> bytes:
-    # 1. Split signature / encrypted payload
-    sig, encrypted_payload = blob.split(Keys.SIGNATURE_SEPARATOR, 1)
+    _, plaintext_chunks = decrypt_data_stream(blob=blob, enc_priv=enc_priv, org_pub_pem=org_pub_pem)
+    return b"".join(plaintext_chunks)
+
+
+def decrypt_data_stream(blob: bytes, enc_priv: str, org_pub_pem: str) -> tuple[int, Iterator[bytes]]:
+    return open_decrypt_stream(blob=blob, private_key=load_private_key(enc_priv), org_public=load_public_key(org_pub_pem))
+
+
+def open_decrypt_stream(blob: bytes, private_key: RSAPrivateKey, org_public: RSAPublicKey) -> tuple[int, Iterator[bytes]]:
+    # 1. Legacy separator blobs are decrypted and verified whole before anything is released
+    if not is_container(blob):
+        sig, plaintext = _decrypt_legacy(blob=bytes(blob), private_key=private_key)
+        _verify_signature(org_public=org_public, sig=sig, data=plaintext, algorithm=hashes.SHA256())
+        return len(plaintext), iter((plaintext,))
+
+    # 2. Containers unwrap the AES key up front, then decrypt frame by frame as the caller pulls
+    reader = ContainerReader(blob)
+    reader.open(unwrap_key(private_key=private_key, wrapped_key=reader.wrapped_key))
+    return reader.plaintext_length, verified_frames(reader=reader, org_public=org_public)
 
-    # 2. Split AES‑RSA bundle
-    encrypted_aes_key, iv, tag, ciphertext = encrypted_payload.split(Keys.AES_RSA_SEPARATOR)
 
-    # 3. Decrypt the owner’s private key (PEM) using your Fernet helper
+def load_private_key(enc_priv: str) -> RSAPrivateKey:
+    # Decrypt the owner’s private key (PEM) using your Fernet helper
     private_pem_str = decrypt_private_key(enc_priv)
-    private_key = serialization.load_pem_private_key(
+    return serialization.load_pem_private_key(
         private_pem_str.encode('utf-8'),
         password=None
     )
 
-    # 4. RSA‑decrypt the AES key
+
+def load_public_key(pem_str: str) -> RSAPublicKey:
+    return serialization.load_pem_public_key(pem_str.encode('utf-8'))
+
+
+def verified_frames(reader: ContainerReader, org_public: RSAPublicKey) -> Iterator[bytes]:
+    # Each frame is authenticated by GCM as it is decrypted. The last chunk is held back
+    # until the issuer’s signature over the whole plaintext verifies.
+    pending = None
+    for chunk in reader.decrypt_frames():
+        if pending is not None:
+            yield pending
+        pending = chunk
+
+    _verify_signature(org_public=org_public, sig=reader.signature, data=reader.plaintext_hash.digest(), algorithm=Prehashed(hashes.SHA256()))
+    if pending is not None:
+        yield pending
+
+
+def _verify_signature(org_public, sig: bytes, data: bytes, algorithm) -> None:
+    org_public.verify(
+        sig,
+        data,
+        padding.PSS(
+            mgf=padding.MGF1(algorithm=hashes.SHA256()),
+            salt_length=padding.PSS.MAX_LENGTH
+        ),
+        algorithm
+    )
+
+
+def _decrypt_legacy(blob: bytes, private_key) -> tuple[bytes, bytes]:
+    # 1. Split signature / encrypted payload
+    sig, encrypted_payload = blob.split(Keys.SIGNATURE_SEPARATOR, 1)
+
+    # 2. Split AES‑RSA bundle
+    encrypted_aes_key, iv, tag, ciphertext = encrypted_payload.split(Keys.AES_RSA_SEPARATOR)
+
+    # 3. RSA‑decrypt the AES key
     aes_key = private_key.decrypt(
         encrypted_aes_key,
         padding.OAEP(
@@ -132,24 +211,10 @@ def decrypt_data(blob: bytes, enc_priv: str, org_pub_pem: str) -> bytes:
         )
     )
 
-    # 5. AES‑GCM decrypt the ciphertext
+    # 4. AES‑GCM decrypt the ciphertext
     decrypt = Cipher(
         algorithms.AES(aes_key),
         modes.GCM(iv, tag),
         backend=default_backend()
     ).decryptor()
-    plaintext = decrypt.update(ciphertext) + decrypt.finalize()
-
-    # 6. Verify the issuer’s signature
-    org_public = serialization.load_pem_public_key(org_pub_pem.encode('utf-8'))
-    org_public.verify(
-        sig,
-        plaintext,
-        padding.PSS(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
-
-    return plaintext
\ No newline at end of file
+    return sig, decrypt.update(ciphertext) + decrypt.finalize()